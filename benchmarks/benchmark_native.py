@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+from pyNAVIS import Plots
+
+from AERzip.conversionFunctions import spikesFileToBytes, bytesToSpikesFile
+
+from synthetic_events import generateNASEvents
+
+# Downstream workloads on the decoded arrays. The histogram is the spike count of each address that the
+# Plots.histogram function of pyNAVIS plots, and the sonogram is the matrix of the Plots.sonogram function
+WORKLOADS = {
+    "histogram": lambda spikes_file, settings, num_addresses: np.bincount(spikes_file.addresses,
+                                                                         minlength=num_addresses),
+    "sonogram": lambda spikes_file, settings, num_addresses: Plots.sonogram(spikes_file, settings, return_data=True,
+                                                                            start_at_zero=False),
+    "argsort": lambda spikes_file, settings, num_addresses: np.argsort(spikes_file.timestamps, kind="stable"),
+    "to_us": lambda spikes_file, settings, num_addresses: spikes_file.timestamps * settings.ts_tick,
+}
+
+
+def benchmark(function, repetitions):
+    times = []
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+
+    return min(times)
+
+
+if __name__ == '__main__':
+    repetitions = 5
+
+    for duration in [1.0, 10.0]:
+        spikes_file, settings = generateNASEvents(duration=duration, rate=500.0)
+        num_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+        num_spikes = len(spikes_file.timestamps)
+
+        # 2-byte addresses and 3-byte timestamps, as in LZMA-pruned files
+        data = spikesFileToBytes(spikes_file, 2, 4, 2, 3, verbose=False)
+
+        big_spikes_file, _, _ = bytesToSpikesFile(data, 2, 3, verbose=False)
+        native_spikes_file, _, _ = bytesToSpikesFile(data, 2, 3, verbose=False, native=True)
+        assert np.array_equal(big_spikes_file.addresses, native_spikes_file.addresses)
+        assert np.array_equal(big_spikes_file.timestamps, native_spikes_file.timestamps)
+
+        big_time = benchmark(lambda: bytesToSpikesFile(data, 2, 3, verbose=False), repetitions)
+        native_time = benchmark(lambda: bytesToSpikesFile(data, 2, 3, verbose=False, native=True), repetitions)
+        print(str(num_spikes) + " spikes: bytesToSpikesFile big-endian " + '{0:.4f}'.format(big_time) + " s, native " +
+              '{0:.4f}'.format(native_time) + " s")
+
+        for name, workload in WORKLOADS.items():
+            big_time = benchmark(lambda: workload(big_spikes_file, settings, num_addresses), repetitions)
+            native_time = benchmark(lambda: workload(native_spikes_file, settings, num_addresses), repetitions)
+
+            print("  " + name + ": big-endian " + '{0:.4f}'.format(big_time) + " s, native " +
+                  '{0:.4f}'.format(native_time) + " s (" + '{0:.2f}'.format(big_time / native_time) + "x)")
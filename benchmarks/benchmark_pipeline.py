@@ -0,0 +1,235 @@
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import AERzip
+from AERzip.codecFunctions import getCodecNames
+from AERzip.compressionFunctions import compressData, decompressData, calcFinalSizes
+from AERzip.conversionFunctions import spikesFileToBytes, bytesToSpikesFile, calcRequiredBytes
+
+from synthetic_events import generateNASEvents, EVENT_PROCESSES
+
+STAGES = ("spikesFileToBytes", "compressData", "decompressData", "bytesToSpikesFile")
+
+
+def measureStage(function, repetitions):
+    """
+    Measures a stage of the compression pipeline. The time is the best one of the repetitions, and the peak memory is
+    measured in an additional run with tracemalloc (which slows down the stage), as the peak of the memory allocated by
+    the stage (numpy arrays included).
+
+    :param function function: The stage, as a function without arguments that returns its output.
+    :param int repetitions: An int indicating the number of timed runs.
+
+    :return: This function returns three different objects, listed below:
+    - output (object): The output of the stage.
+    - elapsed_time (float): A float indicating the best time of the stage (seconds).
+    - peak_memory (int): An int indicating the peak memory allocated by the stage (bytes).
+    """
+    times = []
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        output = function()
+        times.append(time.perf_counter() - start_time)
+        del output
+
+    tracemalloc.start()
+    initial_memory, _ = tracemalloc.get_traced_memory()
+    output = function()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return output, min(times), peak_memory - initial_memory
+
+
+def benchmarkScenario(scenario, compressors, repetitions, verbose=True):
+    """
+    Generates a synthetic recording (see the generateNASEvents function) and measures each stage of the compression
+    pipeline with each compressor, in the same way that the spikesFileToCompressedFile and compressedFileToSpikesFile
+    functions run them. Speeds are calculated over the size of the original spikes, in MB/s (1 MB = 10^6 bytes).
+
+    :param dict scenario: A dict with the keyword arguments of the generateNASEvents function.
+    :param list compressors: A list of strings indicating the compressors to be measured.
+    :param int repetitions: An int indicating the number of timed runs of each stage.
+    :param boolean verbose: A boolean indicating whether or not the results are printed.
+
+    :return: A list with a result dict per compressor.
+    :rtype: list
+    """
+    spikes_file, settings = generateNASEvents(**scenario)
+    num_events = len(spikes_file.timestamps)
+    original_size = num_events * (settings.address_size + settings.timestamp_size)
+    desired_address_size, desired_timestamp_size = calcRequiredBytes(spikes_file, settings)
+
+    results = []
+    for compressor in compressors:
+        final_address_size, final_timestamp_size = calcFinalSizes(compressor, desired_address_size,
+                                                                  desired_timestamp_size, verbose=False)
+
+        stages = {}
+
+        def addStage(name, output, elapsed_time, peak_memory):
+            stages[name] = {"time": elapsed_time, "mb_per_s": original_size / 1e6 / elapsed_time,
+                            "events_per_s": num_events / elapsed_time, "peak_memory": peak_memory}
+            return output
+
+        data = addStage("spikesFileToBytes", *measureStage(
+            lambda: spikesFileToBytes(spikes_file, settings.address_size, settings.timestamp_size, final_address_size,
+                                      final_timestamp_size, verbose=False), repetitions))
+        compressed_data = addStage("compressData", *measureStage(
+            lambda: compressData(data, compressor, verbose=False), repetitions))
+        decompressed_data = addStage("decompressData", *measureStage(
+            lambda: decompressData(compressed_data, compressor), repetitions))
+        new_spikes_file = addStage("bytesToSpikesFile", *measureStage(
+            lambda: bytesToSpikesFile(decompressed_data, final_address_size, final_timestamp_size, verbose=False)[0],
+            repetitions))
+
+        assert np.array_equal(new_spikes_file.addresses, spikes_file.addresses)
+        assert np.array_equal(new_spikes_file.timestamps, spikes_file.timestamps)
+
+        result = {"scenario": scenario, "compressor": compressor, "events": num_events,
+                  "original_size": original_size, "compressed_size": len(compressed_data),
+                  "ratio": original_size / len(compressed_data), "stages": stages}
+        results.append(result)
+
+        if verbose:
+            print(formatScenario(scenario) + ", " + compressor + ": " + str(num_events) + " events, ratio " +
+                  '{0:.2f}'.format(result["ratio"]))
+            for name in STAGES:
+                print("    " + name.ljust(18) + '{0:9.1f}'.format(stages[name]["mb_per_s"]) + " MB/s" +
+                      '{0:12.2f}'.format(stages[name]["events_per_s"] / 1e6) + " Mevents/s" +
+                      '{0:10.1f}'.format(stages[name]["peak_memory"] / 1e6) + " MB peak")
+
+        del data, compressed_data, decompressed_data, new_spikes_file
+
+    return results
+
+
+def formatScenario(scenario):
+    """
+    Builds a short description of a scenario (e.g. "64ch stereo ON/OFF poisson 4.0s").
+
+    :param dict scenario: A dict with the keyword arguments of the generateNASEvents function.
+
+    :return: A string with the description.
+    :rtype: string
+    """
+    return (str(scenario["num_channels"]) + "ch " + ("stereo" if scenario["mono_stereo"] else "mono") +
+            (" ON/OFF " if scenario["on_off_both"] else " ON ") + scenario["process"] + " " +
+            str(scenario["duration"]) + "s")
+
+
+def getResultKey(result):
+    """
+    Builds the key that identifies a result in different runs of the benchmark (its scenario and compressor).
+
+    :param dict result: A result dict (see the benchmarkScenario function).
+
+    :return: A string with the key.
+    :rtype: string
+    """
+    return json.dumps(result["scenario"], sort_keys=True) + " " + result["compressor"]
+
+
+def compareResults(results, previous_results, threshold):
+    """
+    Compares the speed and peak memory of each stage and the compressed size with the ones of a previous run of the
+    benchmark (e.g. of the previous release) and prints the changes. Only the results with the same scenario and
+    compressor are compared.
+
+    :param list results: A list with the results of this run.
+    :param list previous_results: A list with the results of the previous run.
+    :param float threshold: A float indicating the relative slowdown (or memory increase) considered a regression (e.g.
+    0.1 is 10%).
+
+    :return: A list of strings describing the regressions.
+    :rtype: list
+    """
+    previous_results = {getResultKey(result): result for result in previous_results}
+
+    regressions = []
+    for result in results:
+        previous_result = previous_results.get(getResultKey(result))
+        if previous_result is None:
+            continue
+
+        for name in STAGES:
+            speed_change = result["stages"][name]["mb_per_s"] / previous_result["stages"][name]["mb_per_s"] - 1
+            memory_change = (result["stages"][name]["peak_memory"] /
+                             max(previous_result["stages"][name]["peak_memory"], 1) - 1)
+            description = (formatScenario(result["scenario"]) + ", " + result["compressor"] + ", " + name + ": " +
+                           '{0:+.1f}'.format(speed_change * 100) + "% MB/s, " +
+                           '{0:+.1f}'.format(memory_change * 100) + "% peak memory")
+            print(description)
+            if speed_change < -threshold or memory_change > threshold:
+                regressions.append(description)
+
+        if result["compressed_size"] > previous_result["compressed_size"]:
+            regressions.append(formatScenario(result["scenario"]) + ", " + result["compressor"] + ": compressed size " +
+                               str(previous_result["compressed_size"]) + " -> " + str(result["compressed_size"]))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the throughput, compression ratio and peak memory of each "
+                                                 "stage of the AERzip pipeline on synthetic NAS recordings")
+    parser.add_argument("--compressors", nargs="+", default=getCodecNames(), help="compressors (default: all)")
+    parser.add_argument("--channels", nargs="+", type=int, default=[64], help="channels of each ear (default: 64)")
+    parser.add_argument("--mono-stereo", nargs="+", type=int, default=[0, 1], choices=[0, 1],
+                        help="mono (0) and/or stereo (1) recordings (default: both)")
+    parser.add_argument("--on-off-both", nargs="+", type=int, default=[1], choices=[0, 1],
+                        help="only ON (0) and/or ON/OFF (1) addresses (default: 1)")
+    parser.add_argument("--process", nargs="+", default=list(EVENT_PROCESSES), choices=EVENT_PROCESSES,
+                        help="event processes (default: all)")
+    parser.add_argument("--duration", type=float, default=4.0, help="duration of the recordings (default: 4 s)")
+    parser.add_argument("--rate", type=float, default=1000.0,
+                        help="mean rate of each address (default: 1000 spikes/s)")
+    parser.add_argument("--repetitions", type=int, default=5, help="timed runs of each stage (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator (default: 0)")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON file where the results are saved (default: benchmark_results.json)")
+    parser.add_argument("--compare", default=None, help="JSON file of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown or memory increase reported as a regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for num_channels, mono_stereo, on_off_both, process in itertools.product(args.channels, args.mono_stereo,
+                                                                             args.on_off_both, args.process):
+        scenario = dict(num_channels=num_channels, mono_stereo=mono_stereo, on_off_both=on_off_both,
+                        duration=args.duration, rate=args.rate, process=process, seed=args.seed)
+        results.extend(benchmarkScenario(scenario, args.compressors, args.repetitions))
+
+    report = {"aerzip_version": AERzip.__version__, "numpy_version": np.__version__,
+              "python_version": platform.python_version(), "platform": platform.platform(),
+              "processor": platform.processor(), "date": datetime.datetime.now().isoformat(timespec="seconds"),
+              "repetitions": args.repetitions, "results": results}
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print("Results saved to " + args.output)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            previous_report = json.load(file)
+
+        print("\nComparison with AERzip " + previous_report["aerzip_version"] + " (" + args.compare + ")")
+        regressions = compareResults(results, previous_report["results"], args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print("    " + regression)
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
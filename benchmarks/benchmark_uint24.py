@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+
+from AERzip.conversionFunctions import constructStruct, widenUint24
+
+
+def widenUint24Struct(field):
+    """
+    Previous implementation of the 3-byte to 4-byte widening of the bytesToSpikesFile function, kept as the reference
+    for this benchmark: a zeroed structured array is allocated, the field is copied into it and it is viewed as ">u4".
+    """
+    struct = constructStruct("zeros", (1,), "values", (3,))
+    values = np.zeros(len(field), dtype=struct)
+    values['values'] = np.array(field, copy=False)
+
+    return values.view(">u4")
+
+
+def benchmark(function, repetitions):
+    times = []
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+
+    return min(times)
+
+
+if __name__ == '__main__':
+    repetitions = 10
+
+    for num_spikes in [10 ** 5, 10 ** 6, 10 ** 7]:
+        # 2-byte addresses and 3-byte timestamps, as in LZMA-pruned files
+        spikes_struct = np.dtype(">u2, >3u1")
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 256, num_spikes * spikes_struct.itemsize, dtype=np.uint8).tobytes()
+        timestamp_field = np.frombuffer(data, spikes_struct)['f1']
+
+        assert np.array_equal(widenUint24(data, 2, 5, num_spikes), widenUint24Struct(timestamp_field))
+
+        struct_time = benchmark(lambda: widenUint24Struct(timestamp_field), repetitions)
+        vectorized_time = benchmark(lambda: widenUint24(data, 2, 5, num_spikes), repetitions)
+
+        print(str(num_spikes) + " spikes: constructStruct path " + '{0:.4f}'.format(struct_time) + " s, widenUint24 " +
+              '{0:.4f}'.format(vectorized_time) + " s (" + '{0:.2f}'.format(struct_time / vectorized_time) + "x)")
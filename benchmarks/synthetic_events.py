@@ -0,0 +1,156 @@
+import numpy as np
+from pyNAVIS import MainSettings, SpikesFile
+
+EVENT_PROCESSES = ("poisson", "bursty")
+
+
+def calcNumAddresses(num_channels, mono_stereo=0, on_off_both=1):
+    """
+    Calculates the number of addresses of a NAS with the pyNAVIS address layout, where the address of a spike is
+    (ear * num_channels + channel) * (on_off_both + 1) + polarity.
+
+    :param int num_channels: An int indicating the number of channels of each ear.
+    :param int mono_stereo: An int indicating whether the NAS is mono (0) or stereo (1).
+    :param int on_off_both: An int indicating whether the NAS has only ON addresses (0) or both ON and OFF ones (1).
+
+    :return: An int with the number of addresses.
+    :rtype: int
+    """
+    return num_channels * (on_off_both + 1) * (mono_stereo + 1)
+
+
+def channelsToAddresses(channels, ears, polarities, num_channels, on_off_both=1):
+    """
+    Converts the channel, ear and polarity of some spikes into their addresses (see the calcNumAddresses function).
+
+    :param np.ndarray channels: An array with the channel of each spike.
+    :param np.ndarray ears: An array with the ear of each spike (0 is the left one).
+    :param np.ndarray polarities: An array with the polarity of each spike (0 is ON). Ignored if on_off_both is 0.
+    :param int num_channels: An int indicating the number of channels of each ear.
+    :param int on_off_both: An int indicating whether the NAS has only ON addresses (0) or both ON and OFF ones (1).
+
+    :return: An array with the addresses.
+    :rtype: np.ndarray
+    """
+    addresses = (ears * num_channels + channels) * (on_off_both + 1)
+    if on_off_both:
+        addresses += polarities
+
+    return addresses
+
+
+def drawChannels(rng, centers, num_channels, width):
+    """
+    Draws the channels of some spikes around the center channel of each one, as the spikes of a tone are concentrated
+    in the channels whose characteristic frequencies are close to it.
+
+    :param np.random.Generator rng: The random number generator.
+    :param np.ndarray centers: An array with the center channel of each spike.
+    :param int num_channels: An int indicating the number of channels of each ear.
+    :param float width: A float indicating the standard deviation of the channels around their centers.
+
+    :return: An array with the channels.
+    :rtype: np.ndarray
+    """
+    channels = np.rint(rng.normal(centers, width)).astype(np.int64)
+
+    return np.clip(channels, 0, num_channels - 1)
+
+
+def generateNASEvents(num_channels=64, mono_stereo=0, on_off_both=1, duration=1.0, rate=1000.0, process="poisson",
+                      burst_rate=5.0, burst_duration=0.05, burst_factor=10.0, address_size=2, timestamp_size=4,
+                      ts_tick=0.2, seed=0):
+    """
+    Generates a synthetic NAS-like recording. Its spikes are distributed among the channels like the spikes of a tone
+    (concentrated around a center channel over a uniform background), and are evenly divided between both ears and
+    polarities.
+
+    With the "poisson" process, each address fires as an independent Poisson process. With the "bursty" process,
+    bursts of burst_duration seconds start as a Poisson process of burst_rate bursts per second, and the rate of the
+    addresses is multiplied by burst_factor during them (each burst has its own center channel, as a new sound would
+    have). In both cases, the mean rate of each address is rate spikes per second.
+
+    The timestamps are ticks of ts_tick microseconds, starting from 0, so the SpikesFile is the same one that the
+    Loaders.loadAEDAT function of pyNAVIS would return after adapting its timestamps. It can be stored as an aedat
+    file with the Savers.save_AEDAT function of pyNAVIS.
+
+    :param int num_channels: An int indicating the number of channels of each ear.
+    :param int mono_stereo: An int indicating whether the NAS is mono (0) or stereo (1).
+    :param int on_off_both: An int indicating whether the NAS has only ON addresses (0) or both ON and OFF ones (1).
+    :param float duration: A float indicating the duration of the recording (seconds).
+    :param float rate: A float indicating the mean rate of each address (spikes per second).
+    :param string process: A string indicating the process that generates the spikes (see EVENT_PROCESSES).
+    :param float burst_rate: A float indicating the mean number of bursts per second of the "bursty" process.
+    :param float burst_duration: A float indicating the duration of each burst (seconds).
+    :param float burst_factor: A float indicating how many times the rate increases during a burst.
+    :param int address_size: An int indicating the size of the addresses (bytes). 3-byte addresses are stored as 4-byte
+    ints.
+    :param int timestamp_size: An int indicating the size of the timestamps (bytes). 3-byte timestamps are stored as
+    4-byte ints.
+    :param float ts_tick: A float indicating the duration of a timestamp tick (microseconds).
+    :param int seed: An int indicating the seed of the random number generator.
+
+    :return: This function returns two different objects, listed below:
+    - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS.
+    - settings (MainSettings): A MainSettings object from pyNAVIS containing information about the recording.
+    """
+    if process not in EVENT_PROCESSES:
+        raise ValueError("The process must be one of " + ", ".join(EVENT_PROCESSES))
+
+    rng = np.random.default_rng(seed)
+    num_addresses = calcNumAddresses(num_channels, mono_stereo, on_off_both)
+    width = max(num_channels / 8, 1)
+
+    if process == "poisson":
+        background_rate = rate * num_addresses
+        burst_starts = np.zeros(0)
+    else:
+        burst_starts = np.sort(rng.uniform(0, duration, rng.poisson(burst_rate * duration)))
+        burst_time = min(len(burst_starts) * burst_duration, duration)
+
+        # The background rate is reduced so that the mean rate of the recording is still rate
+        background_rate = rate * num_addresses * duration / (duration + (burst_factor - 1) * burst_time)
+
+    # Background spikes (half of them around a center channel, the other half uniformly distributed)
+    num_spikes = rng.poisson(background_rate * duration)
+    times = rng.uniform(0, duration, num_spikes)
+    channels = np.where(rng.random(num_spikes) < 0.5,
+                        drawChannels(rng, np.full(num_spikes, rng.uniform(0, num_channels)), num_channels, width),
+                        rng.integers(0, num_channels, num_spikes))
+
+    # Additional spikes of each burst, around the center channel of the burst
+    if len(burst_starts):
+        burst_spikes = rng.poisson(background_rate * (burst_factor - 1) * burst_duration, len(burst_starts))
+        burst_times = (np.repeat(burst_starts, burst_spikes) +
+                       rng.uniform(0, burst_duration, int(np.sum(burst_spikes))))
+        burst_channels = drawChannels(rng, np.repeat(rng.uniform(0, num_channels, len(burst_starts)), burst_spikes),
+                                      num_channels, width)
+
+        inside = burst_times < duration
+        times = np.concatenate([times, burst_times[inside]])
+        channels = np.concatenate([channels, burst_channels[inside]])
+
+    ears = rng.integers(0, mono_stereo + 1, len(times))
+    polarities = rng.integers(0, 2, len(times))
+    addresses = channelsToAddresses(channels, ears, polarities, num_channels, on_off_both)
+
+    # Timestamps in ticks, sorted as the NAS would send them
+    timestamps = np.floor(times * 1e6 / ts_tick).astype(np.int64)
+    order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[order]
+    addresses = addresses[order]
+    if len(timestamps):
+        timestamps -= timestamps[0]
+
+    if len(timestamps) and int(timestamps[-1]) >= 2 ** (8 * timestamp_size):
+        raise ValueError("The duration of the recording does not fit in " + str(timestamp_size) + "-byte timestamps.")
+
+    # 3-byte fields are stored as 4-byte ints, as the bytesToSpikesFile function of AERzip does
+    address_dtype = ">u" + str(4 if address_size == 3 else address_size)
+    timestamp_dtype = ">u" + str(4 if timestamp_size == 3 else timestamp_size)
+    spikes_file = SpikesFile(addresses.astype(address_dtype), timestamps.astype(timestamp_dtype))
+    settings = MainSettings(num_channels=num_channels, mono_stereo=mono_stereo, on_off_both=on_off_both,
+                            address_size=address_size, timestamp_size=timestamp_size, ts_tick=ts_tick,
+                            verbose=False)
+
+    return spikes_file, settings
@@ -27,5 +27,8 @@ setup(
         'lz4>=3.1.3',
         'zstandard>=0.16.0',
         'pylzma'
-    ]
+    ],
+    entry_points={
+        'console_scripts': ['aerzip=AERzip.cli:main']
+    }
 )
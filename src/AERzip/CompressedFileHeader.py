@@ -1,3 +1,5 @@
+import struct
+
 from pyNAVIS import MainSettings
 
 import AERzip
@@ -17,9 +19,72 @@ class CompressedFileHeader:
     - header_end (string): The string that represents the end of the header. This is the string used in generic AEDAT files.
 
     Each field has a specific size. Thus, the sum of the size of all these fields determines the total size of the header. 
+
+    The optional field is also used to store options that describe how the compressed data must be read. Each option
+    consists of a one-character tag followed by a value of fixed size. These are the supported options:
+
+    - C (no value): The compressed data is a chunked container (see the spikesFileToCompressedFile function).
+    - D (no value): Timestamps are stored as zigzag-encoded deltas (see the spikesFileToBytes function).
+    - L (no value): Addresses and timestamps are stored in a columnar layout (see the spikesFileToBytes function).
+    - S (no value): The bytes of each field are shuffled into byte planes (see the spikesFileToBytes function).
+    - B (2 bytes): Addresses and timestamps are bit-packed. The value contains their bit widths (1 byte each).
+    - F (4 bytes): The compressed data is split into independently compressed frames. The value contains the size of
+      the uncompressed data of each frame (see the compressFrames function).
+    - K (4 bytes): The compressed data was compressed with a trained dictionary. The value contains the dictionary ID
+      (see the trainDatasetDictionary function).
+    - V (1 byte): The header is followed by a metadata block. The value contains the header version (2).
+    - X (no value): The compressed data contains CRC-32 checksums of the compressed and decompressed data of each chunk
+      (or of the whole data, if it is not a chunked container). See the verifyCompressedFile function.
+    - G (5 bytes): The spikes of the chunked container are split into address groups, stored in separate chunks. The
+      value contains the number of consecutive addresses of each group (4 bytes) and whether or not groups are split by
+      polarity (1 byte). See the calcAddressGroups function.
+    - O (9 bytes): The compressed data of a chunked container split into address groups starts with its group sequence,
+      which restores the original order of the spikes. The value contains the size of each of its items (1 byte) and
+      its checksums (8 bytes). See the addGroupSequenceOption function.
+
+    Version 2 headers (the default one) are followed by a metadata block, so that the recording can be described without
+    decompressing it (e.g. to preallocate the output arrays or to scan a dataset). Its fields are the following (fields
+    that are not known when the header is written, e.g. by a live encoder, are None):
+
+    - num_events (int): An int indicating the number of spikes.
+    - data_size (int): An int indicating the size of the uncompressed spikes data (of all the chunks, if any).
+    - min_ts (int): An int indicating the minimum timestamp.
+    - max_ts (int): An int indicating the maximum timestamp.
+    - flags (int): An int whose bits indicate the options of the header (see flag_bits). It is calculated from the
+      options when the header is written.
+
+    Version 1 headers (written by previous versions of AERzip) do not contain the V option or the metadata block.
     """
 
-    def __init__(self, compressor=None, address_size=None, timestamp_size=None):
+    # Option tags and the size (bytes) of their values
+    option_sizes = {"C": 0, "D": 0, "L": 0, "S": 0, "B": 2, "F": 4, "K": 4, "V": 1, "X": 0, "G": 5, "O": 9}
+
+    # Bit of each option in the flags of the metadata block
+    flag_bits = {"C": 1, "D": 2, "L": 4, "S": 8, "B": 16, "F": 32, "K": 64, "X": 128, "G": 256, "O": 512}
+
+    # Field sizes (bytes). They are the same for every header, so they are class attributes
+    library_version_size = 20
+    compressor_size = 10
+    address_size_size = 4  # 32-bit int
+    timestamp_size_size = 4  # 32-bit int
+    optional_size = 40
+    header_end_size = 22  # Size of fixed string "#End Of ASCII Header\r\n"
+    # Size of all the fields. Version 2 headers are followed by the metadata block (see the getSize function)
+    header_size = library_version_size + compressor_size + address_size_size + timestamp_size_size + optional_size + \
+        header_end_size
+
+    # Layout of the header, used to read and write all the fields at once
+    header_struct = struct.Struct(">" + str(library_version_size) + "s" + str(compressor_size) + "sII" +
+                                  str(optional_size) + "s" + str(header_end_size) + "s")
+
+    # Layout of the metadata block of version 2 headers: num_events, data_size, min_ts, max_ts (8 bytes each), flags (4
+    # bytes) and 4 reserved bytes. Unknown fields are stored as unknown_value
+    latest_version = 2
+    metadata_struct = struct.Struct(">QQQQI4x")
+    metadata_size = metadata_struct.size
+    unknown_value = (1 << 64) - 1
+
+    def __init__(self, compressor=None, address_size=None, timestamp_size=None, header_version=latest_version):
         # Checking parameters
         # TODO: Compressors? Empty for now
         '''if compressor is not None and not (compressor == "ZSTD" or compressor == "LZ4" or compressor == "LZMA"):
@@ -29,18 +94,11 @@ class CompressedFileHeader:
             raise ValueError("The address size must be defined.")
         if timestamp_size is None:
             raise ValueError("The time stamp size must be defined.")
-
-        # Field sizes (bytes)
-        self.library_version_size = 20
-        self.compressor_size = 10
-        self.address_size_size = 4  # 32-bit int
-        self.timestamp_size_size = 4  # 32-bit int
-        self.optional_size = 40
-        self.header_end_size = 22  # Size of fixed string "#End Of ASCII Header\r\n"
+        if header_version not in (1, 2):
+            raise ValueError("The header version must be 1 or 2.")
 
         # Other internal attributes
         self.optional_available = self.optional_size  # Allows to control the space available in the optional field
-        self.header_size = self.library_version_size + self.compressor_size + self.address_size_size + self.timestamp_size_size + self.optional_size + self.header_end_size
 
         # Field values
         self.library_version = "AERzip v" + AERzip.__version__
@@ -48,8 +106,18 @@ class CompressedFileHeader:
         self.address_size = address_size
         self.timestamp_size = timestamp_size
         self.optional = bytearray().ljust(self.optional_size)
+        self.options = {}
         self.header_end = "#End Of ASCII Header\r\n"
 
+        # Metadata (version 2 headers)
+        self.header_version = header_version
+        self.num_events = None
+        self.data_size = None
+        self.min_ts = None
+        self.max_ts = None
+        if header_version >= 2:
+            self.addOption("V", bytes([header_version]))
+
     def addOptional(self, data):
         """
         This function allows to insert data (in bytes) into the optional field of the header.
@@ -68,22 +136,140 @@ class CompressedFileHeader:
         self.optional[start_index:end_index] = data
         self.optional_available -= data_size
 
+    def addOption(self, tag, value=b""):
+        """
+        This function allows to insert an option (its tag and its value) into the optional field of the header.
+
+        :param string tag: A one-character string indicating the option.
+        :param bytes value: The value of the option. Its size must be the one defined for the option.
+        :raises ValueError: The option is not supported or the size of its value is not the expected one.
+        :raises MemoryError: It is not allowed to use this function when there is not enough space in the optional field.
+        :return: None
+        """
+        if tag not in self.option_sizes:
+            raise ValueError("The option '" + tag + "' is not supported.")
+        if len(value) != self.option_sizes[tag]:
+            raise ValueError("The value of the option '" + tag + "' must have " + str(self.option_sizes[tag]) +
+                             " bytes.")
+
+        self.addOptional(tag.encode("utf-8") + bytes(value))
+        self.options[tag] = bytes(value)
+
+    def getOption(self, tag):
+        """
+        This function returns the value of an option of the header.
+
+        :param string tag: A one-character string indicating the option.
+        :return: The value of the option, or None if the header does not contain the option.
+        :rtype: bytes
+        """
+        return self.options.get(tag)
+
+    def readOptions(self):
+        """
+        This function reads the options stored in the optional field (e.g. after reading the header from a compressed
+        file). Reading stops at the first byte that is not an option tag, such as the blank padding of the field.
+
+        :return: None
+        """
+        self.options = {}
+
+        index = 0
+        while index < self.optional_size:
+            tag = chr(self.optional[index])
+            if tag not in self.option_sizes or index + 1 + self.option_sizes[tag] > self.optional_size:
+                break
+
+            self.options[tag] = bytes(self.optional[index + 1:index + 1 + self.option_sizes[tag]])
+            index += 1 + self.option_sizes[tag]
+
+        self.optional_available = self.optional_size - index
+
+        version = self.options.get("V")
+        self.header_version = 1 if version is None else version[0]
+
+    def getSize(self):
+        """
+        This function returns the size of the header in a compressed file, including the metadata block of version 2
+        headers.
+
+        :return: The size of the header (bytes).
+        :rtype: int
+        """
+        return self.header_size + (self.metadata_size if self.header_version >= 2 else 0)
+
+    def getFlags(self):
+        """
+        This function calculates the flags of the metadata block from the options of the header.
+
+        :return: The flags (see flag_bits).
+        :rtype: int
+        """
+        flags = 0
+        for tag in self.options:
+            flags |= self.flag_bits.get(tag, 0)
+
+        return flags
+
+    def setMetadata(self, num_events=None, data_size=None, min_ts=None, max_ts=None):
+        """
+        This function sets the fields of the metadata block. Fields that are None are not changed.
+
+        :param int num_events: An int indicating the number of spikes.
+        :param int data_size: An int indicating the size of the uncompressed spikes data.
+        :param int min_ts: An int indicating the minimum timestamp.
+        :param int max_ts: An int indicating the maximum timestamp.
+        :return: None
+        """
+        if num_events is not None:
+            self.num_events = int(num_events)
+        if data_size is not None:
+            self.data_size = int(data_size)
+        if min_ts is not None:
+            self.min_ts = int(min_ts)
+        if max_ts is not None:
+            self.max_ts = int(max_ts)
+
+    def readMetadata(self, metadata):
+        """
+        This function reads the fields of the metadata block (e.g. after reading the header from a compressed file).
+
+        :param bytearray, bytes, memoryview metadata: The metadata block (metadata_size bytes).
+        :return: None
+        """
+        values = self.metadata_struct.unpack_from(metadata)
+        self.num_events, self.data_size, self.min_ts, self.max_ts = [None if value == self.unknown_value else value
+                                                                     for value in values[:4]]
+
+    def metadataToBytes(self):
+        """
+        This function constructs the metadata block of a version 2 header.
+
+        :return: The metadata block.
+        :rtype: bytes
+        """
+        values = [self.unknown_value if value is None else value
+                  for value in (self.num_events, self.data_size, self.min_ts, self.max_ts)]
+
+        return self.metadata_struct.pack(*values, self.getFlags())
+
     def toBytes(self):
         """
         This function constructs a bytearray from the CompressedFileHeader object. This facilitates its storage in a compressed file.
+        The metadata block of version 2 headers is included (see the getSize function).
 
         :return: The CompressedFileHeader object as a bytearray.
         :rtype: bytearray
         """
-        header_bytes = bytearray()
-
         # Inserting header data
-        header_bytes.extend(bytes(self.library_version.ljust(self.library_version_size), "utf-8"))
-        header_bytes.extend(bytes(self.compressor.ljust(self.compressor_size), "utf-8"))
-        header_bytes.extend(self.address_size.to_bytes(self.address_size_size, "big"))
-        header_bytes.extend(self.timestamp_size.to_bytes(self.timestamp_size_size, "big"))
-        header_bytes.extend(self.optional.ljust(self.optional_size))
-        header_bytes.extend(bytes(self.header_end.ljust(self.header_end_size), "utf-8"))
+        header_bytes = bytearray(self.header_size)
+        self.header_struct.pack_into(header_bytes, 0,
+                                     bytes(self.library_version.ljust(self.library_version_size), "utf-8"),
+                                     bytes(self.compressor.ljust(self.compressor_size), "utf-8"), self.address_size,
+                                     self.timestamp_size, bytes(self.optional.ljust(self.optional_size)),
+                                     bytes(self.header_end.ljust(self.header_end_size), "utf-8"))
+        if self.header_version >= 2:
+            header_bytes.extend(self.metadataToBytes())
 
         return header_bytes
 
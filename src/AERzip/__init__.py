@@ -1,9 +1,25 @@
 __version__ = "0.8.0"
 
 from .CompressedFileHeader import CompressedFileHeader
-from .compressionFunctions import compressDataFromStoredNASFile, extractDataFromCompressedFile, bytesToCompressedFile, compressedFileToBytes, spikesFileToCompressedFile, compressedFileToSpikesFile, extractCompressedData, compressData, decompressData, getCompressedFile, storeFile, checkFileExists, loadFile
-from .conversionFunctions import bytesToSpikesFile, spikesFileToBytes, calcRequiredBytes, constructStruct
+from .compressionFunctions import compressDataFromStoredNASFile, compressNASSpikesFile, aedatBytesToSpikesFile, getCompressedFilePath, compressStoredNASFileInChunks, loadAEDATChunks, calcFinalSizes, compressDataStream, extractDataFromCompressedFile, extractTimeRange, extractAddresses, addConversionOptions, getConversionOptions, addDictionaryOption, getDictionaryOption, addAddressGroupOption, getAddressGroupOption, calcGroupSequence, addGroupSequenceOption, getGroupSequenceOption, decompressGroupSequence, addSpikesMetadata, getDictionaryPath, storeDictionary, loadDictionary, loadCompressedFileDictionary, writeCompressedChunks, compressChunk, getChunkIndexBytes, readChunkIndexTrailer, readChunkIndex, readChunkGroups, calcChecksums, getChecksumTrailerBytes, readChecksumTrailer, getChecksumTrailerSize, decompressChunkedData, chunksToSpikesFile, bytesToCompressedFile, compressedFileToBytes, spikesFileToCompressedFile, compressedFileToSpikesFile, extractCompressedData, readCompressedFileHeader, getCompressedFileInfo, verifyCompressedFile, compressData, decompressData, decompressDataStream, getDecompressedSize, readFileChunks, dataStreamToSpikesFile, compressedFileStreamToSpikesFile, calcFrameSize, compressFrames, decompressFrames, decompressFileData, getCompressedFile, storeFile, checkFileExists, loadFile
+from .codecFunctions import Codec, CodecContext, ZstdCodec, ZstdContext, LZ4Codec, LZMACodec, ChunksReader, ChecksumWriter, CodecSession, registerCodec, getCodec, getCodecNames, addDictionary, getDictionary
+from .batchFunctions import findAEDATFiles, getDictionarySamples, trainDatasetDictionary, compressNASFileTask, compressNASFiles, verifyCompressedFileTask, verifyCompressedFiles
+from .asyncFunctions import compressNASBytesTask, extractCompressedFileTask, AsyncSession
+from .liveFunctions import FrameEncoder, LiveEncoder
+from .lazyFunctions import openCompressedFile, LazySpikesFile
+from .cacheFunctions import DecodedCache
+from .socketFunctions import connectStreamSocket, listenStreamSocket, receiveExactly, StreamSender, StreamReceiver, runLoopback
+from .tunerFunctions import getTuningConfigurations, sampleSpikesFile, benchmarkConfiguration, tuneCompression, tuneNASFiles, formatConfiguration
+from .conversionFunctions import bytesToSpikesFile, spikesFileToBytes, writeField, calcRequiredBytes, calcRequiredBytesFromMaxTs, timestampsToDeltas, deltasToTimestamps, calcRequiredDeltaBytes, calcDeltaBytesFromMaxDelta, calcRequiredBits, calcRequiredBitsFromMaxTs, calcRequiredDeltaBits, calcConvertedSize, calcAddressGroups, getNASAddresses, packBits, unpackBits, shuffleBytes, unshuffleBytes, widenUint24, constructStruct
 
 __all__ = ["CompressedFileHeader", 
-           "compressDataFromStoredNASFile", "extractDataFromCompressedFile", "bytesToCompressedFile", "compressedFileToBytes", "spikesFileToCompressedFile", "compressedFileToSpikesFile", "extractCompressedData", "compressData", "decompressData", "getCompressedFile", "storeFile", "checkFileExists", "loadFile",
-           "bytesToSpikesFile", "spikesFileToBytes", "calcRequiredBytes", "constructStruct"]
+           "compressDataFromStoredNASFile", "compressNASSpikesFile", "aedatBytesToSpikesFile", "getCompressedFilePath", "compressStoredNASFileInChunks", "loadAEDATChunks", "calcFinalSizes", "compressDataStream", "extractDataFromCompressedFile", "extractTimeRange", "extractAddresses", "addConversionOptions", "getConversionOptions", "addDictionaryOption", "getDictionaryOption", "addAddressGroupOption", "getAddressGroupOption", "calcGroupSequence", "addGroupSequenceOption", "getGroupSequenceOption", "decompressGroupSequence", "addSpikesMetadata", "getDictionaryPath", "storeDictionary", "loadDictionary", "loadCompressedFileDictionary", "writeCompressedChunks", "compressChunk", "getChunkIndexBytes", "readChunkIndexTrailer", "readChunkIndex", "readChunkGroups", "calcChecksums", "getChecksumTrailerBytes", "readChecksumTrailer", "getChecksumTrailerSize", "decompressChunkedData", "chunksToSpikesFile", "bytesToCompressedFile", "compressedFileToBytes", "spikesFileToCompressedFile", "compressedFileToSpikesFile", "extractCompressedData", "readCompressedFileHeader", "getCompressedFileInfo", "verifyCompressedFile", "compressData", "decompressData", "decompressDataStream", "getDecompressedSize", "readFileChunks", "dataStreamToSpikesFile", "compressedFileStreamToSpikesFile", "calcFrameSize", "compressFrames", "decompressFrames", "decompressFileData", "getCompressedFile", "storeFile", "checkFileExists", "loadFile",
+           "Codec", "CodecContext", "ZstdCodec", "ZstdContext", "LZ4Codec", "LZMACodec", "ChunksReader", "ChecksumWriter", "CodecSession", "registerCodec", "getCodec", "getCodecNames", "addDictionary", "getDictionary",
+           "findAEDATFiles", "getDictionarySamples", "trainDatasetDictionary", "compressNASFileTask", "compressNASFiles", "verifyCompressedFileTask", "verifyCompressedFiles",
+           "compressNASBytesTask", "extractCompressedFileTask", "AsyncSession",
+           "FrameEncoder", "LiveEncoder",
+           "openCompressedFile", "LazySpikesFile",
+           "DecodedCache",
+           "connectStreamSocket", "listenStreamSocket", "receiveExactly", "StreamSender", "StreamReceiver", "runLoopback",
+           "getTuningConfigurations", "sampleSpikesFile", "benchmarkConfiguration", "tuneCompression", "tuneNASFiles", "formatConfiguration",
+           "bytesToSpikesFile", "spikesFileToBytes", "writeField", "calcRequiredBytes", "calcRequiredBytesFromMaxTs", "timestampsToDeltas", "deltasToTimestamps", "calcRequiredDeltaBytes", "calcDeltaBytesFromMaxDelta", "calcRequiredBits", "calcRequiredBitsFromMaxTs", "calcRequiredDeltaBits", "calcConvertedSize", "calcAddressGroups", "getNASAddresses", "packBits", "unpackBits", "shuffleBytes", "unshuffleBytes", "widenUint24", "constructStruct"]
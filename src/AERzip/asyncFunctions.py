@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import os
+
+from pyNAVIS import Functions
+
+from AERzip.codecFunctions import dictionaries
+from AERzip.compressionFunctions import compressDataFromStoredNASFile, getCompressedFilePath, compressNASSpikesFile, \
+    aedatBytesToSpikesFile, compressedFileToSpikesFile, extractCompressedData, getDictionaryOption, getDictionaryPath, \
+    loadDictionary, storeFile, loadFile
+
+
+def compressNASBytesTask(aedat_bytes, settings, compressor, dictionary_dir_path=None, **compression_options):
+    """
+    Compresses the bytes of an original aedat NAS file as the compressDataFromStoredNASFile function does. This is the
+    task that the AsyncSession class runs in its executor, so it does not read or write any file (except the trained
+    dictionary, which is loaded from dictionary_dir_path if it has not been loaded in the worker process yet).
+
+    :param bytes aedat_bytes: The bytes of the original aedat file.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
+    :param string compressor: A string indicating the compressor to be used.
+    :param string dictionary_dir_path: A string indicating the folder of the trained dictionary (if any).
+    :param compression_options: Keyword arguments passed to the compressNASSpikesFile function.
+
+    :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed spikes data.
+    :rtype: bytearray
+    """
+    dictionary_id = compression_options.get("dictionary_id")
+    if dictionary_id is not None and dictionary_id not in dictionaries:
+        loadDictionary(getDictionaryPath(dictionary_dir_path, dictionary_id), compressor)
+
+    spikes_file = aedatBytesToSpikesFile(aedat_bytes, settings)
+
+    # Adapt timestamps to allow timestamp compression
+    if spikes_file.min_ts != 0:
+        Functions.adapt_timestamps(spikes_file, settings)
+
+    return compressNASSpikesFile(spikes_file, settings, compressor, verbose=False, **compression_options)
+
+
+def extractCompressedFileTask(compressed_file, dictionary_dir_path=None, threads=1, native=False):
+    """
+    Decompresses the bytes of a compressed file as the extractDataFromCompressedFile function does. This is the task
+    that the AsyncSession class runs in its executor, so it does not read any file (except the trained dictionary, which
+    is loaded from dictionary_dir_path if it has not been loaded in the worker process yet).
+
+    :param bytes compressed_file: The bytes of the compressed file.
+    :param string dictionary_dir_path: A string indicating the folder of the trained dictionary (if any).
+    :param int threads: An int indicating the number of threads used to decompress the frames of the file (if any).
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
+
+    :return: The same objects as the compressedFileToSpikesFile function.
+    """
+    header, _ = extractCompressedData(compressed_file)
+    dictionary_id = getDictionaryOption(header)
+    if dictionary_id is not None and dictionary_id not in dictionaries:
+        loadDictionary(getDictionaryPath(dictionary_dir_path, dictionary_id), header.compressor)
+
+    return compressedFileToSpikesFile(compressed_file, threads=threads, native=native)
+
+
+class AsyncSession:
+    """
+    An AsyncSession provides asyncio counterparts of the functions that compress and extract files, so that they can be
+    used from an event loop without blocking it:
+
+    - Files are read and written in the default executor of the event loop (a thread pool), since reading and writing
+      files releases the GIL.
+    - Conversion and compression (or decompression) run in the specified executor. A ProcessPoolExecutor allows them to
+      run in parallel, while a ThreadPoolExecutor avoids copying the data between processes. None uses the default
+      executor of the event loop.
+    - At most max_concurrency operations are in flight at the same time (the rest wait for their turn), which bounds
+      the memory used by the files being processed.
+
+    :param concurrent.futures.Executor executor: The executor where conversion and compression run. None uses the
+    default executor of the event loop.
+    :param int max_concurrency: An int indicating the maximum number of operations in flight. None uses the number of
+    CPUs.
+    """
+
+    def __init__(self, executor=None, max_concurrency=None):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("The maximum concurrency must be a positive number of operations.")
+
+        self.executor = executor
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def runInExecutor(self, function, *args, **kwargs):
+        """
+        Runs a function in the executor of the session and waits for its result without blocking the event loop.
+
+        :param function function: The function. It must be picklable if the executor is a ProcessPoolExecutor.
+        :param args: Positional arguments passed to the function.
+        :param kwargs: Keyword arguments passed to the function.
+
+        :return: The result of the function.
+        """
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    async def loadFile(self, file_path):
+        """
+        Asynchronous counterpart of the loadFile function.
+
+        :param string file_path: A string indicating the file path.
+
+        :return: The output bytearray.
+        :rtype: bytearray
+        """
+        async with self.semaphore:
+            return await asyncio.to_thread(loadFile, file_path)
+
+    async def storeFile(self, file_bytes, initial_file_path, overwrite=False):
+        """
+        Asynchronous counterpart of the storeFile function. Users cannot be prompted, so an existing file is either
+        overwritten or kept (and the file is written to a new path, see the checkFileExists function).
+
+        :param bytearray file_bytes: The input bytearray.
+        :param string initial_file_path: A string indicating where the file is intended to be written.
+        :param boolean overwrite: A boolean indicating whether or not an existing file must be overwritten.
+
+        :return: A string indicating where the file has been written.
+        :rtype: string
+        """
+        async with self.semaphore:
+            return await asyncio.to_thread(storeFile, file_bytes, initial_file_path, overwrite=overwrite)
+
+    async def compressDataFromStoredNASFile(self, initial_file_path, settings, compressor, store=True,
+                                            overwrite=False, **compression_options):
+        """
+        Asynchronous counterpart of the compressDataFromStoredNASFile function. The original file is read without
+        blocking the event loop, its spikes are converted and compressed in the executor of the session (see the
+        compressNASBytesTask function), and the compressed file is written without blocking the event loop.
+
+        In streaming mode (if chunk_size is specified), the whole compressDataFromStoredNASFile function runs in the
+        executor, since it reads and compresses the original file chunk by chunk.
+
+        :param string initial_file_path: A string indicating the original aedat file path.
+        :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
+        :param string compressor: A string indicating the compressor to be used.
+        :param boolean store: A boolean indicating whether or not store the compressed file.
+        :param boolean overwrite: A boolean indicating whether or not an existing compressed file must be overwritten.
+        :param compression_options: Keyword arguments passed to the compressDataFromStoredNASFile function.
+
+        :return: The same objects as the compressDataFromStoredNASFile function.
+        """
+        async with self.semaphore:
+            if compression_options.get("chunk_size") is not None:
+                return await self.runInExecutor(compressDataFromStoredNASFile, initial_file_path, settings, compressor,
+                                                store=store, overwrite=overwrite, verbose=False,
+                                                **compression_options)
+
+            aedat_bytes = await asyncio.to_thread(loadFile, initial_file_path)
+
+            compressed_file_path = getCompressedFilePath(initial_file_path, compressor)
+            compressed_file = await self.runInExecutor(compressNASBytesTask, aedat_bytes, settings, compressor,
+                                                       dictionary_dir_path=os.path.dirname(compressed_file_path),
+                                                       **compression_options)
+            del aedat_bytes
+
+            final_file_path = initial_file_path
+            if store:
+                final_file_path = await asyncio.to_thread(storeFile, compressed_file, compressed_file_path,
+                                                          overwrite=overwrite)
+
+            return compressed_file, final_file_path
+
+    async def extractDataFromCompressedFile(self, file_path, threads=1, native=False):
+        """
+        Asynchronous counterpart of the extractDataFromCompressedFile function. The compressed file is read without
+        blocking the event loop, and it is decompressed in the executor of the session (see the
+        extractCompressedFileTask function).
+
+        :param string file_path: A string indicating the compressed aedat file path.
+        :param int threads: An int indicating the number of threads used to decompress the frames of the file (if any).
+        :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead
+        of big-endian ones (see the bytesToSpikesFile function).
+
+        :return: The same objects as the extractDataFromCompressedFile function.
+        """
+        async with self.semaphore:
+            compressed_file = await asyncio.to_thread(loadFile, file_path)
+
+            return await self.runInExecutor(extractCompressedFileTask, compressed_file,
+                                            dictionary_dir_path=os.path.dirname(file_path), threads=threads,
+                                            native=native)
+
+    async def compressNASFiles(self, file_paths, settings, compressor, overwrite=False, **compression_options):
+        """
+        Asynchronous counterpart of the compressNASFiles function. All the files are compressed and stored concurrently
+        (with at most max_concurrency of them in flight) with the compressDataFromStoredNASFile function of the session.
+
+        :param list file_paths: A list of strings indicating the original aedat file paths.
+        :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the files.
+        :param string compressor: A string indicating the compressor to be used.
+        :param boolean overwrite: A boolean indicating whether or not existing compressed files must be overwritten.
+        :param compression_options: Keyword arguments passed to the compressDataFromStoredNASFile function.
+
+        :return: A dict that maps each original file path to the path of its compressed file.
+        :rtype: dict
+        """
+        async def compressFile(file_path):
+            # Only the path is kept, so the compressed file is released as soon as it is stored
+            _, final_file_path = await self.compressDataFromStoredNASFile(file_path, settings, compressor,
+                                                                          overwrite=overwrite, **compression_options)
+            return final_file_path
+
+        final_file_paths = await asyncio.gather(*[compressFile(file_path) for file_path in file_paths])
+
+        return dict(zip(file_paths, final_file_paths))
@@ -0,0 +1,324 @@
+import glob
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pyNAVIS import Functions, Loaders
+
+from AERzip.codecFunctions import getCodec, addDictionary
+from AERzip.compressionFunctions import compressDataFromStoredNASFile, getCompressedFilePath, calcFinalSizes, \
+    storeDictionary, verifyCompressedFile, DEFAULT_DICTIONARY_SIZE, DEFAULT_DICTIONARY_SAMPLE_SIZE
+from AERzip.conversionFunctions import spikesFileToBytes, calcRequiredBytes, calcRequiredDeltaBytes, calcRequiredBits, \
+    calcRequiredDeltaBits
+
+
+def findAEDATFiles(path):
+    """
+    Finds the original aedat files to be compressed. The path can be an aedat file, a dataset folder (e.g.
+    events/dataset) or a main folder that contains dataset folders (e.g. events).
+
+    :param string path: A string indicating the path of an aedat file or a folder.
+
+    :return: A sorted list of aedat file paths.
+    :rtype: list
+    """
+    if os.path.isfile(path):
+        return [path]
+
+    file_paths = glob.glob(os.path.join(path, "*.aedat")) + glob.glob(os.path.join(path, "*", "*.aedat"))
+
+    return sorted(file_paths)
+
+
+def getDictionarySamples(file_paths, settings, compressor="ZSTD", sample_size=DEFAULT_DICTIONARY_SAMPLE_SIZE,
+                         samples_per_file=16, delta_timestamps=False, columnar=False, shuffle=False, bit_packing=False,
+                         prune_bytes=None):
+    """
+    Takes the samples used to train a dictionary from the original aedat NAS files of a dataset. The samples are the
+    bytes that the compressDataFromStoredNASFile function would compress with the same conversion options (see the
+    spikesFileToBytes function). Each file provides up to samples_per_file samples of at most sample_size bytes, evenly
+    spaced along the file.
+
+    :param list file_paths: A list of strings indicating the original aedat file paths of the dataset.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the files.
+    :param string compressor: A string indicating the compressor the dictionary is trained for.
+    :param int sample_size: An int indicating the maximum size of each sample (in bytes).
+    :param int samples_per_file: An int indicating the maximum number of samples taken from each file.
+    :param boolean delta_timestamps: A boolean indicating whether or not timestamps are stored as zigzag-encoded deltas.
+    :param boolean columnar: A boolean indicating whether or not to store all the addresses before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not to shuffle the bytes of each field into byte planes.
+    :param boolean bit_packing: A boolean indicating whether or not addresses and timestamps are bit-packed.
+    :param boolean prune_bytes: A boolean indicating whether or not the unused bytes are discarded (see the
+    calcFinalSizes function). None uses the default of the compressor.
+
+    :return: A list of bytes samples.
+    :rtype: list
+    """
+    samples = []
+    for file_path in file_paths:
+        spikes_file = Loaders.loadAEDAT(file_path, settings)
+
+        # Same conversion as the compressDataFromStoredNASFile function
+        if spikes_file.min_ts != 0:
+            Functions.adapt_timestamps(spikes_file, settings)
+        desired_address_size, desired_timestamp_size = calcRequiredBytes(spikes_file, settings)
+        final_address_size, final_timestamp_size = calcFinalSizes(compressor, desired_address_size,
+                                                                  desired_timestamp_size, verbose=False,
+                                                                  prune_bytes=prune_bytes)
+        bit_widths = calcRequiredBits(spikes_file, settings) if bit_packing else None
+        if delta_timestamps:
+            final_timestamp_size = calcRequiredDeltaBytes(spikes_file.timestamps)
+            if bit_widths is not None:
+                bit_widths = (bit_widths[0], calcRequiredDeltaBits(spikes_file.timestamps))
+        if bit_widths is not None:
+            final_address_size, final_timestamp_size = [int(math.ceil(bits / 8)) for bits in bit_widths]
+
+        data = spikesFileToBytes(spikes_file, settings.address_size, settings.timestamp_size, final_address_size,
+                                 final_timestamp_size, verbose=False, delta_timestamps=delta_timestamps,
+                                 columnar=columnar, shuffle=shuffle, bit_widths=bit_widths)
+
+        # Samples evenly spaced along the file
+        num_samples = max(min(samples_per_file, len(data) // sample_size), 1)
+        step = len(data) // num_samples
+        samples.extend(bytes(data[i * step:i * step + sample_size]) for i in range(num_samples))
+
+    return samples
+
+
+def trainDatasetDictionary(file_paths, settings, compressor="ZSTD", dictionary_size=DEFAULT_DICTIONARY_SIZE,
+                           sample_size=DEFAULT_DICTIONARY_SAMPLE_SIZE, samples_per_file=16, store=True, verbose=True,
+                           **conversion_options):
+    """
+    Trains a dictionary for the compressor from a sample of the original aedat NAS files of a dataset. A dictionary
+    contains the byte patterns that are common to the files of the dataset, so short files do not start from an empty
+    window when they are compressed with it (see the dictionary_id parameter of the compressDataFromStoredNASFile
+    function).
+
+    The samples are the bytes that would be compressed (see the getDictionarySamples function), so the conversion
+    options must be the same ones used to compress the files. Each file provides up to samples_per_file samples of at
+    most sample_size bytes.
+
+    If store is True, the dictionary is stored next to the compressed files of the dataset (see the getDictionaryPath
+    function), from where it is loaded to decompress them. Otherwise, it is only loaded in the current process.
+
+    :param list file_paths: A list of strings indicating the original aedat file paths of the dataset.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the files.
+    :param string compressor: A string indicating the compressor the dictionary is trained for.
+    :param int dictionary_size: An int indicating the maximum size of the dictionary (in bytes).
+    :param int sample_size: An int indicating the maximum size of each sample (in bytes).
+    :param int samples_per_file: An int indicating the maximum number of samples taken from each file.
+    :param boolean store: A boolean indicating whether or not to store the dictionary.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param conversion_options: Keyword arguments passed to the getDictionarySamples function (delta_timestamps,
+    columnar, shuffle, bit_packing and prune_bytes).
+
+    :return: This function returns two different objects, listed below:
+    - dictionary_id (int): An int indicating the ID of the dictionary.
+    - dictionary_path (string): A string indicating where the dictionary has been stored (None if store is False).
+    """
+    start_time = time.time()
+
+    samples = getDictionarySamples(file_paths, settings, compressor, sample_size=sample_size,
+                                   samples_per_file=samples_per_file, **conversion_options)
+
+    dictionary = getCodec(compressor).trainDictionary(samples, dictionary_size)
+
+    if store:
+        dir_path = os.path.dirname(getCompressedFilePath(file_paths[0], compressor))
+        dictionary_id, dictionary_path = storeDictionary(dictionary, dir_path, compressor)
+    else:
+        dictionary_id, dictionary_path = addDictionary(dictionary, compressor), None
+
+    end_time = time.time()
+    if verbose:
+        print("trainDatasetDictionary: " + str(len(dictionary)) + "-byte dictionary " + str(dictionary_id) +
+              " trained from " + str(len(samples)) + " samples in " + '{0:.3f}'.format(end_time - start_time) +
+              " seconds")
+
+    return dictionary_id, dictionary_path
+
+
+def compressNASFileTask(initial_file_path, settings, compressor, overwrite=False, **compression_options):
+    """
+    Compresses and stores an original aedat NAS file with the compressDataFromStoredNASFile function. This is the task
+    that the compressNASFiles function runs in each worker process, so it only returns the data needed to report the
+    progress instead of the compressed file, and it returns the problem found (e.g. an unreadable or corrupt file)
+    instead of raising it.
+
+    :param string initial_file_path: A string indicating the original aedat file path.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
+    :param string compressor: A string indicating the compressor to be used.
+    :param boolean overwrite: A boolean indicating whether or not an existing compressed file must be overwritten.
+    :param compression_options: Keyword arguments passed to the compressDataFromStoredNASFile function.
+
+    :return: This function returns five different objects, listed below:
+    - error (string): A string describing the problem found, or None if the file has been compressed.
+    - final_file_path (string): A string indicating where the compressed file has been written (None if it failed).
+    - original_size (int): An int indicating the size of the original file.
+    - compressed_size (int): An int indicating the size of the compressed file.
+    - elapsed_time (float): A float indicating the time taken to compress the file (seconds).
+    """
+    start_time = time.time()
+
+    error = None
+    final_file_path = None
+    original_size = 0
+    compressed_size = 0
+    try:
+        original_size = os.path.getsize(initial_file_path)
+        _, final_file_path = compressDataFromStoredNASFile(initial_file_path, settings, compressor, store=True,
+                                                           overwrite=overwrite, verbose=False, **compression_options)
+        compressed_size = os.path.getsize(final_file_path)
+    except Exception as exception:
+        error = type(exception).__name__ + ": " + str(exception)
+        final_file_path = None
+
+    end_time = time.time()
+
+    return error, final_file_path, original_size, compressed_size, end_time - start_time
+
+
+def compressNASFiles(file_paths, settings, compressor, workers=None, overwrite=False, verbose=True,
+                     **compression_options):
+    """
+    Compresses and stores a list of original aedat NAS files using a pool of worker processes. Each compressed file is
+    written to the compressedEvents folder, mirroring the layout of the original files (see the getCompressedFilePath
+    function). A file that cannot be compressed (e.g. an unreadable or corrupt recording) does not stop the others: its
+    problem is printed and its compressed file path is None.
+
+    :param list file_paths: A list of strings indicating the original aedat file paths (see the findAEDATFiles function).
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the files.
+    :param string compressor: A string indicating the compressor to be used.
+    :param int workers: An int indicating the number of worker processes. None uses one per CPU.
+    :param boolean overwrite: A boolean indicating whether or not existing compressed files must be overwritten.
+    :param boolean verbose: A boolean indicating whether or not the progress and the aggregate throughput are printed.
+    :param compression_options: Keyword arguments passed to the compressDataFromStoredNASFile function.
+
+    :return: A dict that maps each original file path to the path of its compressed file, or to None if it could not be
+    compressed.
+    :rtype: dict
+    """
+    start_time = time.time()
+
+    compressed_file_paths = {}
+    errors = {}
+    total_original_size = 0
+    total_compressed_size = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(compressNASFileTask, file_path, settings, compressor, overwrite=overwrite,
+                                   **compression_options): file_path for file_path in file_paths}
+
+        for future in as_completed(futures):
+            file_path = futures[future]
+            error, final_file_path, original_size, compressed_size, elapsed_time = future.result()
+
+            compressed_file_paths[file_path] = final_file_path
+            if error is not None:
+                errors[file_path] = error
+            else:
+                total_original_size += original_size
+                total_compressed_size += compressed_size
+
+            if verbose:
+                if error is not None:
+                    result = " FAILED: " + error
+                else:
+                    result = " -> " + final_file_path + " (" + \
+                             '{0:.2f}'.format(original_size / max(compressed_size, 1)) + "x in " + \
+                             '{0:.3f}'.format(elapsed_time) + " seconds)"
+                print("[" + str(len(compressed_file_paths)) + "/" + str(len(file_paths)) + "] " + file_path + result)
+
+    end_time = time.time()
+    if verbose:
+        elapsed_time = max(end_time - start_time, 1e-9)
+        print("\nCompressed " + str(len(file_paths) - len(errors)) + " files (" +
+              '{0:.1f}'.format(total_original_size / 1e6) + " MB -> " + '{0:.1f}'.format(total_compressed_size / 1e6) +
+              " MB, " + '{0:.2f}'.format(total_original_size / max(total_compressed_size, 1)) + "x), " +
+              str(len(errors)) + " failed, in " + '{0:.3f}'.format(elapsed_time) + " seconds")
+        for file_path, error in sorted(errors.items()):
+            print("FAILED: " + file_path + ": " + error)
+        print("Throughput: " + '{0:.1f}'.format(total_original_size / 1e6 / elapsed_time) + " MB/s, " +
+              '{0:.1f}'.format(len(file_paths) / elapsed_time) + " files/s")
+
+    return compressed_file_paths
+
+
+def verifyCompressedFileTask(file_path):
+    """
+    Verifies a compressed file with the verifyCompressedFile function. This is the task that the verifyCompressedFiles
+    function runs in each worker process, so it returns the problem found instead of raising it.
+
+    :param string file_path: A string indicating the path of the compressed file.
+
+    :return: This function returns four different objects, listed below:
+    - error (string): A string describing the problem found, or None if the file is valid.
+    - checksums (boolean): A boolean indicating whether or not the file contains checksums (X option).
+    - compressed_size (int): An int indicating the size of the compressed file.
+    - elapsed_time (float): A float indicating the time taken to verify the file (seconds).
+    """
+    start_time = time.time()
+
+    error = None
+    checksums = False
+    compressed_size = 0
+    try:
+        compressed_size = os.path.getsize(file_path)
+        header = verifyCompressedFile(file_path)
+        checksums = header.getOption("X") is not None
+    except (OSError, ValueError) as exception:
+        error = str(exception)
+
+    end_time = time.time()
+
+    return error, checksums, compressed_size, end_time - start_time
+
+
+def verifyCompressedFiles(file_paths, workers=None, verbose=True):
+    """
+    Verifies the integrity of a list of compressed files (e.g. a whole compressedEvents folder, see the findAEDATFiles
+    function) using a pool of worker processes. Each file is verified with the verifyCompressedFile function, which
+    decompresses it without converting its spikes, so the throughput is usually bounded by the storage.
+
+    :param list file_paths: A list of strings indicating the compressed file paths.
+    :param int workers: An int indicating the number of worker processes. None uses one per CPU.
+    :param boolean verbose: A boolean indicating whether or not the result of each file and the aggregate throughput are
+    printed.
+
+    :return: A dict that maps each compressed file path to the problem found (a string), or to None if it is valid.
+    :rtype: dict
+    """
+    start_time = time.time()
+
+    errors = {}
+    total_compressed_size = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(verifyCompressedFileTask, file_path): file_path for file_path in file_paths}
+
+        for future in as_completed(futures):
+            file_path = futures[future]
+            error, checksums, compressed_size, elapsed_time = future.result()
+
+            errors[file_path] = error
+            total_compressed_size += compressed_size
+
+            if verbose:
+                if error is not None:
+                    result = "FAILED: " + error
+                else:
+                    result = "OK" if checksums else "OK (without checksums)"
+                print("[" + str(len(errors)) + "/" + str(len(file_paths)) + "] " + file_path + " " + result + " (" +
+                      '{0:.3f}'.format(elapsed_time) + " seconds)")
+
+    end_time = time.time()
+    if verbose:
+        elapsed_time = max(end_time - start_time, 1e-9)
+        num_failed = sum(error is not None for error in errors.values())
+        print("\nVerified " + str(len(file_paths)) + " files (" + '{0:.1f}'.format(total_compressed_size / 1e6) +
+              " MB), " + str(num_failed) + " failed, in " + '{0:.3f}'.format(elapsed_time) + " seconds")
+        print("Throughput: " + '{0:.1f}'.format(total_compressed_size / 1e6 / elapsed_time) + " MB/s, " +
+              '{0:.1f}'.format(len(file_paths) / elapsed_time) + " files/s")
+
+    return errors
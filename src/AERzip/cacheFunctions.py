@@ -0,0 +1,260 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from pyNAVIS import SpikesFile
+
+from AERzip.compressionFunctions import extractDataFromCompressedFile, readCompressedFileHeader, DEFAULT_READ_SIZE
+
+# Default maximum size (bytes) of the decoded arrays kept by a DecodedCache
+DEFAULT_CACHE_SIZE = 1 << 30
+
+# Version of the layout of the cache entries. It is part of the keys, so entries of other versions are never read
+CACHE_VERSION = 1
+
+# Temporary folders older than this (seconds) were left by processes that died while storing an entry
+STALE_TEMP_AGE = 3600
+
+
+class DecodedCache:
+    """
+    A DecodedCache keeps the decoded addresses and timestamps of compressed files in a folder, as .npy files, so that
+    decoding a file again (e.g. in every epoch of a training) only maps its arrays into memory (np.load with
+    mmap_mode="r") instead of decompressing it.
+
+    Entries are keyed by a hash of the content of the compressed file and by the decode options that change the arrays
+    (see the getKey function), so a modified file is never read from the cache. When the arrays of the cache exceed
+    max_size bytes, the least recently used entries are removed.
+
+    Several processes can share the same folder: each entry is written into a temporary folder that is renamed when it
+    is complete, so an entry is either complete or not found, and an entry removed while it is being read is decoded
+    again. The arrays returned by the cache are read-only.
+
+    :param string cache_dir: A string indicating the folder of the cache. It is created if it does not exist.
+    :param int max_size: An int indicating the maximum size of the arrays of the cache (bytes).
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_CACHE_SIZE):
+        if max_size < 0:
+            raise ValueError("The maximum size of the cache must not be negative.")
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Hashes of the files already hashed by this process, keyed by their path, size and modification time
+        self.file_hashes = {}
+
+    def getFileHash(self, file_path):
+        """
+        Calculates the hash of the content of a file (BLAKE2b). Files that have not changed since they were hashed by
+        this DecodedCache are not read again.
+
+        :param string file_path: A string indicating the path of the file.
+
+        :return: A string with the hexadecimal hash.
+        :rtype: string
+        """
+        stat = os.stat(file_path)
+        file_id = (os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        file_hash = self.file_hashes.get(file_id)
+
+        if file_hash is None:
+            hash_function = hashlib.blake2b(digest_size=16)
+            with open(file_path, "rb") as file:
+                for data in iter(lambda: file.read(DEFAULT_READ_SIZE), b""):
+                    hash_function.update(data)
+            file_hash = hash_function.hexdigest()
+            self.file_hashes[file_id] = file_hash
+
+        return file_hash
+
+    def getKey(self, file_path, native=True):
+        """
+        Calculates the key of the entry of a compressed file.
+
+        :param string file_path: A string indicating the compressed aedat file path.
+        :param boolean native: A boolean indicating whether or not the arrays are native-endian (see the
+        bytesToSpikesFile function).
+
+        :return: A string with the key.
+        :rtype: string
+        """
+        return self.getFileHash(file_path) + "_v" + str(CACHE_VERSION) + ("_native" if native else "_big")
+
+    def getEntryPath(self, key):
+        """
+        Returns the folder of the entry of a key.
+
+        :param string key: A string with the key of the entry (see the getKey function).
+
+        :return: A string indicating the folder of the entry.
+        :rtype: string
+        """
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key):
+        """
+        Maps the arrays of an entry into memory and marks the entry as recently used.
+
+        :param string key: A string with the key of the entry (see the getKey function).
+
+        :return: A SpikesFile object from pyNAVIS with the read-only arrays of the entry, or None if the entry is not
+        found.
+        :rtype: SpikesFile
+        """
+        entry_path = self.getEntryPath(key)
+        try:
+            addresses = np.load(os.path.join(entry_path, "addresses.npy"), mmap_mode="r")
+            timestamps = np.load(os.path.join(entry_path, "timestamps.npy"), mmap_mode="r")
+            os.utime(entry_path)
+        except (FileNotFoundError, ValueError):
+            # The entry does not exist or has just been removed by another process
+            return None
+
+        return SpikesFile(addresses, timestamps)
+
+    def store(self, key, spikes_file):
+        """
+        Stores the arrays of a SpikesFile as an entry of the cache, and removes the least recently used entries if the
+        cache exceeds its maximum size. If another process has stored the same entry, it is kept.
+
+        :param string key: A string with the key of the entry (see the getKey function).
+        :param SpikesFile spikes_file: The SpikesFile object from pyNAVIS.
+
+        :return: None
+        """
+        temp_path = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            np.save(os.path.join(temp_path, "addresses.npy"), np.asarray(spikes_file.addresses))
+            np.save(os.path.join(temp_path, "timestamps.npy"), np.asarray(spikes_file.timestamps))
+
+            # Renaming a folder is atomic, and fails if the entry already exists
+            os.rename(temp_path, self.getEntryPath(key))
+        except OSError:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+        self.evict()
+
+    def getEntries(self):
+        """
+        Lists the entries of the cache.
+
+        :return: A list of (last_use, size, key) tuples, from the least recently used entry to the most recently used
+        one.
+        :rtype: list
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith("."):
+                continue
+
+            entry_path = self.getEntryPath(name)
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(entry_path))
+                entries.append((os.stat(entry_path).st_mtime, size, name))
+            except FileNotFoundError:
+                pass
+
+        return sorted(entries)
+
+    def getSize(self):
+        """
+        Calculates the size of the arrays of the cache.
+
+        :return: An int indicating the size (bytes).
+        :rtype: int
+        """
+        return sum(size for _, size, _ in self.getEntries())
+
+    def remove(self, key):
+        """
+        Removes an entry of the cache. Processes that have mapped its arrays into memory can still read them.
+
+        :param string key: A string with the key of the entry (see the getKey function).
+
+        :return: None
+        """
+        # The entry is renamed first, so no process finds it half removed
+        temp_path = os.path.join(self.cache_dir, ".del-" + key + "-" + str(os.getpid()))
+        try:
+            os.rename(self.getEntryPath(key), temp_path)
+        except OSError:
+            return
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache does not exceed its maximum size, and the temporary
+        folders left by processes that died while storing an entry.
+
+        :return: An int indicating the number of removed entries.
+        :rtype: int
+        """
+        entries = self.getEntries()
+        cache_size = sum(size for _, size, _ in entries)
+
+        removed_entries = 0
+        for _, size, key in entries:
+            if cache_size <= self.max_size:
+                break
+            self.remove(key)
+            cache_size -= size
+            removed_entries += 1
+
+        for name in os.listdir(self.cache_dir):
+            temp_path = os.path.join(self.cache_dir, name)
+            try:
+                if name.startswith(".") and time.time() - os.stat(temp_path).st_mtime > STALE_TEMP_AGE:
+                    shutil.rmtree(temp_path, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+
+        return removed_entries
+
+    def clear(self):
+        """
+        Removes all the entries of the cache.
+
+        :return: None
+        """
+        for _, _, key in self.getEntries():
+            self.remove(key)
+
+    def extractDataFromCompressedFile(self, file_path, verbose=True, native=True, **decode_options):
+        """
+        Cached counterpart of the extractDataFromCompressedFile function. If the cache contains the decoded arrays of
+        the file, they are mapped into memory instead of decompressing the file. Otherwise, the file is decompressed and
+        its arrays are stored in the cache.
+
+        :param string file_path: A string indicating the compressed aedat file path.
+        :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+        :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead
+        of big-endian ones (see the bytesToSpikesFile function).
+        :param decode_options: Keyword arguments passed to the extractDataFromCompressedFile function on a cache miss.
+
+        :return: The same objects as the extractDataFromCompressedFile function.
+        """
+        start_time = time.time()
+        key = self.getKey(file_path, native=native)
+
+        spikes_file = self.load(key)
+        if spikes_file is not None:
+            with open(file_path, "rb") as file:
+                header = readCompressedFileHeader(file)
+
+            end_time = time.time()
+            if verbose:
+                print("DecodedCache: " + str(len(spikes_file.timestamps)) + " spikes of " + file_path +
+                      " loaded from the cache in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+            return header, spikes_file, spikes_file.addresses.dtype.itemsize, spikes_file.timestamps.dtype.itemsize
+
+        header, spikes_file, final_address_size, final_timestamp_size = \
+            extractDataFromCompressedFile(file_path, verbose=verbose, native=native, **decode_options)
+        self.store(key, spikes_file)
+
+        return header, spikes_file, final_address_size, final_timestamp_size
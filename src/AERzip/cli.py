@@ -0,0 +1,217 @@
+import argparse
+import os
+
+from pyNAVIS import MainSettings
+
+from AERzip.batchFunctions import findAEDATFiles, compressNASFiles, trainDatasetDictionary, verifyCompressedFiles
+from AERzip.codecFunctions import getCodecNames
+from AERzip.compressionFunctions import getCompressedFileInfo
+from AERzip.tunerFunctions import tuneNASFiles, TUNING_GOALS, DEFAULT_TUNING_EVENTS
+
+
+def parseSettings(settings_values):
+    """
+    Builds a MainSettings object from pyNAVIS from a list of "name=value" strings (e.g. ["num_channels=64",
+    "mono_stereo=1", "ts_tick=0.2"]). The names are the arguments of MainSettings, and the values are parsed as ints or
+    floats when possible. pyNAVIS messages are disabled unless verbose is specified.
+
+    :param list settings_values: A list of "name=value" strings.
+
+    :return: A MainSettings object from pyNAVIS.
+    :rtype: MainSettings
+    """
+    settings = {"verbose": False}
+    for settings_value in settings_values:
+        name, separator, value = settings_value.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError("Settings must be specified as name=value, not '" + settings_value + "'")
+
+        for value_type in (int, float):
+            try:
+                value = value_type(value)
+                break
+            except ValueError:
+                pass
+        if value in ("True", "False"):
+            value = value == "True"
+
+        settings[name] = value
+
+    return MainSettings(**settings)
+
+
+def main(argv=None):
+    """
+    Entry point of the aerzip command. Run "aerzip --help" to see the available commands and their arguments.
+
+    :param list argv: A list of strings with the command line arguments. None uses sys.argv.
+
+    :return: An int with the exit status.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(prog="aerzip", description="Useful tools to compress and decompress AEDAT files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # --- compress command ---
+    compress_parser = subparsers.add_parser("compress", help="Compress original aedat NAS files in parallel",
+                                            description="Compress the original aedat NAS files of an aedat file, a "
+                                                        "dataset folder (events/dataset) or a main folder (events). "
+                                                        "Compressed files are written to compressedEvents/"
+                                                        "<dataset>_<compressor>. The exit status is 1 if any file "
+                                                        "could not be compressed.")
+    compress_parser.add_argument("path", help="aedat file, dataset folder or main folder")
+    compress_parser.add_argument("--settings", nargs="+", required=True, metavar="NAME=VALUE",
+                                 help="pyNAVIS MainSettings of the files (e.g. num_channels=64 mono_stereo=1 "
+                                      "address_size=2 ts_tick=0.2)")
+    compress_parser.add_argument("--compressor", default="ZSTD", choices=getCodecNames(),
+                                 help="compressor to be used (default: ZSTD)")
+    compress_parser.add_argument("--level", type=int, default=None,
+                                 help="compression level (default: the default level of the compressor)")
+    compress_parser.add_argument("-j", "--jobs", type=int, default=None,
+                                 help="number of worker processes (default: one per CPU)")
+    compress_parser.add_argument("--overwrite", action="store_true", help="overwrite existing compressed files")
+    compress_parser.add_argument("--chunk-size", type=int, default=None,
+                                 help="compress in streaming mode, reading CHUNK_SIZE events at once")
+    compress_parser.add_argument("--chunked", action="store_true", help="write chunked containers")
+    compress_parser.add_argument("--delta", action="store_true", help="store zigzag-encoded timestamp deltas")
+    compress_parser.add_argument("--columnar", action="store_true", help="store addresses and timestamps in columns")
+    compress_parser.add_argument("--shuffle", action="store_true", help="shuffle the bytes of each field")
+    compress_parser.add_argument("--bit-packing", action="store_true",
+                                 help="store the fields with their exact bit widths")
+    compress_parser.add_argument("--threads", type=int, default=1,
+                                 help="number of threads used to compress each file (default: 1)")
+    compress_parser.add_argument("--dictionary", action="store_true",
+                                 help="train a dictionary for each dataset and compress its files with it (ZSTD only)")
+    compress_parser.add_argument("--group-channels", type=int, default=None,
+                                 help="split the spikes into groups of this number of channels, which can be "
+                                      "extracted alone")
+    compress_parser.add_argument("--split-polarity", action="store_true",
+                                 help="split the spikes into groups by polarity, which can be extracted alone")
+
+    # --- tune command ---
+    tune_parser = subparsers.add_parser("tune", help="Find the best compression configuration for some files",
+                                        description="Benchmark combinations of compressor, level, field widths and "
+                                                    "transforms on a sample of the original aedat NAS files and print "
+                                                    "the best configuration for the stated goal.")
+    tune_parser.add_argument("path", help="aedat file, dataset folder or main folder")
+    tune_parser.add_argument("--settings", nargs="+", required=True, metavar="NAME=VALUE",
+                             help="pyNAVIS MainSettings of the files (e.g. num_channels=64 mono_stereo=1 "
+                                  "address_size=2 ts_tick=0.2)")
+    tune_parser.add_argument("--compressors", nargs="+", default=None, choices=getCodecNames(),
+                             help="compressors to be evaluated (default: all)")
+    tune_parser.add_argument("--goal", default="ratio", choices=TUNING_GOALS,
+                             help="measure to maximize (default: ratio)")
+    tune_parser.add_argument("--min-ratio", type=float, default=None, help="minimum compression ratio")
+    tune_parser.add_argument("--min-decode-speed", type=float, default=None,
+                             help="minimum decompression speed (MB/s)")
+    tune_parser.add_argument("--max-encode-time", type=float, default=None,
+                             help="maximum time to compress the sample of each file (seconds)")
+    tune_parser.add_argument("--max-events", type=int, default=DEFAULT_TUNING_EVENTS,
+                             help="maximum number of events taken from each file (default: " +
+                                  str(DEFAULT_TUNING_EVENTS) + ")")
+    tune_parser.add_argument("--max-files", type=int, default=4,
+                             help="maximum number of files of the sample (default: 4)")
+
+    # --- info command ---
+    info_parser = subparsers.add_parser("info", help="Describe compressed files without decompressing them",
+                                        description="Print the compressor, number of spikes, timestamp range and "
+                                                    "compression ratio of compressed files, read from their headers.")
+    info_parser.add_argument("paths", nargs="+", help="compressed files")
+
+    # --- verify command ---
+    verify_parser = subparsers.add_parser("verify", help="Verify the integrity of compressed files in parallel",
+                                          description="Decompress the compressed files of a compressed file, a "
+                                                      "dataset folder (compressedEvents/dataset_ZSTD) or a main folder "
+                                                      "(compressedEvents) and check their sizes and checksums. The "
+                                                      "exit status is 1 if any file is not valid.")
+    verify_parser.add_argument("path", help="compressed file, dataset folder or main folder")
+    verify_parser.add_argument("-j", "--jobs", type=int, default=None,
+                               help="number of worker processes (default: one per CPU)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        for file_path in args.paths:
+            try:
+                header, compressed_size = getCompressedFileInfo(file_path)
+            except (OSError, ValueError) as error:
+                parser.error(str(error))
+
+            description = [file_path, header.compressor, "v" + str(header.header_version)]
+            if header.num_events is not None:
+                description.append(str(header.num_events) + " spikes")
+            if header.min_ts is not None:
+                description.append("timestamps " + str(header.min_ts) + "-" + str(header.max_ts))
+            if header.data_size:
+                description.append("ratio " + '{0:.2f}'.format(header.data_size / compressed_size))
+            print(", ".join(description))
+
+    if args.command == "verify":
+        file_paths = findAEDATFiles(args.path)
+        if not file_paths:
+            parser.error("No compressed files found in " + args.path)
+
+        errors = verifyCompressedFiles(file_paths, workers=args.jobs)
+        if any(error is not None for error in errors.values()):
+            return 1
+
+    if args.command == "tune":
+        try:
+            settings = parseSettings(args.settings)
+        except (argparse.ArgumentTypeError, TypeError) as error:
+            parser.error(str(error))
+
+        file_paths = findAEDATFiles(args.path)
+        if not file_paths:
+            parser.error("No aedat files found in " + args.path)
+
+        # Files evenly spaced along the list, so every dataset of a main folder is likely to be represented
+        step = max(len(file_paths) // args.max_files, 1)
+        try:
+            tuneNASFiles(file_paths[::step][:args.max_files], settings, max_events=args.max_events,
+                         compressors=args.compressors, goal=args.goal, min_ratio=args.min_ratio,
+                         min_decode_speed=args.min_decode_speed, max_encode_time=args.max_encode_time)
+        except ValueError as error:
+            parser.error(str(error))
+
+    if args.command == "compress":
+        try:
+            settings = parseSettings(args.settings)
+        except (argparse.ArgumentTypeError, TypeError) as error:
+            parser.error(str(error))
+
+        file_paths = findAEDATFiles(args.path)
+        if not file_paths:
+            parser.error("No aedat files found in " + args.path)
+
+        compression_options = dict(workers=args.jobs, overwrite=args.overwrite, chunk_size=args.chunk_size,
+                                   chunked=args.chunked, delta_timestamps=args.delta, columnar=args.columnar,
+                                   shuffle=args.shuffle, bit_packing=args.bit_packing, threads=args.threads,
+                                   level=args.level, group_channels=args.group_channels,
+                                   split_polarity=args.split_polarity)
+
+        compressed_file_paths = {}
+        if args.dictionary:
+            # Each dataset has its own dictionary, so the files are compressed dataset by dataset
+            datasets = {}
+            for file_path in file_paths:
+                datasets.setdefault(os.path.dirname(file_path), []).append(file_path)
+
+            for dataset_file_paths in datasets.values():
+                try:
+                    dictionary_id, _ = trainDatasetDictionary(dataset_file_paths, settings, args.compressor,
+                                                              delta_timestamps=args.delta, columnar=args.columnar,
+                                                              shuffle=args.shuffle, bit_packing=args.bit_packing)
+                except ValueError as error:
+                    parser.error(str(error))
+
+                compressed_file_paths.update(compressNASFiles(dataset_file_paths, settings, args.compressor,
+                                                              dictionary_id=dictionary_id, **compression_options))
+        else:
+            compressed_file_paths = compressNASFiles(file_paths, settings, args.compressor, **compression_options)
+
+        # The files that could not be compressed have been reported
+        if any(compressed_file_path is None for compressed_file_path in compressed_file_paths.values()):
+            return 1
+
+    return 0
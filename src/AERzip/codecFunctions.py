@@ -0,0 +1,767 @@
+import copy
+import importlib
+import threading
+import zlib
+
+
+class Codec:
+    """
+    A Codec wraps a compression library so that it can be used by the compression functions of AERzip through the codec
+    registry (see the registerCodec and getCodec functions). Each codec is registered with the name that is stored in
+    the compressor field of the CompressedFileHeader.
+
+    The compression library is imported the first time it is used, so processes that only use one codec do not pay the
+    import cost of the others (or need them to be installed).
+
+    To add a new codec, subclass Codec, set its name and module_name, implement the compress, decompress,
+    compressStream and decompressStream functions and register an instance with the registerCodec function.
+
+    Codecs whose supports_dictionaries attribute is True can also compress with trained dictionaries (see the
+    trainDictionary function). The rest of them raise a ValueError if a dictionary is specified.
+
+    :param int level: An int indicating the default compression level. None uses the default level of the library.
+    :param options: Keyword arguments passed to the compression functions of the library (e.g. the block size).
+    """
+
+    # Name stored in the compressor field of the CompressedFileHeader
+    name = None
+
+    # Name of the module of the compression library
+    module_name = None
+
+    # Whether or not addresses and timestamps should be pruned to their required bytes (see the calcFinalSizes function)
+    prune_bytes = False
+
+    # Whether or not the codec can compress with trained dictionaries
+    supports_dictionaries = False
+
+    def __init__(self, level=None, **options):
+        self.level = level
+        self.options = options
+        self._module = None
+
+    @property
+    def module(self):
+        """
+        The module of the compression library, which is imported the first time it is used.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self.module_name)
+
+        return self._module
+
+    def getLevel(self, level=None):
+        """
+        Returns the compression level to be used: the specified level or, if it is None, the default level of the codec.
+
+        :param int level: An int indicating the compression level. None uses the default level of the codec.
+
+        :return: An int indicating the compression level, or None to use the default level of the library.
+        :rtype: int
+        """
+        return self.level if level is None else level
+
+    def checkDictionary(self, dictionary):
+        """
+        Checks that no dictionary is specified if the codec does not support dictionaries.
+
+        :param bytes dictionary: The data of a trained dictionary, or None.
+
+        :raises ValueError: If a dictionary is specified and the codec does not support dictionaries.
+        :return: None
+        """
+        if dictionary is not None and not self.supports_dictionaries:
+            raise ValueError("The " + self.name + " compressor does not support dictionaries.")
+
+    def compress(self, data, level=None, dictionary=None):
+        """
+        Compresses the input data.
+
+        :param bytearray, bytes data: The input data.
+        :param int level: An int indicating the compression level. None uses the default level of the codec.
+        :param bytes dictionary: The data of the trained dictionary to be used, or None.
+
+        :return: The output data (compressed data).
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    def decompress(self, compressed_data, dictionary=None):
+        """
+        Decompresses the input compressed data.
+
+        :param bytearray, bytes compressed_data: The input data.
+        :param bytes dictionary: The data of the trained dictionary to be used, or None.
+
+        :return: The output data (decompressed data).
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    def decompressInto(self, compressed_data, output, dictionary=None):
+        """
+        Decompresses the input compressed data into a preallocated buffer of the size of the decompressed data.
+
+        :param bytearray, bytes compressed_data: The input data.
+        :param memoryview output: A writable buffer where the decompressed data is written.
+        :param bytes dictionary: The data of the trained dictionary to be used, or None.
+
+        :return: None
+        """
+        output[:] = self.decompress(compressed_data, dictionary=dictionary)
+
+    def compressStream(self, data_chunks, file, data_size=None, level=None, dictionary=None):
+        """
+        Compresses a sequence of data chunks into a single compressed stream which is written to a file object as it is
+        produced.
+
+        :param iterable data_chunks: An iterable of bytearray (or bytes) objects containing the data to be compressed.
+        :param file file: A binary file object where the compressed data is written.
+        :param int data_size: An int indicating the total size of the data (in bytes), if known.
+        :param int level: An int indicating the compression level. None uses the default level of the codec.
+        :param bytes dictionary: The data of the trained dictionary to be used, or None.
+
+        :return: None
+        """
+        raise NotImplementedError
+
+    def decompressStream(self, compressed_chunks, dictionary=None):
+        """
+        Decompresses a compressed stream that is received as a sequence of compressed chunks.
+
+        :param iterable compressed_chunks: An iterable of bytearray (or bytes) objects containing the compressed stream.
+        :param bytes dictionary: The data of the trained dictionary to be used, or None.
+
+        :return: A generator of bytes objects containing the decompressed data.
+        :rtype: generator
+        """
+        raise NotImplementedError
+
+    def getDecompressedSize(self, compressed_data):
+        """
+        Reads the size of the decompressed data from the beginning of a compressed stream, if the codec stores it.
+
+        :param bytearray, bytes compressed_data: The beginning of the compressed stream.
+
+        :return: An int indicating the size of the decompressed data, or None if it is unknown.
+        :rtype: int
+        """
+        return None
+
+    def trainDictionary(self, samples, dictionary_size):
+        """
+        Trains a dictionary from a list of samples of the data to be compressed.
+
+        :param list samples: A list of bytes objects containing the samples.
+        :param int dictionary_size: An int indicating the maximum size of the dictionary (in bytes).
+
+        :return: The data of the trained dictionary.
+        :rtype: bytes
+        """
+        raise ValueError("The " + self.name + " compressor does not support dictionaries.")
+
+    def getDictionaryID(self, dictionary):
+        """
+        Returns the ID of a trained dictionary, which is stored in the CompressedFileHeader of the files compressed with
+        it.
+
+        :param bytes dictionary: The data of the trained dictionary.
+
+        :return: An int indicating the ID of the dictionary (32 bits).
+        :rtype: int
+        """
+        raise ValueError("The " + self.name + " compressor does not support dictionaries.")
+
+    def createContext(self, level=None, dictionary=None):
+        """
+        Creates a context that compresses and decompresses with a fixed level and dictionary, reusing the objects of the
+        compression library between calls (see the CodecSession class). Contexts cannot be shared between threads.
+
+        Codecs whose library has no reusable objects return a CodecContext that calls the codec functions.
+
+        :param int level: An int indicating the compression level. None uses the default level of the codec.
+        :param bytes dictionary: The data of the trained dictionary to be used, or None.
+
+        :return: The context.
+        :rtype: CodecContext
+        """
+        self.checkDictionary(dictionary)
+
+        return CodecContext(self, level=level, dictionary=dictionary)
+
+
+class CodecContext:
+    """
+    A CodecContext compresses and decompresses with a fixed codec, level and dictionary (see the createContext function
+    of the Codec class). Its output is the same as the one of the codec functions.
+
+    :param Codec codec: The codec.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param bytes dictionary: The data of the trained dictionary to be used, or None.
+    """
+
+    def __init__(self, codec, level=None, dictionary=None):
+        self.codec = codec
+        self.level = level
+        self.dictionary = dictionary
+
+    def compress(self, data):
+        return self.codec.compress(data, level=self.level, dictionary=self.dictionary)
+
+    def decompress(self, compressed_data):
+        return self.codec.decompress(compressed_data, dictionary=self.dictionary)
+
+    def decompressInto(self, compressed_data, output):
+        self.codec.decompressInto(compressed_data, output, dictionary=self.dictionary)
+
+
+class ZstdCodec(Codec):
+    """
+    Zstandard codec (zstandard library). The options are passed to the ZstdCompressor class (e.g. threads).
+
+    The contexts bound to a trained dictionary are cached (per thread, since they cannot be shared between threads), so
+    the dictionary is only loaded once instead of once per compressed file or chunk.
+    """
+    name = "ZSTD"
+    module_name = "zstandard"
+    supports_dictionaries = True
+
+    def __init__(self, level=None, **options):
+        super().__init__(level=level, **options)
+        self._local = threading.local()
+
+    def getContexts(self):
+        """
+        Returns the cache of contexts bound to dictionaries of the calling thread.
+
+        :return: A dict that maps ("compressor", dictionary, level) and ("decompressor", dictionary) tuples to contexts.
+        :rtype: dict
+        """
+        contexts = getattr(self._local, "contexts", None)
+        if contexts is None:
+            contexts = self._local.contexts = {}
+
+        return contexts
+
+    def getCompressor(self, level=None, dictionary=None):
+        level = self.getLevel(level)
+        if dictionary is None:
+            return self.module.ZstdCompressor(**({} if level is None else {"level": level}), **self.options)
+
+        contexts = self.getContexts()
+        key = ("compressor", dictionary, level)
+        cctx = contexts.get(key)
+        if cctx is None:
+            dict_data = self.module.ZstdCompressionDict(dictionary)
+            cctx = contexts[key] = self.module.ZstdCompressor(dict_data=dict_data,
+                                                              **({} if level is None else {"level": level}),
+                                                              **self.options)
+
+        return cctx
+
+    def getDecompressor(self, dictionary=None):
+        if dictionary is None:
+            return self.module.ZstdDecompressor()
+
+        contexts = self.getContexts()
+        key = ("decompressor", dictionary)
+        dctx = contexts.get(key)
+        if dctx is None:
+            dctx = contexts[key] = self.module.ZstdDecompressor(dict_data=self.module.ZstdCompressionDict(dictionary))
+
+        return dctx
+
+    def compress(self, data, level=None, dictionary=None):
+        return self.getCompressor(level, dictionary).compress(data)
+
+    def decompress(self, compressed_data, dictionary=None):
+        return self.getDecompressor(dictionary).decompress(compressed_data)
+
+    def decompressInto(self, compressed_data, output, dictionary=None):
+        # Decompress directly into the output buffer
+        reader = self.getDecompressor(dictionary).stream_reader(compressed_data)
+        position = 0
+        while position < len(output):
+            read_size = reader.readinto(output[position:])
+            if read_size == 0:
+                raise ValueError("The compressed data is truncated")
+            position += read_size
+
+    def compressStream(self, data_chunks, file, data_size=None, level=None, dictionary=None):
+        writer = self.getCompressor(level, dictionary).stream_writer(file, size=-1 if data_size is None else data_size,
+                                                                     closefd=False)
+        for chunk in data_chunks:
+            writer.write(chunk)
+        writer.close()
+
+    def decompressStream(self, compressed_chunks, dictionary=None):
+        dctx = self.getDecompressor(dictionary).decompressobj()
+        for compressed_chunk in compressed_chunks:
+            data = dctx.decompress(compressed_chunk)
+            if data:
+                yield data
+
+    def getDecompressedSize(self, compressed_data):
+        try:
+            data_size = self.module.frame_content_size(compressed_data)
+        except self.module.ZstdError:
+            return None
+
+        return data_size if data_size >= 0 else None
+
+    def trainDictionary(self, samples, dictionary_size):
+        try:
+            return self.module.train_dictionary(dictionary_size, samples).as_bytes()
+        except self.module.ZstdError as error:
+            raise ValueError("The dictionary could not be trained (" + str(error) + "). More samples are needed.")
+
+    def getDictionaryID(self, dictionary):
+        return self.module.ZstdCompressionDict(dictionary).dict_id()
+
+    def createContext(self, level=None, dictionary=None):
+        return ZstdContext(self, level=level, dictionary=dictionary)
+
+
+class ZstdContext(CodecContext):
+    """
+    A CodecContext of the ZstdCodec that creates its ZstdCompressor and ZstdDecompressor once. The compressed frames are
+    the same ones that a new ZstdCompressor with the same parameters would produce.
+    """
+
+    def __init__(self, codec, level=None, dictionary=None):
+        super().__init__(codec, level=level, dictionary=dictionary)
+        self.cctx = codec.getCompressor(level, dictionary)
+        self.dctx = codec.getDecompressor(dictionary)
+
+    def compress(self, data):
+        return self.cctx.compress(data)
+
+    def decompress(self, compressed_data):
+        return self.dctx.decompress(compressed_data)
+
+    def decompressInto(self, compressed_data, output):
+        # Same as the decompressInto function of the ZstdCodec class, with the decompressor of the context
+        reader = self.dctx.stream_reader(compressed_data)
+        position = 0
+        while position < len(output):
+            read_size = reader.readinto(output[position:])
+            if read_size == 0:
+                raise ValueError("The compressed data is truncated")
+            position += read_size
+
+
+class LZ4Codec(Codec):
+    """
+    LZ4 frame codec (lz4 library). The options are passed to the lz4.frame compression functions (e.g. block_size).
+    """
+    name = "LZ4"
+    module_name = "lz4.frame"
+
+    def getOptions(self, level=None):
+        level = self.getLevel(level)
+        if level is None:
+            return self.options
+
+        return dict(self.options, compression_level=level)
+
+    def compress(self, data, level=None, dictionary=None):
+        self.checkDictionary(dictionary)
+        return self.module.compress(data, **self.getOptions(level))
+
+    def decompress(self, compressed_data, dictionary=None):
+        self.checkDictionary(dictionary)
+        return self.module.decompress(compressed_data)
+
+    def compressStream(self, data_chunks, file, data_size=None, level=None, dictionary=None):
+        self.checkDictionary(dictionary)
+        cctx = self.module.LZ4FrameCompressor(**self.getOptions(level))
+        file.write(cctx.begin(0 if data_size is None else data_size))
+        for chunk in data_chunks:
+            file.write(cctx.compress(chunk))
+        file.write(cctx.flush())
+
+    def decompressStream(self, compressed_chunks, dictionary=None):
+        self.checkDictionary(dictionary)
+        dctx = self.module.LZ4FrameDecompressor()
+        for compressed_chunk in compressed_chunks:
+            data = dctx.decompress(compressed_chunk)
+            if data:
+                yield data
+
+    def getDecompressedSize(self, compressed_data):
+        try:
+            data_size = self.module.get_frame_info(compressed_data)["content_size"]
+        except RuntimeError:
+            return None
+
+        return data_size if data_size > 0 else None
+
+
+class LZMACodec(Codec):
+    """
+    LZMA codec (pylzma library). pylzma has no compression levels, so the compression is tuned through the options
+    passed to its compression functions (e.g. dictionary or fastBytes).
+    """
+    name = "LZMA"
+    module_name = "pylzma"
+    prune_bytes = True
+
+    def getLevel(self, level=None):
+        if level is not None:
+            raise ValueError("The LZMA compressor does not support compression levels. Use its options instead.")
+
+        return None
+
+    def compress(self, data, level=None, dictionary=None):
+        self.checkDictionary(dictionary)
+        self.getLevel(level)
+
+        # pylzma only accepts read-only bytes
+        return self.module.compress(data if isinstance(data, bytes) else bytes(data), **self.options)
+
+    def decompress(self, compressed_data, dictionary=None):
+        self.checkDictionary(dictionary)
+        return self.module.decompress(compressed_data if isinstance(compressed_data, bytes) else bytes(compressed_data))
+
+    def compressStream(self, data_chunks, file, data_size=None, level=None, dictionary=None):
+        self.checkDictionary(dictionary)
+        self.getLevel(level)
+
+        # pylzma pulls the data to be compressed from a file-like object
+        reader = self.module.compressfile(ChunksReader(data_chunks), **self.options)
+        compressed_chunk = reader.read(1 << 20)
+        while compressed_chunk:
+            file.write(compressed_chunk)
+            compressed_chunk = reader.read(1 << 20)
+
+    def decompressStream(self, compressed_chunks, dictionary=None):
+        self.checkDictionary(dictionary)
+        dctx = self.module.decompressobj()
+        for compressed_chunk in compressed_chunks:
+            data = dctx.decompress(compressed_chunk if isinstance(compressed_chunk, bytes) else bytes(compressed_chunk))
+            if data:
+                yield data
+
+        data = dctx.flush()
+        if data:
+            yield data
+
+
+class ChunksReader:
+    """
+    A minimal read-only file-like object over an iterable of data chunks. It allows passing a sequence of chunks to
+    compressors that read their input from a file object.
+    """
+
+    def __init__(self, data_chunks):
+        self.data_chunks = iter(data_chunks)
+        self.buffer = bytearray()
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.data_chunks, None)
+            if chunk is None:
+                break
+            self.buffer.extend(chunk)
+
+        if size < 0:
+            size = len(self.buffer)
+
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+
+        return data
+
+
+class ChecksumWriter:
+    """
+    A minimal write-only file-like object that calculates the CRC-32 checksum (zlib.crc32) of the data written through
+    it to another binary file object. It allows calculating the checksum of the output of compressors that write to a
+    file object.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.crc = 0
+
+    def write(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+
+# Codec registry. It maps the compressor names to their codecs
+codecs = {}
+
+# Trained dictionaries. It maps the dictionary IDs to their data
+dictionaries = {}
+
+
+def registerCodec(codec):
+    """
+    Registers a codec with its name, so that it can be used as a compressor by the compression functions of AERzip. If a
+    codec with the same name was already registered, it is replaced (e.g. to change its default level or options).
+
+    :param Codec codec: The codec to be registered.
+
+    :return: None
+    """
+    if not codec.name or len(codec.name.encode("utf-8")) > 10:
+        raise ValueError("The codec name must contain between 1 and 10 bytes to fit in the CompressedFileHeader")
+
+    codecs[codec.name] = codec
+
+
+def getCodec(compressor):
+    """
+    Returns the registered codec of the specified compressor.
+
+    :param string compressor: A string indicating the compressor (the name of the codec).
+
+    :raises ValueError: If there is no codec registered with this name.
+    :return: The codec of the compressor.
+    :rtype: Codec
+    """
+    codec = codecs.get(compressor)
+    if codec is None:
+        raise ValueError("Compressor not recognized")
+
+    return codec
+
+
+def addDictionary(dictionary, compressor="ZSTD"):
+    """
+    Adds a trained dictionary to the dictionaries available to the compression functions of AERzip, which refer to them
+    by their ID (see the getDictionary function).
+
+    :param bytes dictionary: The data of the trained dictionary.
+    :param string compressor: A string indicating the compressor the dictionary was trained for.
+
+    :return: An int indicating the ID of the dictionary.
+    :rtype: int
+    """
+    dictionary = bytes(dictionary)
+    dictionary_id = getCodec(compressor).getDictionaryID(dictionary)
+    dictionaries[dictionary_id] = dictionary
+
+    return dictionary_id
+
+
+def getDictionary(dictionary_id):
+    """
+    Returns the data of an available trained dictionary (see the addDictionary function).
+
+    :param int dictionary_id: An int indicating the ID of the dictionary. None is returned as is.
+
+    :raises ValueError: If the dictionary is not available.
+    :return: The data of the dictionary, or None if dictionary_id is None.
+    :rtype: bytes
+    """
+    if dictionary_id is None:
+        return None
+
+    dictionary = dictionaries.get(dictionary_id)
+    if dictionary is None:
+        raise ValueError("The dictionary " + str(dictionary_id) + " is not loaded (see the loadDictionary function)")
+
+    return dictionary
+
+
+def getCodecNames():
+    """
+    Returns the names of the registered codecs.
+
+    :return: A list of strings with the names of the registered codecs.
+    :rtype: list
+    """
+    return list(codecs)
+
+
+class CodecSession:
+    """
+    A CodecSession compresses and decompresses many small payloads (e.g. short event packets) with a fixed compressor,
+    level and dictionary. It avoids the setup cost of each call of the compressData and decompressData functions:
+
+    - Each thread that uses the session gets its own context (see the createContext function of the Codec class), which
+      is created the first time and then reused, since contexts cannot be shared between threads.
+    - The decompressInto function writes into an output buffer of the calling thread, which is reused between calls.
+    - If a header is specified, its bytes are built once and used as a template by the compressFile and decompressFile
+      functions, instead of writing and parsing a CompressedFileHeader for each compressed file.
+
+    The output of the compress, decompress, compressFile and decompressFile functions is byte-identical to the one of
+    the compressData, decompressData, bytesToCompressedFile and compressedFileToBytes functions with the same
+    parameters, so payloads can be decompressed with any of them. The only difference is that the number of spikes and
+    the timestamp range of the header (see the setMetadata function of the CompressedFileHeader class) are not copied
+    into the compressed files, since they would not describe their spikes.
+
+    :param string compressor: A string indicating the compressor to be used (see the getCodec function).
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it. If a
+    header with the K option is specified, its dictionary is used.
+    :param CompressedFileHeader header: The header of the compressed files of the session. It cannot contain the C or F
+    options (chunked containers and frames) or the X option (checksums), and its compressor must be the one of the
+    session.
+    """
+
+    def __init__(self, compressor, level=None, dictionary_id=None, header=None):
+        if header is not None:
+            if header.compressor != compressor:
+                raise ValueError("The compressor of the header must be the compressor of the session.")
+            if any(header.getOption(option) is not None for option in ("C", "F", "X")):
+                raise ValueError("Sessions do not support chunked containers, frames or checksums.")
+
+            header_dictionary = header.getOption("K")
+            if header_dictionary is not None:
+                if dictionary_id is not None and dictionary_id != int.from_bytes(header_dictionary, "big"):
+                    raise ValueError("The dictionary of the header must be the dictionary of the session.")
+                dictionary_id = int.from_bytes(header_dictionary, "big")
+            elif dictionary_id is not None:
+                raise ValueError("The header must contain the dictionary of the session (K option).")
+
+        self.compressor = compressor
+        self.codec = getCodec(compressor)
+        self.level = level
+        self.dictionary_id = dictionary_id
+        self.dictionary = getDictionary(dictionary_id)
+        self.codec.checkDictionary(self.dictionary)
+
+        if header is not None:
+            # The number of spikes and the timestamp range describe a single file, so they are unknown in the files of
+            # the session (the size of the data is set for each file by the compressFile function)
+            header = copy.deepcopy(header)
+            header.num_events = header.min_ts = header.max_ts = None
+
+        self.header = header
+        self.header_bytes = None if header is None else bytes(header.toBytes())
+
+        self._local = threading.local()
+
+    def getContext(self):
+        """
+        Returns the context of the calling thread, which is created the first time it is requested.
+
+        :return: The context.
+        :rtype: CodecContext
+        """
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self._local.context = self.codec.createContext(level=self.level, dictionary=self.dictionary)
+
+        return context
+
+    def getBuffer(self, size):
+        """
+        Returns an output buffer of the calling thread with the specified size. The buffer is reused (and grown when it
+        is too small) between calls, so its content is only valid until the next call from the same thread.
+
+        :param int size: An int indicating the size of the buffer (in bytes).
+
+        :return: A writable memoryview of the buffer.
+        :rtype: memoryview
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or len(buffer) < size:
+            buffer = self._local.buffer = bytearray(max(size, 2 * (0 if buffer is None else len(buffer))))
+
+        return memoryview(buffer)[:size]
+
+    def compress(self, data):
+        """
+        Compresses the input data, as the compressData function does.
+
+        :param bytearray, bytes data: The input data.
+
+        :return: The output data (compressed data).
+        :rtype: bytes
+        """
+        return self.getContext().compress(data)
+
+    def decompress(self, compressed_data):
+        """
+        Decompresses the input compressed data, as the decompressData function does.
+
+        :param bytearray, bytes compressed_data: The input data.
+
+        :return: The output data (decompressed data).
+        :rtype: bytes
+        """
+        return self.getContext().decompress(compressed_data)
+
+    def decompressInto(self, compressed_data, output=None, data_size=None):
+        """
+        Decompresses the input compressed data into a preallocated buffer. If no output is specified, the output buffer
+        of the calling thread is used (see the getBuffer function), so the returned data is only valid until the next
+        call from the same thread and must be copied to be kept.
+
+        :param bytearray, bytes compressed_data: The input data.
+        :param memoryview output: A writable buffer of the size of the decompressed data. None uses the output buffer of
+        the session.
+        :param int data_size: An int indicating the size of the decompressed data. None reads it from the compressed
+        data if the codec stores it (see the getDecompressedSize function of the Codec class).
+
+        :raises ValueError: If no output is specified and the size of the decompressed data is unknown.
+        :return: The output buffer, which contains the decompressed data.
+        :rtype: memoryview
+        """
+        if output is None:
+            if data_size is None:
+                data_size = self.codec.getDecompressedSize(compressed_data)
+            if data_size is None:
+                raise ValueError("The size of the decompressed data is unknown, so it must be specified.")
+            output = self.getBuffer(data_size)
+
+        self.getContext().decompressInto(compressed_data, output)
+
+        return output
+
+    def compressFile(self, data):
+        """
+        Compresses the input data and joins it to the header of the session, as the bytesToCompressedFile function does.
+
+        :param bytearray, bytes data: The input data.
+
+        :raises ValueError: If the session has no header.
+        :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed data.
+        :rtype: bytearray
+        """
+        if self.header_bytes is None:
+            raise ValueError("The session has no header.")
+
+        compressed_file = bytearray(self.header_bytes)
+        if self.header.header_version >= 2:
+            # The size of the data is the second field of the metadata block (see the getCompressedFile function)
+            compressed_file[self.header.header_size + 8:self.header.header_size + 16] = len(data).to_bytes(8, "big")
+        compressed_file.extend(self.getContext().compress(data))
+
+        return compressed_file
+
+    def decompressFile(self, compressed_file):
+        """
+        Decompresses a compressed file with the header of the session, as the compressedFileToBytes function does. The
+        header of the file is compared with the one of the session instead of being parsed (except its metadata block,
+        which describes each file).
+
+        :param bytearray, bytes compressed_file: The input bytearray that contains the CompressedFileHeader and the
+        compressed data.
+
+        :raises ValueError: If the session has no header or the header of the file is a different one.
+        :return: This function returns two different objects, listed below:
+        - decompressed_data (bytes): The decompressed data.
+        - header (CompressedFileHeader): The header of the session.
+        """
+        if self.header_bytes is None:
+            raise ValueError("The session has no header.")
+
+        compressed_file = memoryview(compressed_file).cast("B")
+        header_size = self.header.header_size
+        if compressed_file[:header_size] != self.header_bytes[:header_size]:
+            raise ValueError("The header of the compressed file is not the header of the session.")
+
+        return self.getContext().decompress(compressed_file[self.header.getSize():]), self.header
+
+
+registerCodec(ZstdCodec())
+registerCodec(LZ4Codec())
+registerCodec(LZMACodec())
@@ -1,13 +1,60 @@
+import io
+import itertools
+import math
+import mmap
 import os
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
-#import lz4.frame
-#import pylzma
-import zstandard
-from pyNAVIS import Functions, Loaders
+import numpy as np
+from pyNAVIS import Functions, Loaders, SpikesFile
 
 from AERzip.CompressedFileHeader import CompressedFileHeader
-from AERzip.conversionFunctions import bytesToSpikesFile, spikesFileToBytes, calcRequiredBytes
+from AERzip.codecFunctions import getCodec, addDictionary, getDictionary, dictionaries, ChecksumWriter
+from AERzip.conversionFunctions import bytesToSpikesFile, spikesFileToBytes, calcRequiredBytes, calcConvertedSize, \
+    calcRequiredBytesFromMaxTs, calcRequiredDeltaBytes, calcDeltaBytesFromMaxDelta, calcRequiredBits, \
+    calcRequiredBitsFromMaxTs, calcRequiredDeltaBits, calcAddressGroups
+
+# Default number of events of each chunk of a chunked container
+DEFAULT_CHUNK_SIZE = 100000
+
+# Chunked containers end with an index of their chunks followed by a trailer: the index offset (8 bytes), the number of
+# chunks (8 bytes) and the CHUNK_INDEX_END string. Offsets are relative to the end of the CompressedFileHeader
+CHUNK_INDEX_STRUCT = np.dtype([("offset", ">u8"), ("size", ">u8"), ("events", ">u8"), ("first_ts", ">u8"),
+                               ("last_ts", ">u8")])
+CHUNK_INDEX_END = b"AERzipIX"
+CHUNK_INDEX_TRAILER_SIZE = 16 + len(CHUNK_INDEX_END)
+
+# Compressed files with the "X" option contain CRC-32 checksums (zlib.crc32) of their compressed and decompressed data.
+# Chunked containers store the checksums of each chunk in a table right before the chunk index (and the groups table, if
+# any), followed by the checksums of the chunk index (with the groups table) and of the rest of the table. The other
+# compressed files end with the checksums of the whole data followed by the CHECKSUM_END string
+CHECKSUM_STRUCT = np.dtype([("compressed_crc", ">u4"), ("data_crc", ">u4")])
+CHECKSUM_END = b"AERzipCK"
+CHECKSUM_TRAILER_SIZE = CHECKSUM_STRUCT.itemsize + len(CHECKSUM_END)
+
+# Chunked containers split into address groups (with the "G" option) store the address group of each chunk in a table
+# right before the chunk index. Their compressed data starts with the compressed group sequence (with the "O" option),
+# which ends where the first chunk starts
+CHUNK_GROUP_STRUCT = np.dtype(">u4")
+
+# Maximum size (bytes) of the uncompressed data of each frame of a multi-frame compressed file
+DEFAULT_FRAME_SIZE = 1 << 22
+
+# The frame table at the start of the compressed data of a multi-frame compressed file contains the number of frames and
+# the size of the uncompressed data (8 bytes each), followed by the compressed size of each frame (8 bytes each)
+FRAME_TABLE_HEADER_STRUCT = np.dtype([("frames", ">u8"), ("data_size", ">u8")])
+FRAME_TABLE_STRUCT = np.dtype(">u8")
+
+# Default size (bytes) of each read of a compressed file when it is decompressed as a stream
+DEFAULT_READ_SIZE = 1 << 20
+
+# Default maximum size (bytes) of a trained dictionary and of each of the samples used to train it. Dictionaries are
+# stored next to the compressed files of their dataset, with the DICTIONARY_FILE_NAME name
+DEFAULT_DICTIONARY_SIZE = 110 * 1024
+DEFAULT_DICTIONARY_SAMPLE_SIZE = 1 << 16
+DICTIONARY_FILE_NAME = "dictionary_{}.zdict"
 
 # TODO: Related to compressDataFromStoredNASFile function
 # But how to load a generic aedat file
@@ -16,11 +63,45 @@ from AERzip.conversionFunctions import bytesToSpikesFile, spikesFileToBytes, cal
 
 
 def compressDataFromStoredNASFile(initial_file_path, settings, compressor, store=True, ask_user=False, overwrite=False,
-                                  verbose=True):
+                                  verbose=True, chunk_size=None, chunked=False, delta_timestamps=False, columnar=False,
+                                  shuffle=False, bit_packing=False, threads=1, level=None, dictionary_id=None,
+                                  prune_bytes=None, group_channels=None, split_polarity=False):
     """
     Reads an original aedat NAS file, extracts and compress its raw spikes data and returns a compressed file bytearray.
     This function cannot be used with files not associated with the NAS.
 
+    If chunk_size is specified, the file is compressed in streaming mode (see the compressStoredNASFileInChunks
+    function): the original file is read and compressed in chunks of chunk_size events, so the peak memory usage does not
+    depend on the size of the recording. In this case the compressed file is written directly to disk (so store must be
+    True) and None is returned instead of the compressed file bytearray. Files whose timestamps are not in increasing
+    order cannot be sorted in streaming mode, so they raise a ValueError instead.
+
+    If chunked is True, the compressed file is a chunked container (see the spikesFileToCompressedFile function), which
+    allows reading time ranges with the extractTimeRange function. Its chunks have chunk_size events in streaming mode,
+    and DEFAULT_CHUNK_SIZE events otherwise.
+
+    If delta_timestamps is True, timestamps are stored as zigzag-encoded deltas, if columnar is True, all the addresses
+    are stored before all the timestamps, and if shuffle is True, the bytes of each field are shuffled into byte planes
+    (see the spikesFileToBytes function).
+
+    If bit_packing is True, addresses and timestamps are stored with the exact number of bits calculated by the
+    calcRequiredBits function instead of whole bytes. This reduces the size of the data before compressing it, which is
+    especially useful with the LZMA compressor.
+
+    If threads is greater than 1, the compressed data is split into frames which are compressed (and later decompressed)
+    in parallel (see the compressFrames function). This is not supported in streaming mode.
+
+    If dictionary_id is specified, the data is compressed with this trained dictionary (see the trainDatasetDictionary
+    function). If it has not been loaded, it is loaded from the folder where the compressed file is stored.
+
+    If prune_bytes is specified, it overrides whether the compressor prunes the bytes of addresses and timestamps (see
+    the calcFinalSizes function). The tuneCompression function finds the best value for a recording.
+
+    If group_channels is specified or split_polarity is True, the compressed file is a chunked container whose spikes
+    are split into address groups of group_channels channels of an ear (and of a polarity, if split_polarity is True),
+    so the spikes of some channels, ears or polarities can be decompressed alone (see the extractAddresses function).
+    This is not supported in streaming mode.
+
     :param string initial_file_path: A string indicating the original aedat file path.
     :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
     :param string compressor: A string indicating the compressor to be used.
@@ -28,10 +109,31 @@ def compressDataFromStoredNASFile(initial_file_path, settings, compressor, store
     :param boolean ask_user: A boolean indicating whether or not to prompt the user to overwrite a file that has been found at the specified path.
     :param boolean overwrite: A boolean indicating wheter or not a file that has been found at the specified path must be or not be overwritten.
     :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int chunk_size: An int indicating the number of events per chunk in streaming mode. None disables it.
+    :param boolean chunked: A boolean indicating whether or not the compressed file is a chunked container.
+    :param boolean delta_timestamps: A boolean indicating whether or not to store zigzag-encoded timestamp deltas.
+    :param boolean columnar: A boolean indicating whether or not to store all the addresses before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not to shuffle the bytes of each field into byte planes.
+    :param boolean bit_packing: A boolean indicating whether or not to store the fields with their exact bit widths.
+    :param int threads: An int indicating the number of threads used to compress the data.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+    :param boolean prune_bytes: A boolean indicating whether or not to prune the bytes of the fields. None uses the
+    default behaviour of the codec.
+    :param int group_channels: An int indicating the number of channels of each address group. None disables address
+    groups unless split_polarity is True.
+    :param boolean split_polarity: A boolean indicating whether or not the address groups are split by polarity.
 
     :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed spikes data.
     :rtype: bytearray
     """
+    if chunk_size is not None and not store:
+        raise ValueError("Streaming compression writes the compressed file to disk, so store must be True.")
+    if chunk_size is not None and threads > 1:
+        raise ValueError("Multi-threaded compression is not supported in streaming mode.")
+    if chunk_size is not None and (group_channels is not None or split_polarity):
+        raise ValueError("Address groups are not supported in streaming mode.")
+
     file_name = os.path.basename(initial_file_path)
     dir_name = os.path.dirname(initial_file_path)
     dataset_name = os.path.basename(dir_name)
@@ -40,11 +142,22 @@ def compressDataFromStoredNASFile(initial_file_path, settings, compressor, store
 
     # --- If the final compress file should be stored, check the path ---
     if store:
-        split_path = initial_file_path.split("/")
-        split_path[len(split_path) - 2] = split_path[len(split_path) - 2] + "_" + compressor
-        split_path[len(split_path) - 3] = "compressedEvents"
-        split_path[0] = split_path[0] + "\\"
-        final_file_path = checkFileExists(os.path.join(*split_path))
+        final_file_path = checkFileExists(getCompressedFilePath(initial_file_path, compressor), ask_user=ask_user,
+                                          overwrite=overwrite)
+
+    # --- Load the dictionary stored next to the compressed files (e.g. in a worker process) ---
+    if dictionary_id is not None and dictionary_id not in dictionaries:
+        loadDictionary(getDictionaryPath(os.path.dirname(getCompressedFilePath(initial_file_path, compressor)),
+                                         dictionary_id), compressor)
+
+    # --- Streaming mode ---
+    if chunk_size is not None:
+        compressStoredNASFileInChunks(initial_file_path, final_file_path, settings, compressor, chunk_size=chunk_size,
+                                      chunked=chunked, delta_timestamps=delta_timestamps, columnar=columnar,
+                                      shuffle=shuffle, bit_packing=bit_packing, verbose=verbose, level=level,
+                                      dictionary_id=dictionary_id, prune_bytes=prune_bytes)
+
+        return None, final_file_path
 
     # --- Load data from original aedat file ---
     start_time = time.time()
@@ -61,9 +174,6 @@ def compressDataFromStoredNASFile(initial_file_path, settings, compressor, store
     if verbose:
         print("Original file loaded in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
 
-    # Get the bytes to be discarded
-    desired_address_size, desired_timestamp_size = calcRequiredBytes(spikes_file, settings)
-
     if verbose:
         print("\nCompressing " + "/" + main_folder + "/" + dataset_name + "/" + file_name + " with " +
               str(settings.address_size) + "-byte addresses and " + str(settings.timestamp_size) +
@@ -71,13 +181,15 @@ def compressDataFromStoredNASFile(initial_file_path, settings, compressor, store
     start_time = time.time()
 
     # --- Compress the data ---
-    compressed_file = spikesFileToCompressedFile(spikes_file, settings.address_size, settings.timestamp_size,
-                                                 desired_address_size, desired_timestamp_size, compressor,
-                                                 verbose=verbose)
+    compressed_file = compressNASSpikesFile(spikes_file, settings, compressor, verbose=verbose, chunked=chunked,
+                                            delta_timestamps=delta_timestamps, columnar=columnar, shuffle=shuffle,
+                                            bit_packing=bit_packing, threads=threads, level=level,
+                                            dictionary_id=dictionary_id, prune_bytes=prune_bytes,
+                                            group_channels=group_channels, split_polarity=split_polarity)
 
     # --- Store the data ---
     if store:
-        storeFile(compressed_file, final_file_path, ask_user=ask_user, overwrite=overwrite)
+        storeFile(compressed_file, final_file_path, overwrite=True)
 
     end_time = time.time()
     if verbose:
@@ -86,28 +198,461 @@ def compressDataFromStoredNASFile(initial_file_path, settings, compressor, store
     return compressed_file, final_file_path
 
 
-def extractDataFromCompressedFile(file_path, verbose=True):
+def compressNASSpikesFile(spikes_file, settings, compressor, verbose=True, chunked=False, delta_timestamps=False,
+                          columnar=False, shuffle=False, bit_packing=False, threads=1, level=None, dictionary_id=None,
+                          prune_bytes=None, group_channels=None, split_polarity=False):
+    """
+    Compresses the SpikesFile of an original aedat NAS file (with adapted timestamps) as the
+    compressDataFromStoredNASFile function does: the sizes of the addresses and timestamps (or their bit widths) are
+    calculated from the settings and the spikes, and the spikes are compressed with the spikesFileToCompressedFile
+    function.
+
+    :param SpikesFile spikes_file: The input SpikesFile object from pyNAVIS. It must contain raw spikes data with adapted
+    timestamps (see the adapt_timestamps function of pyNAVIS).
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
+    :param string compressor: A string indicating the compressor to be used.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param boolean chunked: A boolean indicating whether or not the compressed file is a chunked container.
+    :param boolean delta_timestamps: A boolean indicating whether or not to store zigzag-encoded timestamp deltas.
+    :param boolean columnar: A boolean indicating whether or not to store all the addresses before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not to shuffle the bytes of each field into byte planes.
+    :param boolean bit_packing: A boolean indicating whether or not to store the fields with their exact bit widths.
+    :param int threads: An int indicating the number of threads used to compress the data.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+    :param boolean prune_bytes: A boolean indicating whether or not to prune the bytes of the fields. None uses the
+    default behaviour of the codec.
+    :param int group_channels: An int indicating the number of channels of each address group (see the
+    compressDataFromStoredNASFile function). None disables address groups unless split_polarity is True.
+    :param boolean split_polarity: A boolean indicating whether or not the address groups are split by polarity.
+
+    :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed spikes data.
+    :rtype: bytearray
+    """
+    # Each channel has two addresses (ON and OFF) if both polarities are recorded
+    group_size = None if group_channels is None else group_channels * (settings.on_off_both + 1)
+
+    # Get the bytes to be discarded
+    desired_address_size, desired_timestamp_size = calcRequiredBytes(spikes_file, settings)
+    bit_widths = calcRequiredBits(spikes_file, settings) if bit_packing else None
+
+    return spikesFileToCompressedFile(spikes_file, settings.address_size, settings.timestamp_size,
+                                      desired_address_size, desired_timestamp_size, compressor, verbose=verbose,
+                                      chunk_size=DEFAULT_CHUNK_SIZE if chunked else None,
+                                      delta_timestamps=delta_timestamps, columnar=columnar, shuffle=shuffle,
+                                      bit_widths=bit_widths, threads=threads, level=level, dictionary_id=dictionary_id,
+                                      prune_bytes=prune_bytes, group_size=group_size, split_polarity=split_polarity)
+
+
+def aedatBytesToSpikesFile(aedat_bytes, settings):
+    """
+    Extracts the raw spikes of the bytes of an original aedat file (e.g. read asynchronously) in the same way as the
+    Loaders.loadAEDAT function from pyNAVIS, which reads them from the file: the ASCII header is skipped, the addresses
+    and timestamps are returned with the same data types, the addresses are checked against the settings and the
+    spikes are sorted by timestamp if they are not in increasing order.
+
+    :param bytearray, bytes aedat_bytes: The bytes of the original aedat file.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
+    :raises ValueError: The file contains addresses out of range.
+
+    :return: The output SpikesFile object from pyNAVIS. It contains raw spikes.
+    :rtype: SpikesFile
+    """
+    end_string = "#End Of ASCII Header\r\n".encode("utf-8")
+    index = aedat_bytes.find(end_string)
+    index = 0 if index == -1 else index + len(end_string)
+
+    event_size = settings.address_size + settings.timestamp_size
+    num_spikes = (len(aedat_bytes) - index) // event_size
+    spikes_data = memoryview(aedat_bytes)[index:index + num_spikes * event_size]
+
+    spikes_file, _, _ = bytesToSpikesFile(spikes_data, settings.address_size, settings.timestamp_size, verbose=False)
+
+    # Same checks as the Loaders.loadAEDAT function
+    _, order_is_ok, all_in_range = Functions.check_SpikesFile(spikes_file, settings)
+    if not all_in_range:
+        raise ValueError("Addresses are not in range. Could be due to bad decoding")
+    if not order_is_ok:
+        Functions.order_SpikesFile(spikes_file, settings)
+
+    return spikes_file
+
+
+def getCompressedFilePath(initial_file_path, compressor):
+    """
+    Calculates where the compressed file of an original aedat file is stored. Original files are expected to be in a
+    dataset folder inside a main folder (e.g. events/dataset/file.aedat), and compressed files mirror this layout inside
+    the compressedEvents folder, with the compressor appended to the dataset folder name (e.g.
+    compressedEvents/dataset_ZSTD/file.aedat).
+
+    :param string initial_file_path: A string indicating the original aedat file path.
+    :param string compressor: A string indicating the compressor used.
+
+    :return: A string indicating the compressed file path.
+    :rtype: string
+    """
+    dir_path = os.path.dirname(initial_file_path)
+    main_folder_path = os.path.dirname(os.path.dirname(dir_path))
+
+    return os.path.join(main_folder_path, "compressedEvents", os.path.basename(dir_path) + "_" + compressor,
+                        os.path.basename(initial_file_path))
+
+
+def compressStoredNASFileInChunks(initial_file_path, final_file_path, settings, compressor, chunk_size=1000000,
+                                  chunked=False, delta_timestamps=False, columnar=False, shuffle=False, bit_packing=False,
+                                  verbose=True, level=None, dictionary_id=None, prune_bytes=None):
+    """
+    Reads an original aedat NAS file in chunks of chunk_size events, converts and compresses each chunk and writes the
+    compressed data to the final file as it is produced. Thus, the peak memory usage is bounded by the chunk size instead
+    of the size of the recording.
+
+    The original file is read twice: the first pass calculates the number of events and the timestamp range (needed to
+    adapt the timestamps and to get the required bytes), and the second one converts and compresses the spikes. The
+    first pass also checks the addresses and the timestamp order (see the loadAEDATChunks function), so nothing is
+    written if the file cannot be compressed in chunks. The
+    compressed file has the same format as the one returned by the compressDataFromStoredNASFile function, so it can be
+    read with the extractDataFromCompressedFile function.
+
+    If chunked is True, each chunk is compressed independently and the compressed file is a chunked container (see the
+    spikesFileToCompressedFile function).
+
+    If delta_timestamps is True, timestamps are stored as zigzag-encoded deltas (see the spikesFileToBytes function).
+    Since the timestamps are adapted chunk by chunk, the size of the deltas is calculated from an upper bound of the
+    adapted deltas obtained in the first pass.
+
+    The columnar layout, the byte shuffle and the bit-packing (see the spikesFileToBytes function) rearrange the bytes
+    of the whole converted data, so they can only be used in chunked containers, where they are applied to each chunk.
+
+    :param string initial_file_path: A string indicating the original aedat file path.
+    :param string final_file_path: A string indicating where the compressed file is written.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
+    :param string compressor: A string indicating the compressor to be used.
+    :param int chunk_size: An int indicating the number of events read and compressed at once.
+    :param boolean chunked: A boolean indicating whether or not the compressed file is a chunked container.
+    :param boolean delta_timestamps: A boolean indicating whether or not to store zigzag-encoded timestamp deltas.
+    :param boolean columnar: A boolean indicating whether or not to store all the addresses before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not to shuffle the bytes of each field into byte planes.
+    :param boolean bit_packing: A boolean indicating whether or not to store the fields with their exact bit widths.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+    :param boolean prune_bytes: A boolean indicating whether or not to prune the bytes of the fields. None uses the
+    default behaviour of the codec.
+
+    :raises ValueError: The file contains addresses out of range, or timestamps that are not in increasing order.
+
+    :return: The CompressedFileHeader of the compressed file.
+    :rtype: CompressedFileHeader
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be a positive number of events.")
+    if (columnar or shuffle or bit_packing) and not chunked:
+        raise ValueError("The columnar layout, the byte shuffle and the bit-packing can only be used in chunked "
+                         "containers when compressing in streaming mode.")
+
+    # --- First pass: number of events and timestamp range ---
+    start_time = time.time()
+
+    num_events = 0
+    min_ts = None
+    max_ts = None
+    first_ts = None
+    last_ts = None
+    max_abs_delta = 0
+    for spikes_chunk in loadAEDATChunks(initial_file_path, settings, chunk_size):
+        num_events += len(spikes_chunk.timestamps)
+        if min_ts is None or spikes_chunk.min_ts < min_ts:
+            min_ts = spikes_chunk.min_ts
+        if max_ts is None or spikes_chunk.max_ts > max_ts:
+            max_ts = spikes_chunk.max_ts
+
+        if delta_timestamps:
+            # Largest difference between consecutive timestamps (or with respect to the base of the chunk)
+            timestamps = spikes_chunk.timestamps.astype(np.int64)
+            if chunked:
+                max_abs_delta = max(max_abs_delta, int(timestamps[0] - spikes_chunk.min_ts))
+            elif last_ts is not None:
+                max_abs_delta = max(max_abs_delta, abs(int(timestamps[0]) - last_ts))
+            if len(timestamps) > 1:
+                max_abs_delta = max(max_abs_delta, int(np.max(np.abs(np.diff(timestamps)))))
+
+            if first_ts is None:
+                first_ts = int(timestamps[0])
+            last_ts = int(timestamps[-1])
+
+    # Adapt timestamps to allow timestamp compression (as Functions.adapt_timestamps does with the whole file)
+    adapt = min_ts is not None and min_ts != 0
+    if not adapt:
+        adapted_max_ts = 0 if max_ts is None else max_ts
+    elif settings.reset_timestamp:
+        adapted_max_ts = (max_ts - min_ts) * settings.ts_tick
+    else:
+        adapted_max_ts = max_ts * settings.ts_tick
+
+    # Get the bytes to be discarded
+    desired_address_size, desired_timestamp_size = calcRequiredBytesFromMaxTs(adapted_max_ts, settings)
+    final_address_size, final_timestamp_size = calcFinalSizes(compressor, desired_address_size,
+                                                              desired_timestamp_size, verbose=verbose,
+                                                              prune_bytes=prune_bytes)
+    bit_widths = calcRequiredBitsFromMaxTs(adapted_max_ts, settings) if bit_packing else None
+
+    if delta_timestamps:
+        # Adapting the timestamps scales their differences and truncates them, which can add one more unit
+        if adapt:
+            max_zigzag_delta = 2 * (math.ceil(max_abs_delta * settings.ts_tick) + 1)
+        else:
+            max_zigzag_delta = 2 * max_abs_delta
+
+        # The first delta of a non-chunked file is relative to 0
+        if not chunked and first_ts is not None:
+            if not adapt:
+                adapted_first_ts = first_ts
+            elif settings.reset_timestamp:
+                adapted_first_ts = (first_ts - int(min_ts)) * settings.ts_tick
+            else:
+                adapted_first_ts = first_ts * settings.ts_tick
+            max_zigzag_delta = max(max_zigzag_delta, 2 * int(adapted_first_ts))
+
+        final_timestamp_size = calcDeltaBytesFromMaxDelta(max_zigzag_delta)
+        if bit_packing:
+            bit_widths = (bit_widths[0], max(int(max_zigzag_delta).bit_length(), 1))
+
+    if bit_packing:
+        final_address_size, final_timestamp_size = [int(math.ceil(bits / 8)) for bits in bit_widths]
+
+    end_time = time.time()
+    if verbose:
+        print("compressStoredNASFileInChunks: " + str(num_events) + " events scanned in " +
+              '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    # --- Second pass: convert, compress and write each chunk ---
+    start_time = time.time()
+
+    def adaptChunks():
+        for spikes_chunk in loadAEDATChunks(initial_file_path, settings, chunk_size):
+            if adapt:
+                # The global minimum must be subtracted, not the minimum of the chunk
+                spikes_chunk.min_ts = min_ts
+                Functions.adapt_timestamps(spikes_chunk, settings)
+
+            yield spikes_chunk
+
+    data_crc = 0
+
+    def convertChunks():
+        nonlocal data_crc
+
+        # Each chunk is compressed before converting the next one, so all of them are converted into the same buffer
+        buffer = bytearray(chunk_size * (final_address_size + final_timestamp_size))
+        timestamp_base = 0
+        for spikes_chunk in adaptChunks():
+            chunk_bytes = spikesFileToBytes(spikes_chunk, settings.address_size, settings.timestamp_size,
+                                            final_address_size, final_timestamp_size, verbose=False,
+                                            delta_timestamps=delta_timestamps, timestamp_base=timestamp_base,
+                                            buffer=buffer)
+            data_crc = zlib.crc32(chunk_bytes, data_crc)
+            yield chunk_bytes
+
+            # Deltas are continuous between chunks
+            timestamp_base = int(spikes_chunk.timestamps[-1])
+
+    header = CompressedFileHeader(compressor, final_address_size, final_timestamp_size)
+    if chunked:
+        header.addOption("C")
+    addConversionOptions(header, delta_timestamps=delta_timestamps, columnar=columnar, shuffle=shuffle,
+                         bit_widths=bit_widths)
+    addDictionaryOption(header, dictionary_id)
+    header.addOption("X")
+
+    # Metadata of the adapted spikes, which are known from the first pass
+    if num_events > 0:
+        if not adapt:
+            adapted_min_ts = min_ts
+        elif settings.reset_timestamp:
+            adapted_min_ts = 0
+        else:
+            adapted_min_ts = min_ts * settings.ts_tick
+        header.setMetadata(num_events=num_events, min_ts=int(adapted_min_ts), max_ts=int(adapted_max_ts))
+    else:
+        header.setMetadata(num_events=0)
+
+    chunks_events = [min(chunk_size, num_events - i) for i in range(0, num_events, chunk_size)] if chunked else \
+        [num_events]
+    header.setMetadata(data_size=sum(calcConvertedSize(chunk_events, final_address_size, final_timestamp_size,
+                                                       **getConversionOptions(header))
+                                     for chunk_events in chunks_events))
+
+    # Check the destination folder (other processes may be creating it at the same time)
+    if os.path.dirname(final_file_path):
+        os.makedirs(os.path.dirname(final_file_path), exist_ok=True)
+
+    file = open(final_file_path, "wb")
+    file.write(header.toBytes())
+    if chunked:
+        writeCompressedChunks(adaptChunks(), settings.address_size, settings.timestamp_size, final_address_size,
+                              final_timestamp_size, compressor, file, level=level, dictionary_id=dictionary_id,
+                              checksums=True, **getConversionOptions(header))
+    else:
+        # The checksum of the compressed data is calculated while it is written
+        checksum_writer = ChecksumWriter(file)
+        compressDataStream(convertChunks(), compressor, checksum_writer,
+                           data_size=num_events * (final_address_size + final_timestamp_size), level=level,
+                           dictionary_id=dictionary_id)
+        file.write(getChecksumTrailerBytes((checksum_writer.crc, data_crc)))
+    file.close()
+
+    end_time = time.time()
+    if verbose:
+        print("compressStoredNASFileInChunks: Data compression has took " + '{0:.3f}'.format(end_time - start_time) +
+              " seconds")
+
+    return header
+
+
+def loadAEDATChunks(file_path, settings, chunk_size):
+    """
+    Reads an original aedat file in chunks of chunk_size events. This is a generator that yields one SpikesFile object
+    from pyNAVIS per chunk, which contains the same addresses and timestamps (and with the same data types) that the
+    Loaders.loadAEDAT function from pyNAVIS would return for that part of the file.
+
+    As the Loaders.loadAEDAT function does, the addresses are checked against the settings. However, the whole file is
+    never in memory, so its spikes cannot be sorted by timestamp: a file whose timestamps are not in increasing order
+    (which Loaders.loadAEDAT would sort) raises an error instead of returning different spikes.
+
+    :param string file_path: A string indicating the aedat file path.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the file.
+    :param int chunk_size: An int indicating the maximum number of events of each chunk.
+    :raises ValueError: The file contains addresses out of range, or timestamps that are not in increasing order.
+
+    :return: A generator of SpikesFile objects.
+    """
+    end_string = "#End Of ASCII Header\r\n".encode("utf-8")
+    event_size = settings.address_size + settings.timestamp_size
+    num_addresses = settings.num_channels * (settings.on_off_both + 1) * (settings.mono_stereo + 1)
+    last_ts = None
+
+    file = open(file_path, "rb")
+
+    try:
+        # Skip the ASCII header lines
+        data_start = 0
+        line = file.readline()
+        while line.startswith(b"#"):
+            if line == end_string:
+                data_start = file.tell()
+                break
+            line = file.readline()
+
+        file.seek(0, os.SEEK_END)
+        num_events = (file.tell() - data_start) // event_size
+        file.seek(data_start)
+
+        # Read the raw spikes chunk by chunk
+        while num_events > 0:
+            chunk_events = min(chunk_size, num_events)
+            chunk_bytes = file.read(chunk_events * event_size)
+            num_events -= chunk_events
+
+            spikes_chunk, _, _ = bytesToSpikesFile(chunk_bytes, settings.address_size, settings.timestamp_size,
+                                                   verbose=False)
+
+            # Same checks as the Loaders.loadAEDAT function, also across the limits of the chunks
+            if np.any(spikes_chunk.addresses >= num_addresses):
+                raise ValueError("Addresses are not in range. Could be due to bad decoding")
+            timestamps = spikes_chunk.timestamps
+            if np.any(timestamps[:-1] > timestamps[1:]) or (last_ts is not None and timestamps[0] < last_ts):
+                raise ValueError("The timestamps of " + file_path + " are not in increasing order, so it cannot be "
+                                 "read in chunks. Compress it without chunk_size to sort its spikes.")
+            last_ts = timestamps[-1]
+
+            yield spikes_chunk
+    finally:
+        file.close()
+
+
+def calcFinalSizes(compressor, desired_address_size, desired_timestamp_size, verbose=True, prune_bytes=None):
+    """
+    Calculates the address and timestamp sizes used to store the spikes in a compressed file.
+
+    In the case of compressing with LZMA compressor, it is better to prune the bytes because we can achieve
+    practically the same compressed file size in a reasonably smaller time. Otherwise, viewing addresses and
+    timestamps as 4-bytes data usually allows to achieve a better compression, regardless of their original sizes. This
+    is specified by the prune_bytes attribute of each codec (see the Codec class), unless the prune_bytes parameter
+    overrides it (e.g. with the configuration found by the tuneCompression function).
+
+    :param string compressor: A string indicating the compressor to be used.
+    :param int desired_address_size: An int indicating the minimum size of the addresses.
+    :param int desired_timestamp_size: An int indicating the minimum size of the timestamps.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param boolean prune_bytes: A boolean indicating whether or not to prune the bytes. None uses the default behaviour
+    of the codec.
+
+    :return: This function returns two different objects, listed below:
+    - final_address_size (int): An int indicating the size of the addresses in the compressed file.
+    - final_timestamp_size (int): An int indicating the size of the timestamps in the compressed file.
+    """
+    if prune_bytes is None:
+        prune_bytes = getCodec(compressor).prune_bytes
+
+    if not prune_bytes:
+        if verbose:
+            print("calcFinalSizes: Considering 4-byte addresses and timestamps before the compression "
+                  "process when NOT using LZMA as the compression algorithm")
+        final_address_size = 4
+        final_timestamp_size = 4
+    else:
+        final_address_size = desired_address_size
+        final_timestamp_size = desired_timestamp_size
+
+    return final_address_size, final_timestamp_size
+
+
+def extractDataFromCompressedFile(file_path, verbose=True, threads=1, memory_map=False, streaming=False, native=False,
+                                  cache=None):
     """
     Reads a compressed aedat file and extracts and decompress its compressed information.
 
     :param string file_path: A string indicating the compressed aedat file path.
     :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int threads: An int indicating the number of threads used to decompress the frames of the file (if any).
+    :param boolean memory_map: A boolean indicating whether or not to map the compressed file into memory instead of
+    reading it (see the loadFile function).
+    :param boolean streaming: A boolean indicating whether or not to decompress the file while it is being read, without
+    loading it (see the compressedFileStreamToSpikesFile function). This reduces the peak memory usage.
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
+    :param DecodedCache cache: A DecodedCache where the decoded spikes are looked up and stored (see the cacheFunctions
+    module). None does not use a cache.
 
     :return: This function returns two different objects, listed below:
     - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS. It contains raw spikes.
     - new_settings (MainSettings): A MainSettings object from pyNAVIS. It contains the CompressedFileHeader's address_size and timestamp_size fields.
     """
+    if cache is not None:
+        return cache.extractDataFromCompressedFile(file_path, verbose=verbose, threads=threads, memory_map=memory_map,
+                                                   streaming=streaming, native=native)
+
     # --- Load data from compressed aedat file ---
     file = os.path.basename(file_path)
     dir_path = os.path.dirname(file_path)
     dataset = os.path.basename(dir_path)
     main_folder = os.path.basename(os.path.dirname(dir_path))
 
+    # Load the trained dictionary of the file (if any)
+    loadCompressedFileDictionary(file_path)
+
+    if streaming:
+        if verbose:
+            print("\nDecompressing " + "/" + main_folder + "/" + dataset + "/" + file + " (streaming)")
+
+        with open(file_path, "rb") as compressed_file:
+            return compressedFileStreamToSpikesFile(compressed_file, verbose=verbose, native=native)
+
     start_time = time.time()
     if verbose:
         print("\nLoading " + "/" + main_folder + "/" + dataset + "/" + file + " (compressed aedat file)")
 
-    compressed_file = loadFile(file_path)
+    compressed_file = loadFile(file_path, memory_map=memory_map)
 
     end_time = time.time()
     if verbose:
@@ -119,7 +664,9 @@ def extractDataFromCompressedFile(file_path, verbose=True):
     start_time = time.time()
 
     # Call to bytesToSpikesFile function
-    header, spikes_file, final_address_size, final_timestamp_size = compressedFileToSpikesFile(compressed_file, verbose=verbose)
+    header, spikes_file, final_address_size, final_timestamp_size = compressedFileToSpikesFile(compressed_file, verbose=verbose,
+                                                                                               threads=threads,
+                                                                                               native=native)
 
     end_time = time.time()
     if verbose:
@@ -128,7 +675,143 @@ def extractDataFromCompressedFile(file_path, verbose=True):
     return header, spikes_file, final_address_size, final_timestamp_size
 
 
-def bytesToCompressedFile(bytes_data, header, verbose=True):
+def extractTimeRange(file_path, t_start, t_end, verbose=True, native=False):
+    """
+    Reads a compressed aedat file and extracts the spikes whose timestamps are in the range [t_start, t_end).
+
+    If the compressed file is a chunked container, its chunk index is used to read and decompress only the chunks that
+    overlap the range, so the cost of this function depends on the length of the range instead of the length of the
+    recording. Otherwise, the whole file is decompressed (see the extractAddresses function).
+
+    :param string file_path: A string indicating the compressed aedat file path.
+    :param int t_start: An int indicating the first timestamp of the range (included).
+    :param int t_end: An int indicating the last timestamp of the range (excluded).
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
+
+    :return: This function returns four different objects, listed below:
+    - header (CompressedFileHeader): The CompressedFileHeader of the compressed file.
+    - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS. It contains the spikes of the range.
+    - final_address_size (int): An int indicating the size of the addresses in the final SpikesFile.
+    - final_timestamp_size (int): An int indicating the size of the timestamps in the final SpikesFile.
+    """
+    start_time = time.time()
+
+    header, spikes_file, final_address_size, final_timestamp_size = extractAddresses(file_path, None, t_start, t_end,
+                                                                                     verbose=False, native=native)
+
+    end_time = time.time()
+    if verbose:
+        print("extractTimeRange: " + str(len(spikes_file.timestamps)) + " spikes extracted in " +
+              '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return header, spikes_file, final_address_size, final_timestamp_size
+
+
+def extractAddresses(file_path, addresses, t_start=None, t_end=None, verbose=True, native=False):
+    """
+    Reads a compressed aedat file and extracts the spikes of some addresses (see the getNASAddresses function of
+    conversionFunctions) whose timestamps are in the range [t_start, t_end).
+
+    If the compressed file is a chunked container, its chunk index is used to read and decompress only the chunks that
+    overlap the range and, if it is split into address groups (see the addAddressGroupOption function), only the chunks
+    of the groups of the addresses. Otherwise, the whole file is decompressed and filtered. The spikes of the groups of
+    a filtered container are merged in timestamp order (see the chunksToSpikesFile function).
+
+    :param string file_path: A string indicating the compressed aedat file path.
+    :param iterable addresses: An iterable with the addresses to be extracted. None extracts all the addresses.
+    :param int t_start: An int indicating the first timestamp of the range (included). None does not bound it.
+    :param int t_end: An int indicating the last timestamp of the range (excluded). None does not bound it.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
+
+    :return: This function returns four different objects, listed below:
+    - header (CompressedFileHeader): The CompressedFileHeader of the compressed file.
+    - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS. It contains the spikes of the addresses in
+    the range.
+    - final_address_size (int): An int indicating the size of the addresses in the final SpikesFile.
+    - final_timestamp_size (int): An int indicating the size of the timestamps in the final SpikesFile.
+    """
+    start_time = time.time()
+
+    if addresses is not None:
+        addresses = np.unique(np.asarray(addresses, dtype=np.int64))
+
+    # Load the trained dictionary of the file (if any)
+    loadCompressedFileDictionary(file_path)
+
+    file = open(file_path, "rb")
+
+    try:
+        # Read the header
+        header = readCompressedFileHeader(file)
+        header_size = header.getSize()
+
+        if header.getOption("C") is None:
+            compressed_data = memoryview(file.read())
+            data = decompressFileData(compressed_data[:len(compressed_data) - getChecksumTrailerSize(header)], header)
+            spikes_file, final_address_size, final_timestamp_size = \
+                bytesToSpikesFile(data, header.address_size, header.timestamp_size, verbose=False, native=native,
+                                  **getConversionOptions(header))
+        else:
+            # Read the chunk index (and the groups table, if any) from the end of the file
+            file.seek(-CHUNK_INDEX_TRAILER_SIZE, os.SEEK_END)
+            index_offset, num_chunks = readChunkIndexTrailer(file.read(CHUNK_INDEX_TRAILER_SIZE))
+            file.seek(header_size + index_offset)
+            index = np.frombuffer(file.read(num_chunks * CHUNK_INDEX_STRUCT.itemsize), CHUNK_INDEX_STRUCT)
+
+            # The group sequence (if any) restores the original order of the spikes when the whole file is extracted
+            group_sequence = None
+            if addresses is None and t_start is None and t_end is None and num_chunks > 0:
+                file.seek(header_size)
+                group_sequence = decompressGroupSequence(file.read(int(index[0]["offset"])), header)
+
+            # Select the chunks that overlap the range and contain the addresses
+            selected = np.ones(num_chunks, dtype=bool)
+            if t_start is not None:
+                selected &= index["last_ts"] >= t_start
+            if t_end is not None:
+                selected &= index["first_ts"] < t_end
+            address_group_option = getAddressGroupOption(header)
+            if addresses is not None and address_group_option is not None:
+                file.seek(header_size + index_offset - num_chunks * CHUNK_GROUP_STRUCT.itemsize)
+                chunks_groups = np.frombuffer(file.read(num_chunks * CHUNK_GROUP_STRUCT.itemsize), CHUNK_GROUP_STRUCT)
+                selected &= np.isin(chunks_groups, calcAddressGroups(addresses, *address_group_option))
+            index = index[selected]
+
+            # Read and decompress the selected chunks
+            compressed_chunks = []
+            for entry in index:
+                file.seek(header_size + int(entry["offset"]))
+                compressed_chunks.append(file.read(int(entry["size"])))
+
+            spikes_file, final_address_size, final_timestamp_size = \
+                chunksToSpikesFile(compressed_chunks, index, header, native=native, group_sequence=group_sequence)
+    finally:
+        file.close()
+
+    # Discard the spikes of other addresses or out of the range
+    selected = np.ones(len(spikes_file.timestamps), dtype=bool)
+    if addresses is not None:
+        selected &= np.isin(spikes_file.addresses, addresses)
+    if t_start is not None:
+        selected &= spikes_file.timestamps >= t_start
+    if t_end is not None:
+        selected &= spikes_file.timestamps < t_end
+    if not np.all(selected):
+        spikes_file = SpikesFile(spikes_file.addresses[selected], spikes_file.timestamps[selected])
+
+    end_time = time.time()
+    if verbose:
+        print("extractAddresses: " + str(len(spikes_file.timestamps)) + " spikes extracted in " +
+              '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return header, spikes_file, final_address_size, final_timestamp_size
+
+
+def bytesToCompressedFile(bytes_data, header, verbose=True, threads=1, level=None):
     """
     Converts a bytearray of raw spikes of a-bytes addresses and b-bytes timestamps, where a and b are address_size
     and timestamp_size parameters respectively, to a bytearray of CompressedFileHeader and compressed spikes
@@ -136,11 +819,16 @@ def bytesToCompressedFile(bytes_data, header, verbose=True):
 
     This function is the inverse of the compressedFileToBytes function.
 
+    If threads is greater than 1, the data is split into frames that are compressed in parallel, and the frame size is
+    stored in the header (see the compressFrames function).
+
     :param bytearray bytes_data: The input bytearray. It must contain raw spikes data (without headers).
     :param int address_size: An int indicating the size of the addresses.
     :param int timestamp_size: An int indicating the size of the timestamps.
     :param string compressor: A string indicating the compressor to be used.
     :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int threads: An int indicating the number of threads used to compress the data.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
 
     :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed spikes data.
     :rtype: bytearray
@@ -149,8 +837,11 @@ def bytesToCompressedFile(bytes_data, header, verbose=True):
     if verbose:
         print("bytesToCompressedFile: Converting spikes bytes into a spikes compressed file...")
 
+    if threads > 1 and header.getOption("F") is None:
+        header.addOption("F", calcFrameSize(len(bytes_data), threads).to_bytes(4, "big"))
+
     # Join header with compressed data
-    compressed_file = getCompressedFile(header, bytes_data)
+    compressed_file = getCompressedFile(header, bytes_data, threads=threads, level=level)
 
     end_time = time.time()
     if verbose:
@@ -160,7 +851,7 @@ def bytesToCompressedFile(bytes_data, header, verbose=True):
     return compressed_file
 
 
-def compressedFileToBytes(compressed_file, verbose=True):
+def compressedFileToBytes(compressed_file, verbose=True, threads=1):
     """
     Converts a bytearray of CompressedFileHeader and compressed spikes of a-bytes addresses and b-bytes timestamps,
     where a and b are address_size and timestamp_size ints which are inside the bytearray, to a bytearray of raw spikes
@@ -170,6 +861,7 @@ def compressedFileToBytes(compressed_file, verbose=True):
 
     :param bytearray compressed_file: The input bytearray that contains the CompressedFileHeader and the compressed spikes.
     :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int threads: An int indicating the number of threads used to decompress the frames of the file (if any).
 
     :return: The output bytearray. It contains raw spikes shaped as the compressed spikes of the compressed file.
     :rtype: bytearray
@@ -178,7 +870,11 @@ def compressedFileToBytes(compressed_file, verbose=True):
     header, compressed_data = extractCompressedData(compressed_file)
 
     # Decompress the data
-    decompressed_data = decompressData(compressed_data, header.compressor)
+    if header.getOption("C") is None:
+        decompressed_data = decompressFileData(compressed_data, header, threads=threads)
+    else:
+        decompressed_data = decompressChunkedData(compressed_data, header.compressor,
+                                                  dictionary_id=getDictionaryOption(header))
 
     if verbose:
         print("compressedFileToBytes: Compressed file bytearray decompressed into a raw spikes bytearray")
@@ -187,7 +883,10 @@ def compressedFileToBytes(compressed_file, verbose=True):
 
 
 def spikesFileToCompressedFile(spikes_file, initial_address_size, initial_timestamp_size, desired_address_size,
-                               desired_timestamp_size, compressor, verbose=True):
+                               desired_timestamp_size, compressor, verbose=True, chunk_size=None,
+                               delta_timestamps=False, columnar=False, shuffle=False, bit_widths=None, threads=1,
+                               level=None, dictionary_id=None, prune_bytes=None, group_size=None,
+                               split_polarity=False):
     """
     Converts a SpikesFile of raw spikes of a-bytes addresses and b-bytes timestamps, where a and b are address_size
     and timestamp_size parameters respectively, to a bytearray of CompressedFileHeader and compressed spikes
@@ -197,7 +896,37 @@ def spikesFileToCompressedFile(spikes_file, initial_address_size, initial_timest
 
     In the case of compressing with LZMA compressor, it is better to prune the bytes because we can achieve
     practically the same compressed file size in a reasonably smaller time. Otherwise, viewing addresses and
-    timestamps as 4-bytes data usually allows to achieve a better compression, regardless of their original sizes.
+    timestamps as 4-bytes data usually allows to achieve a better compression, regardless of their original sizes. The
+    prune_bytes parameter overrides this behaviour (see the calcFinalSizes function).
+
+    If chunk_size is specified, the compressed file is a chunked container: the spikes are split into chunks of
+    chunk_size events which are compressed independently, and the compressed chunks are followed by an index that
+    contains the offset, size, number of events and first and last timestamps of each chunk. This allows reading a time
+    range of the recording without decompressing the whole file (see the extractTimeRange function).
+
+    If delta_timestamps is True, timestamps are stored as zigzag-encoded deltas with the minimum size that allows to
+    represent them, regardless of the compressor (see the spikesFileToBytes function). In chunked containers, the first
+    delta of each chunk is relative to the first timestamp stored in its index entry, so chunks remain independent.
+
+    If columnar is True, all the addresses are stored before all the timestamps (of each chunk), and if shuffle is True,
+    the bytes of each field are shuffled into byte planes (see the spikesFileToBytes function).
+
+    If bit_widths is specified, addresses and timestamps are bit-packed with these exact bit widths (see the
+    calcRequiredBits function) instead of the desired sizes. If delta_timestamps is also True, the bit width of the
+    timestamps is replaced by the one of their deltas.
+
+    If threads is greater than 1, the data of a non-chunked file is split into frames that are compressed in parallel
+    (see the compressFrames function). The chunks of chunked containers are compressed one by one.
+
+    If dictionary_id is specified, the data (or each chunk or frame) is compressed with this trained dictionary, which
+    must have been loaded (see the loadDictionary function), and its ID is stored in the header.
+
+    If group_size is specified or split_polarity is True, the compressed file is a chunked container (with chunks of
+    DEFAULT_CHUNK_SIZE events, if chunk_size is not specified) whose spikes are split into address groups (see the
+    calcAddressGroups function): the spikes of each group are stored in separate chunks, so the spikes of some addresses
+    can be decompressed without decompressing the other groups (see the extractAddresses function). The group sequence
+    of the spikes is stored before the chunks, so that decompressing the whole file restores their original order (see
+    the calcGroupSequence function).
 
     :param SpikesFile spikes_file: The input SpikesFile object from pyNAVIS. It must contain raw spikes data.
     :param int initial_address_size: An int indicating the size of the addresses in spikes_file.
@@ -206,29 +935,121 @@ def spikesFileToCompressedFile(spikes_file, initial_address_size, initial_timest
     :param int desired_timestamp_size: An int indicating the size of the timestamps.
     :param string compressor: A string indicating the compressor to be used.
     :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int chunk_size: An int indicating the number of events of each chunk of a chunked container. None disables it.
+    :param boolean delta_timestamps: A boolean indicating whether or not to store zigzag-encoded timestamp deltas.
+    :param boolean columnar: A boolean indicating whether or not to store all the addresses before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not to shuffle the bytes of each field into byte planes.
+    :param tuple bit_widths: A tuple (address_bits, timestamp_bits) indicating the exact bit widths of the fields. None
+    disables bit-packing.
+    :param int threads: An int indicating the number of threads used to compress the data.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+    :param boolean prune_bytes: A boolean indicating whether or not to prune the bytes of the fields. None uses the
+    default behaviour of the codec.
+    :param int group_size: An int indicating the number of consecutive addresses of each address group. None disables
+    address groups unless split_polarity is True.
+    :param boolean split_polarity: A boolean indicating whether or not the address groups are split by polarity.
 
     :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed spikes data.
     :rtype: bytearray
     """
-    if compressor != "LZMA":
+    final_address_size, final_timestamp_size = calcFinalSizes(compressor, desired_address_size,
+                                                              desired_timestamp_size, verbose=verbose,
+                                                              prune_bytes=prune_bytes)
+
+    # Limits of the spikes of each address group (all the spikes are a single group if they are not split)
+    num_events = len(spikes_file.timestamps)
+    grouped = group_size is not None or split_polarity
+    groups_limits = [0, num_events]
+    if grouped:
+        if chunk_size is None:
+            chunk_size = DEFAULT_CHUNK_SIZE
+
+        # The spikes are sorted by group, keeping their order inside each group
+        groups = calcAddressGroups(spikes_file.addresses, group_size, split_polarity)
+        group_sequence = calcGroupSequence(groups)
+        order = np.argsort(group_sequence, kind="stable")
+        groups = groups[order]
+        spikes_file = SpikesFile(spikes_file.addresses[order], spikes_file.timestamps[order])
+        groups_limits = [0, *(np.flatnonzero(np.diff(groups)) + 1).tolist(), num_events]
+
+    # Limits of each chunk, which never contains spikes of two groups
+    chunks_limits = []
+    if chunk_size is not None:
+        chunks_limits = [(i, min(i + chunk_size, group_end))
+                         for group_start, group_end in zip(groups_limits[:-1], groups_limits[1:])
+                         for i in range(group_start, group_end, chunk_size)]
+
+    if delta_timestamps:
+        # The deltas of each chunk are relative to its first timestamp (or to 0 if the file is not chunked)
+        if chunk_size is None:
+            chunks_timestamps = [(spikes_file.timestamps, 0)]
+        else:
+            chunks_timestamps = [(spikes_file.timestamps[start:end], np.min(spikes_file.timestamps[start:end]))
+                                 for start, end in chunks_limits]
+
+        final_timestamp_size = max([calcRequiredDeltaBytes(timestamps, timestamp_base)
+                                    for timestamps, timestamp_base in chunks_timestamps], default=1)
+        if bit_widths is not None:
+            bit_widths = (bit_widths[0], max([calcRequiredDeltaBits(timestamps, timestamp_base)
+                                              for timestamps, timestamp_base in chunks_timestamps], default=1))
+
+    if bit_widths is not None:
+        final_address_size, final_timestamp_size = [int(math.ceil(bits / 8)) for bits in bit_widths]
+
+    if chunk_size is not None:
+        # Create the header of the chunked container
+        header = CompressedFileHeader(compressor, final_address_size, final_timestamp_size)
+        header.addOption("C")
+        addConversionOptions(header, delta_timestamps=delta_timestamps, columnar=columnar, shuffle=shuffle,
+                             bit_widths=bit_widths)
+        addDictionaryOption(header, dictionary_id)
+        header.addOption("X")
+        compressed_sequence = b""
+        if grouped:
+            addAddressGroupOption(header, group_size, split_polarity)
+
+            # The group sequence is compressed first, since its checksums are stored in the header
+            group_sequence_bytes = group_sequence.tobytes()
+            compressed_sequence = compressData(group_sequence_bytes, compressor, verbose=False, level=level)
+            addGroupSequenceOption(header, group_sequence.dtype.itemsize,
+                                   calcChecksums(compressed_sequence, group_sequence_bytes))
+        addSpikesMetadata(header, spikes_file)
+        header.setMetadata(data_size=sum(calcConvertedSize(end - start, final_address_size, final_timestamp_size,
+                                                           **getConversionOptions(header))
+                                         for start, end in chunks_limits))
+
+        # Compress each chunk independently
+        spikes_chunks = (SpikesFile(spikes_file.addresses[start:end], spikes_file.timestamps[start:end])
+                         for start, end in chunks_limits)
+        chunks_groups = [int(groups[start]) for start, _ in chunks_limits] if grouped else None
+        file = io.BytesIO()
+        file.write(header.toBytes())
+        file.write(compressed_sequence)
+        writeCompressedChunks(spikes_chunks, initial_address_size, initial_timestamp_size, final_address_size,
+                              final_timestamp_size, compressor, file, level=level, dictionary_id=dictionary_id,
+                              checksums=True, groups=chunks_groups, offset=len(compressed_sequence),
+                              **getConversionOptions(header))
+
         if verbose:
-            print("spikesFileToCompressedFile: Considering 4-byte addresses and timestamps before the compression "
-                  "process when NOT using LZMA as the compression algorithm")
-        final_address_size = 4
-        final_timestamp_size = 4
-    else:
-        final_address_size = desired_address_size
-        final_timestamp_size = desired_timestamp_size
+            print("Done! SpikesFile compressed into a chunked compressed file bytearray")
 
-    # Call to spikesFileToBytes function
-    spikes_bytes = spikesFileToBytes(spikes_file, initial_address_size, initial_timestamp_size, final_address_size,
-                                     final_timestamp_size, verbose=verbose)
+        return bytearray(file.getbuffer())
 
     # Create the header of the compressed file
     header = CompressedFileHeader(compressor, final_address_size, final_timestamp_size)
+    addConversionOptions(header, delta_timestamps=delta_timestamps, columnar=columnar, shuffle=shuffle,
+                         bit_widths=bit_widths)
+    addDictionaryOption(header, dictionary_id)
+    header.addOption("X")
+    addSpikesMetadata(header, spikes_file)
+
+    # Call to spikesFileToBytes function
+    spikes_bytes = spikesFileToBytes(spikes_file, initial_address_size, initial_timestamp_size, final_address_size,
+                                     final_timestamp_size, verbose=verbose, **getConversionOptions(header))
 
     # Call to bytesToCompressedFile function
-    compressed_file = bytesToCompressedFile(spikes_bytes, header, verbose=verbose)
+    compressed_file = bytesToCompressedFile(spikes_bytes, header, verbose=verbose, threads=threads, level=level)
 
     if verbose:
         print("Done! SpikesFile compressed into a compressed file bytearray")
@@ -236,7 +1057,7 @@ def spikesFileToCompressedFile(spikes_file, initial_address_size, initial_timest
     return compressed_file
 
 
-def compressedFileToSpikesFile(compressed_file, verbose=False):
+def compressedFileToSpikesFile(compressed_file, verbose=False, threads=1, native=False):
     """
     Converts a bytearray of CompressedFileHeader and compressed spikes of a-bytes addresses and b-bytes timestamps,
     where a and b are address_size and timestamp_size ints which are inside the bytearray, to a SpikesFile of raw spikes
@@ -246,16 +1067,35 @@ def compressedFileToSpikesFile(compressed_file, verbose=False):
 
     :param bytearray, bytes compressed_file: The input bytearray that contains the CompressedFileHeader and the compressed spikes.
     :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int threads: An int indicating the number of threads used to decompress the frames of the file (if any).
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
 
     :return: The output SpikesFile object from pyNAVIS.
     :rtype: SpikesFile
     """
-    # Call to compressedFileToBytes function
-    data, header = compressedFileToBytes(compressed_file, verbose=verbose)
+    # Extract the compressed spikes
+    header, compressed_data = extractCompressedData(compressed_file)
 
-    # Call to bytesToSpikesFile function
-    spikes_file, final_address_size, final_timestamp_size = bytesToSpikesFile(data, header.address_size,
-                                                                              header.timestamp_size, verbose=verbose)
+    if header.getOption("C") is not None:
+        # The chunks of a chunked container are converted one by one
+        index = readChunkIndex(compressed_data)
+        group_sequence = None
+        if len(index) > 0:
+            group_sequence = decompressGroupSequence(compressed_data[:int(index[0]["offset"])], header)
+        compressed_chunks = (compressed_data[int(entry["offset"]):int(entry["offset"]) + int(entry["size"])]
+                             for entry in index)
+        spikes_file, final_address_size, final_timestamp_size = chunksToSpikesFile(compressed_chunks, index, header,
+                                                                                   native=native,
+                                                                                   group_sequence=group_sequence)
+    else:
+        # Decompress the data
+        data = decompressFileData(compressed_data, header, threads=threads)
+
+        # Call to bytesToSpikesFile function
+        spikes_file, final_address_size, final_timestamp_size = \
+            bytesToSpikesFile(data, header.address_size, header.timestamp_size, verbose=verbose, native=native,
+                              **getConversionOptions(header))
 
     if verbose:
         print("compressedFileToSpikesFile: Compressed file bytearray decompressed into a SpikesFile")
@@ -263,145 +1103,1338 @@ def compressedFileToSpikesFile(compressed_file, verbose=False):
     return header, spikes_file, final_address_size, final_timestamp_size
 
 
-def extractCompressedData(compressed_file, verbose=False):
+def addConversionOptions(header, delta_timestamps=False, columnar=False, shuffle=False, bit_widths=None):
     """
-    Extracts the CompressedFileHeader object and the compressed spikes from an input bytearray.
+    Inserts into a CompressedFileHeader the options that describe how the spikes were converted into bytes (see the
+    spikesFileToBytes function).
 
-    :param bytearray, bytes compressed_file: The input bytearray (or bytes). It contains the CompressedFileHeader bound to the compressed spikes.
-    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    This function is the inverse of the getConversionOptions function.
 
-    :return: This function returns two different objects, listed below:
-    - header (CompressedFileHeader): The output CompressedFileHeader object.
-    - compressed_data (bytearray): The output bytearray that contains the compressed spikes.
+    :param CompressedFileHeader header: The header of the compressed file.
+    :param boolean delta_timestamps: A boolean indicating whether or not timestamps are stored as zigzag-encoded deltas.
+    :param boolean columnar: A boolean indicating whether or not all the addresses are stored before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not the bytes of each field are shuffled into byte planes.
+    :param tuple bit_widths: A tuple (address_bits, timestamp_bits) indicating the exact bit widths of the fields if
+    they are bit-packed. None if they are not.
+
+    :return: None
     """
-    start_time = time.time()
+    if delta_timestamps:
+        header.addOption("D")
+    if columnar:
+        header.addOption("L")
+    if shuffle:
+        header.addOption("S")
+    if bit_widths is not None:
+        header.addOption("B", bytes(bit_widths))
 
-    # Create a new CompressedFileHeader
-    header = CompressedFileHeader()
 
-    # Separate header and compressed data
-    start_index = 0
-    end_index = header.library_version_size
-    header.library_version = compressed_file[start_index:end_index].decode("utf-8").strip()
+def getConversionOptions(header):
+    """
+    Reads from a CompressedFileHeader the options that describe how the spikes were converted into bytes. They are
+    returned as a dict of keyword arguments for the spikesFileToBytes and bytesToSpikesFile functions.
 
-    start_index = end_index
-    end_index = start_index + header.compressor_size
-    header.compressor = compressed_file[start_index:end_index].decode("utf-8").strip()
+    This function is the inverse of the addConversionOptions function.
 
-    start_index = end_index
-    end_index = start_index + header.address_size_size
-    header.address_size = int.from_bytes(compressed_file[start_index:end_index], "big")
+    :param CompressedFileHeader header: The header of the compressed file.
 
-    start_index = end_index
-    end_index = start_index + header.timestamp_size_size
-    header.timestamp_size = int.from_bytes(compressed_file[start_index:end_index], "big")
+    :return: A dict of keyword arguments.
+    :rtype: dict
+    """
+    bit_widths = header.getOption("B")
 
-    start_index = end_index
-    end_index = start_index + header.optional_size
-    header.optional = compressed_file[start_index:end_index]
+    return {"delta_timestamps": header.getOption("D") is not None,
+            "columnar": header.getOption("L") is not None,
+            "shuffle": header.getOption("S") is not None,
+            "bit_widths": tuple(bit_widths) if bit_widths is not None else None}
 
-    start_index = end_index
-    end_index = start_index + header.header_end_size
-    header.header_end = compressed_file[start_index:end_index].decode("utf-8")
 
-    start_index = end_index
-    compressed_data = bytes(compressed_file[start_index:])
+def addDictionaryOption(header, dictionary_id):
+    """
+    Adds the K option to a CompressedFileHeader, which indicates the ID of the trained dictionary used to compress the
+    data (if any).
 
-    end_time = time.time()
-    if verbose:
-        print("-> Extracted data in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+    :param CompressedFileHeader header: The header of the compressed file.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary. None does not add the option.
 
-    return header, compressed_data
+    :return: None
+    """
+    if dictionary_id is not None:
+        header.addOption("K", int(dictionary_id).to_bytes(4, "big"))
 
 
-def compressData(data, compressor, verbose=True):
+def getDictionaryOption(header):
     """
-    Compress the input data via the specified compressor.
+    Returns the ID of the trained dictionary used to compress the data of a compressed file (see the addDictionaryOption
+    function).
 
-    :param bytearray, bytes data: The input data.
-    :param string compressor: A string indicating the compressor to be used.
-    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param CompressedFileHeader header: The header of the compressed file.
 
-    :return: The output data (compressed data).
-    :rtype: bytearray
+    :return: An int indicating the ID of the trained dictionary, or None if no dictionary was used.
+    :rtype: int
     """
-    start_time = time.time()
+    dictionary_id = header.getOption("K")
 
-    if compressor == "ZSTD":
-        cctx = zstandard.ZstdCompressor()
-        compressed_data = cctx.compress(data)
-    elif compressor == "LZ4":
-        compressed_data = lz4.frame.compress(data)
-    elif compressor == "LZMA":
-        compressed_data = pylzma.compress(data)
-    else:
-        raise ValueError("Compressor not recognized")
+    return None if dictionary_id is None else int.from_bytes(dictionary_id, "big")
 
-    end_time = time.time()
-    if verbose:
-        print("-> Compressed data in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
 
-    return compressed_data
+def addAddressGroupOption(header, group_size, split_polarity):
+    """
+    Adds the G option to a CompressedFileHeader, which indicates how the spikes of a chunked container are split into
+    address groups (see the calcAddressGroups function).
 
+    :param CompressedFileHeader header: The header of the compressed file.
+    :param int group_size: An int indicating the number of consecutive addresses of each group. None (or 0) uses a
+    single block.
+    :param boolean split_polarity: A boolean indicating whether or not groups are split by polarity.
 
-def decompressData(compressed_data, compressor, verbose=False):
+    :return: None
     """
-    Decompress the input compressed data via the specified compressor.
+    header.addOption("G", int(group_size or 0).to_bytes(4, "big") + bytes([int(bool(split_polarity))]))
 
-    :param bytearray, bytes compressed_data: The input data.
-    :param string compressor: A string indicating the compressor to be used.
-    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
 
-    :return: The output data (decompressed data).
-    :rtype: bytearray
+def getAddressGroupOption(header):
     """
-    start_time = time.time()
+    Returns how the spikes of a chunked container are split into address groups (see the addAddressGroupOption
+    function).
 
-    if compressor == "ZSTD":
-        dctx = zstandard.ZstdDecompressor()
-        decompressed_data = dctx.decompress(compressed_data)
-    elif compressor == "LZ4":
-        decompressed_data = lz4.frame.decompress(compressed_data)
-    elif compressor == "LZMA":
-        decompressed_data = pylzma.decompress(compressed_data)
-    else:
-        raise ValueError("Compressor not recognized")
+    :param CompressedFileHeader header: The header of the compressed file.
 
-    end_time = time.time()
-    if verbose:
-        print("-> Decompressed data in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+    :return: A tuple (group_size, split_polarity), or None if the spikes are not split into address groups.
+    :rtype: tuple
+    """
+    address_groups = header.getOption("G")
+    if address_groups is None:
+        return None
 
-    return decompressed_data
+    return int.from_bytes(address_groups[:4], "big"), bool(address_groups[4])
 
 
-def getCompressedFile(header, data, verbose=False):
+def calcGroupSequence(groups):
     """
-    Assembles the full compressed aedat file by joining the CompressedFileHeader object to the compressed spikes data.
+    Calculates the group sequence of the spikes of a chunked container split into address groups: the rank of the
+    address group of each spike (among the sorted groups), in the original order of the spikes. The chunks contain the
+    spikes sorted by group, so the group sequence restores their original order, including the order of the spikes
+    with the same timestamp (see the chunksToSpikesFile function).
 
-    :param CompressedFileHeader header: The header to attach to the compressed file.
-    :param bytearray, bytes data: The input bytearray containing data to be compressed.
-    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param numpy.ndarray groups: The address group of each spike (see the calcAddressGroups function).
 
-    :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed spikes data.
-    :rtype: bytearray
+    :return: The group sequence. Its items are big-endian ints of the minimum size that allows to represent the ranks
+    (1, 2 or 4 bytes).
+    :rtype: numpy.ndarray
     """
-    start_time = time.time()
-
-    # Create file with header
-    compressed_file = header.toBytes()
+    group_values, group_sequence = np.unique(groups, return_inverse=True)
+    item_size = 1 if len(group_values) <= 1 << 8 else 2 if len(group_values) <= 1 << 16 else 4
 
-    # Compress data and extend the compressed file with it
-    compressed_data = compressData(data, header.compressor, verbose=False)
-    compressed_file.extend(compressed_data)
+    return group_sequence.reshape(-1).astype(">u" + str(item_size))
 
-    end_time = time.time()
-    if verbose:
-        print("-> Compressed data attached to the header in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
 
-    return compressed_file
+def addGroupSequenceOption(header, item_size, checksums):
+    """
+    Adds the O option to a CompressedFileHeader, which indicates that the compressed data of a chunked container split
+    into address groups starts with its compressed group sequence (see the calcGroupSequence function).
 
+    :param CompressedFileHeader header: The header of the compressed file.
+    :param int item_size: An int indicating the size of each item of the group sequence (1, 2 or 4 bytes).
+    :param tuple checksums: A tuple (compressed_crc, data_crc) with the checksums of the group sequence (see the
+    calcChecksums function).
 
-def storeFile(file_bytes, initial_file_path, ask_user=False, overwrite=False):
+    :return: None
+    """
+    header.addOption("O", bytes([item_size]) + np.array([checksums], dtype=CHECKSUM_STRUCT).tobytes())
+
+
+def getGroupSequenceOption(header):
+    """
+    Returns how the group sequence of a chunked container is stored (see the addGroupSequenceOption function).
+
+    :param CompressedFileHeader header: The header of the compressed file.
+
+    :return: A tuple (item_size, checksums), or None if the compressed data does not contain a group sequence.
+    :rtype: tuple
+    """
+    group_sequence = header.getOption("O")
+    if group_sequence is None:
+        return None
+
+    checksums = np.frombuffer(group_sequence, CHECKSUM_STRUCT, count=1, offset=1)[0]
+
+    return group_sequence[0], (int(checksums["compressed_crc"]), int(checksums["data_crc"]))
+
+
+def decompressGroupSequence(compressed_sequence, header):
+    """
+    Decompresses the group sequence of a chunked container split into address groups (see the calcGroupSequence
+    function).
+
+    :param bytearray, bytes compressed_sequence: The compressed data of the chunked container that precedes its first
+    chunk.
+    :param CompressedFileHeader header: The CompressedFileHeader of the chunked container.
+
+    :return: The group sequence, or None if the chunked container does not contain it (e.g. it is not split into
+    address groups, or it was written by a previous version of AERzip).
+    :rtype: numpy.ndarray
+    """
+    group_sequence_option = getGroupSequenceOption(header)
+    if group_sequence_option is None:
+        return None
+
+    item_size, _ = group_sequence_option
+    data = decompressData(compressed_sequence, header.compressor)
+
+    return np.frombuffer(data, ">u" + str(item_size))
+
+
+def addSpikesMetadata(header, spikes_file):
+    """
+    Stores the number of spikes and the timestamp range of a SpikesFile in the metadata of a CompressedFileHeader (see
+    the CompressedFileHeader class). The timestamps must be the ones stored in the compressed file (e.g. adapted).
+
+    :param CompressedFileHeader header: The CompressedFileHeader.
+    :param SpikesFile spikes_file: The SpikesFile object from pyNAVIS.
+
+    :return: None
+    """
+    timestamps = spikes_file.timestamps
+    if len(timestamps) > 0:
+        header.setMetadata(num_events=len(timestamps), min_ts=np.min(timestamps), max_ts=np.max(timestamps))
+    else:
+        header.setMetadata(num_events=0)
+
+
+def getDictionaryPath(dir_path, dictionary_id):
+    """
+    Calculates where a trained dictionary is stored. Dictionaries are stored in the folder of the compressed files that
+    use them (e.g. compressedEvents/dataset_ZSTD), named after their ID (see DICTIONARY_FILE_NAME).
+
+    :param string dir_path: A string indicating the folder of the compressed files.
+    :param int dictionary_id: An int indicating the ID of the dictionary.
+
+    :return: A string indicating the dictionary file path.
+    :rtype: string
+    """
+    return os.path.join(dir_path, DICTIONARY_FILE_NAME.format(dictionary_id))
+
+
+def storeDictionary(dictionary, dir_path, compressor="ZSTD"):
+    """
+    Stores a trained dictionary in a folder (see the getDictionaryPath function) and loads it, so that it can be used by
+    the compression functions.
+
+    :param bytes dictionary: The data of the trained dictionary.
+    :param string dir_path: A string indicating the folder of the compressed files that use the dictionary.
+    :param string compressor: A string indicating the compressor the dictionary was trained for.
+
+    :return: This function returns two different objects, listed below:
+    - dictionary_id (int): An int indicating the ID of the dictionary.
+    - dictionary_path (string): A string indicating where the dictionary has been stored.
+    """
+    dictionary_id = addDictionary(dictionary, compressor)
+    dictionary_path = getDictionaryPath(dir_path, dictionary_id)
+    storeFile(dictionary, dictionary_path, overwrite=True)
+
+    return dictionary_id, dictionary_path
+
+
+def loadDictionary(file_path, compressor="ZSTD"):
+    """
+    Loads a trained dictionary from a file, so that it can be used by the compression functions.
+
+    :param string file_path: A string indicating the dictionary file path.
+    :param string compressor: A string indicating the compressor the dictionary was trained for.
+
+    :return: An int indicating the ID of the dictionary.
+    :rtype: int
+    """
+    return addDictionary(loadFile(file_path), compressor)
+
+
+def loadCompressedFileDictionary(file_path):
+    """
+    Loads the trained dictionary used to compress a compressed file (if any) from the folder of the file, unless it has
+    already been loaded. Only the header of the compressed file is read.
+
+    :param string file_path: A string indicating the compressed aedat file path.
+
+    :return: An int indicating the ID of the dictionary, or None if no dictionary was used.
+    :rtype: int
+    """
+    with open(file_path, "rb") as file:
+        header = readCompressedFileHeader(file)
+
+    dictionary_id = getDictionaryOption(header)
+    if dictionary_id is not None and dictionary_id not in dictionaries:
+        loadDictionary(getDictionaryPath(os.path.dirname(file_path), dictionary_id), header.compressor)
+
+    return dictionary_id
+
+
+def extractCompressedData(compressed_file, verbose=False):
+    """
+    Extracts the CompressedFileHeader object and the compressed spikes from an input bytearray. Both version 1 headers
+    (written by previous versions of AERzip) and version 2 headers (followed by their metadata block) are supported.
+
+    The compressed spikes are returned as a memoryview of the input bytearray instead of a copy, so this function takes
+    the same time for any file size. Note that the memoryview keeps the input bytearray (or memory map) alive.
+
+    :param bytearray, bytes, mmap.mmap compressed_file: The input bytearray (or bytes, or memory map). It contains the CompressedFileHeader bound to the compressed spikes.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+
+    :return: This function returns two different objects, listed below:
+    - header (CompressedFileHeader): The output CompressedFileHeader object.
+    - compressed_data (memoryview): The output memoryview that contains the compressed spikes.
+    """
+    start_time = time.time()
+
+    # Create a new CompressedFileHeader. Its sizes are overwritten below with the ones stored in the compressed file
+    header = CompressedFileHeader(address_size=0, timestamp_size=0)
+
+    # Parse all the fields of the header at once, without copying the compressed file
+    compressed_file = memoryview(compressed_file).cast("B")
+    library_version, compressor, address_size, timestamp_size, optional, header_end = \
+        header.header_struct.unpack_from(compressed_file)
+
+    header.library_version = library_version.decode("utf-8").strip()
+    header.compressor = compressor.decode("utf-8").strip()
+    header.address_size = address_size
+    header.timestamp_size = timestamp_size
+    header.optional = bytearray(optional)
+    header.readOptions()
+    header.header_end = header_end.decode("utf-8")
+    if header.header_version >= 2:
+        header.readMetadata(compressed_file[header.header_size:header.getSize()])
+
+    # The compressed data is a view of the compressed file (without the checksum trailer, if any)
+    compressed_data = compressed_file[header.getSize():len(compressed_file) - getChecksumTrailerSize(header)]
+
+    end_time = time.time()
+    if verbose:
+        print("-> Extracted data in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return header, compressed_data
+
+
+def readCompressedFileHeader(file):
+    """
+    Reads the CompressedFileHeader of a compressed file from a binary file object, leaving the file positioned at the
+    start of the compressed data. Only the header (and its metadata block, if any) is read, so the recording can be
+    described without reading or decompressing its spikes.
+
+    :param file file: A binary file object positioned at the start of the compressed file.
+    :raises ValueError: The file is too short to contain a CompressedFileHeader.
+
+    :return: The CompressedFileHeader of the compressed file.
+    :rtype: CompressedFileHeader
+    """
+    header_bytes = file.read(CompressedFileHeader.header_size)
+    if len(header_bytes) < CompressedFileHeader.header_size:
+        raise ValueError("The file is too short to contain a CompressedFileHeader.")
+
+    # The metadata block (if any) is not read yet, so a blank one is parsed and replaced below
+    header, _ = extractCompressedData(header_bytes + bytes(CompressedFileHeader.metadata_size))
+    if header.header_version >= 2:
+        metadata = file.read(header.metadata_size)
+        if len(metadata) < header.metadata_size:
+            raise ValueError("The file is too short to contain a CompressedFileHeader.")
+        header.readMetadata(metadata)
+
+    return header
+
+
+def getCompressedFileInfo(file_path):
+    """
+    Describes a compressed file without decompressing its spikes (e.g. to scan a dataset). The metadata of version 2
+    headers is read directly. For version 1 headers of chunked containers, the number of spikes, the size of the
+    uncompressed data and the timestamp range are calculated from the chunk index (the rest of the metadata is None).
+
+    :param string file_path: A string indicating the path of the compressed file.
+
+    :return: This function returns two different objects, listed below:
+    - header (CompressedFileHeader): The CompressedFileHeader of the compressed file, with its metadata.
+    - compressed_size (int): An int indicating the size of the compressed file (bytes).
+    """
+    with open(file_path, "rb") as file:
+        header = readCompressedFileHeader(file)
+        compressed_size = os.fstat(file.fileno()).st_size
+
+        if header.num_events is None and header.getOption("C") is not None:
+            file.seek(compressed_size - CHUNK_INDEX_TRAILER_SIZE)
+            index_offset, num_chunks = readChunkIndexTrailer(file.read(CHUNK_INDEX_TRAILER_SIZE))
+            file.seek(header.getSize() + index_offset)
+            index = np.frombuffer(file.read(num_chunks * CHUNK_INDEX_STRUCT.itemsize), CHUNK_INDEX_STRUCT)
+
+            conversion_options = getConversionOptions(header)
+            data_size = sum(calcConvertedSize(int(events), header.address_size, header.timestamp_size,
+                                              **conversion_options) for events in index["events"])
+            header.setMetadata(num_events=np.sum(index["events"]), data_size=data_size)
+            if num_chunks > 0:
+                header.setMetadata(min_ts=np.min(index["first_ts"]), max_ts=np.max(index["last_ts"]))
+
+    return header, compressed_size
+
+
+def verifyCompressedFile(file_path, read_size=DEFAULT_READ_SIZE):
+    """
+    Verifies the integrity of a compressed file without converting its spikes to a SpikesFile. Every chunk of a chunked
+    container (or the whole compressed data of other files) is decompressed, and its size is compared with the one
+    expected from the index and the metadata of the header. If the header contains the X option, the checksums of the
+    compressed and decompressed data are also compared with the stored ones. Files without checksums (e.g. written by
+    previous versions of AERzip) can only be checked for truncation and decompression errors.
+
+    Chunks are read one by one and the data of other files (except multi-frame files) is decompressed as a stream of
+    read_size chunks, so the memory usage does not depend on the size of the file. If the file uses a trained
+    dictionary, it is loaded from the folder of the file (see the loadCompressedFileDictionary function).
+
+    :param string file_path: A string indicating the path of the compressed file.
+    :param int read_size: An int indicating the size of each read of the compressed data (in bytes).
+    :raises ValueError: The compressed file is not valid. The message describes the first problem found.
+
+    :return: The CompressedFileHeader of the compressed file.
+    :rtype: CompressedFileHeader
+    """
+    loadCompressedFileDictionary(file_path)
+
+    with open(file_path, "rb") as file:
+        header = readCompressedFileHeader(file)
+        header_size = header.getSize()
+        file_size = os.fstat(file.fileno()).st_size
+        dictionary_id = getDictionaryOption(header)
+        checksums = header.getOption("X") is not None
+
+        num_events = None
+        if header.getOption("C") is not None:
+            # Read the chunk index (and the checksums and groups tables, if any)
+            if file_size < header_size + CHUNK_INDEX_TRAILER_SIZE:
+                raise ValueError("The chunk index was not found. The compressed file could be truncated.")
+            file.seek(file_size - CHUNK_INDEX_TRAILER_SIZE)
+            index_offset, num_chunks = readChunkIndexTrailer(file.read(CHUNK_INDEX_TRAILER_SIZE))
+            table_size = (num_chunks + 1) * CHECKSUM_STRUCT.itemsize if checksums else 0
+            groups_size = num_chunks * CHUNK_GROUP_STRUCT.itemsize if header.getOption("G") is not None else 0
+            if header_size + index_offset + num_chunks * CHUNK_INDEX_STRUCT.itemsize + CHUNK_INDEX_TRAILER_SIZE != \
+                    file_size or index_offset < table_size + groups_size:
+                raise ValueError("The chunk index does not match the size of the compressed file.")
+
+            # The checksum of the index also covers the groups table
+            file.seek(header_size + index_offset - groups_size - table_size)
+            checksums_table = file.read(table_size)
+            index_bytes = file.read(groups_size + num_chunks * CHUNK_INDEX_STRUCT.itemsize)
+            if checksums:
+                index_checksums = np.frombuffer(checksums_table[-CHECKSUM_STRUCT.itemsize:], CHECKSUM_STRUCT)[0]
+                if zlib.crc32(index_bytes) != int(index_checksums["compressed_crc"]) or \
+                        zlib.crc32(checksums_table[:-CHECKSUM_STRUCT.itemsize]) != int(index_checksums["data_crc"]):
+                    raise ValueError("The checksum of the chunk index does not match.")
+            chunks_checksums = np.frombuffer(checksums_table, CHECKSUM_STRUCT)
+            index = np.frombuffer(index_bytes, CHUNK_INDEX_STRUCT, offset=groups_size)
+
+            # The group sequence (if any) precedes the first chunk, and its checksums are stored in the header
+            group_sequence_option = getGroupSequenceOption(header)
+            if group_sequence_option is not None and num_chunks > 0:
+                item_size, (compressed_crc, data_crc) = group_sequence_option
+                file.seek(header_size)
+                compressed_sequence = file.read(int(index[0]["offset"]))
+                if zlib.crc32(compressed_sequence) != compressed_crc:
+                    raise ValueError("The checksum of the compressed group sequence does not match.")
+
+                try:
+                    data = decompressData(compressed_sequence, header.compressor)
+                except Exception as error:
+                    raise ValueError("The group sequence could not be decompressed: " + str(error)) from error
+
+                if len(data) != int(np.sum(index["events"], dtype=np.uint64)) * item_size:
+                    raise ValueError("The size of the group sequence does not match the number of events.")
+                if zlib.crc32(data) != data_crc:
+                    raise ValueError("The checksum of the decompressed group sequence does not match.")
+
+            conversion_options = getConversionOptions(header)
+            num_events = 0
+            data_size = 0
+            for i, entry in enumerate(index):
+                if int(entry["offset"]) + int(entry["size"]) > index_offset - table_size - groups_size:
+                    raise ValueError("Chunk " + str(i) + " is out of the compressed data.")
+                file.seek(header_size + int(entry["offset"]))
+                compressed_chunk = file.read(int(entry["size"]))
+                if checksums and zlib.crc32(compressed_chunk) != int(chunks_checksums[i]["compressed_crc"]):
+                    raise ValueError("The checksum of the compressed data of chunk " + str(i) + " does not match.")
+
+                try:
+                    data = decompressData(compressed_chunk, header.compressor, dictionary_id=dictionary_id)
+                except Exception as error:
+                    raise ValueError("Chunk " + str(i) + " could not be decompressed: " + str(error)) from error
+
+                if len(data) != calcConvertedSize(int(entry["events"]), header.address_size, header.timestamp_size,
+                                                  **conversion_options):
+                    raise ValueError("The size of the decompressed data of chunk " + str(i) + " does not match its "
+                                     "number of events.")
+                if checksums and zlib.crc32(data) != int(chunks_checksums[i]["data_crc"]):
+                    raise ValueError("The checksum of the decompressed data of chunk " + str(i) + " does not match.")
+
+                num_events += int(entry["events"])
+                data_size += len(data)
+        else:
+            # Read the checksum trailer (if any)
+            compressed_size = file_size - header_size - getChecksumTrailerSize(header)
+            if compressed_size < 0:
+                raise ValueError("The compressed file is truncated.")
+            if checksums:
+                file.seek(file_size - CHECKSUM_TRAILER_SIZE)
+                compressed_crc, data_crc = readChecksumTrailer(file.read(CHECKSUM_TRAILER_SIZE))
+                file.seek(header_size)
+
+            compressed_checksum = 0
+            data_checksum = 0
+            data_size = 0
+            try:
+                if header.getOption("F") is not None:
+                    compressed_data = file.read(compressed_size)
+                    compressed_checksum = zlib.crc32(compressed_data)
+                    data_chunks = [decompressFileData(compressed_data, header)]
+                else:
+                    def readChunks():
+                        nonlocal compressed_checksum
+                        for compressed_chunk in readFileChunks(file, read_size, compressed_size):
+                            compressed_checksum = zlib.crc32(compressed_chunk, compressed_checksum)
+                            yield compressed_chunk
+
+                    data_chunks = decompressDataStream(readChunks(), header.compressor, dictionary_id=dictionary_id)
+
+                for data_chunk in data_chunks:
+                    data_checksum = zlib.crc32(data_chunk, data_checksum)
+                    data_size += len(data_chunk)
+            except Exception as error:
+                raise ValueError("The compressed data could not be decompressed: " + str(error)) from error
+
+            if checksums and compressed_checksum != compressed_crc:
+                raise ValueError("The checksum of the compressed data does not match.")
+            if checksums and data_checksum != data_crc:
+                raise ValueError("The checksum of the decompressed data does not match.")
+
+    if header.data_size is not None and data_size != header.data_size:
+        raise ValueError("The size of the decompressed data does not match the one stored in the header.")
+    if header.num_events is not None and num_events is not None and num_events != header.num_events:
+        raise ValueError("The number of events does not match the one stored in the header.")
+
+    return header
+
+
+def writeCompressedChunks(spikes_chunks, initial_address_size, initial_timestamp_size, final_address_size,
+                          final_timestamp_size, compressor, file, level=None, dictionary_id=None, checksums=False,
+                          groups=None, offset=0, **conversion_options):
+    """
+    Converts and compresses each SpikesFile of a sequence independently and writes the compressed chunks to a file object,
+    followed by the chunk index and its trailer. This is the body of a chunked container, which must be preceded by a
+    CompressedFileHeader with the "C" option (and with the "X" option if checksums is True).
+
+    :param iterable spikes_chunks: An iterable of SpikesFile objects from pyNAVIS.
+    :param int initial_address_size: An int indicating the size of the addresses in the chunks.
+    :param int initial_timestamp_size: An int indicating the size of the timestamps in the chunks.
+    :param int final_address_size: An int indicating the size of the addresses in the compressed chunks.
+    :param int final_timestamp_size: An int indicating the size of the timestamps in the compressed chunks.
+    :param string compressor: A string indicating the compressor to be used.
+    :param file file: A binary file object where the chunks and the index are written.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+    :param boolean checksums: A boolean indicating whether or not the checksums of each chunk are written before the
+    index (see CHECKSUM_STRUCT).
+    :param iterable groups: An iterable with the address group of each SpikesFile, in the same order, which is written
+    before the index (see CHUNK_GROUP_STRUCT). None does not write them.
+    :param int offset: An int indicating the offset of the first chunk (relative to the end of the
+    CompressedFileHeader), i.e. the size of the data written before the chunks (e.g. the group sequence).
+    :param conversion_options: Keyword arguments passed to the spikesFileToBytes function (see the getConversionOptions
+    function). If timestamp deltas are stored, the first delta of each chunk is relative to the first timestamp of its
+    index entry.
+
+    :return: The chunk index.
+    :rtype: numpy.ndarray
+    """
+    entries = []
+    chunks_checksums = [] if checksums else None
+    chunks_groups = None if groups is None else []
+
+    # The chunks are converted into the same buffer, since each one is compressed before converting the next one
+    buffer = bytearray()
+
+    for spikes_chunk, group in zip(spikes_chunks, itertools.repeat(None) if groups is None else groups):
+        if len(spikes_chunk.timestamps) == 0:
+            continue
+
+        compressed_chunk, entry, buffer = compressChunk(spikes_chunk, initial_address_size, initial_timestamp_size,
+                                                        final_address_size, final_timestamp_size, compressor, offset,
+                                                        buffer=buffer, level=level, dictionary_id=dictionary_id,
+                                                        checksums=chunks_checksums, **conversion_options)
+        file.write(compressed_chunk)
+
+        entries.append(entry)
+        if chunks_groups is not None:
+            chunks_groups.append(group)
+        offset += len(compressed_chunk)
+
+    # Write the index and its trailer
+    index = np.array(entries, dtype=CHUNK_INDEX_STRUCT)
+    file.write(getChunkIndexBytes(index, offset, checksums=chunks_checksums, groups=chunks_groups))
+
+    return index
+
+
+def compressChunk(spikes_chunk, initial_address_size, initial_timestamp_size, final_address_size,
+                  final_timestamp_size, compressor, offset, buffer=None, level=None, dictionary_id=None,
+                  checksums=None, **conversion_options):
+    """
+    Converts and compresses a non-empty SpikesFile into a chunk of a chunked container, and builds its index entry.
+
+    :param SpikesFile spikes_chunk: The input SpikesFile object from pyNAVIS. It must contain at least one spike.
+    :param int initial_address_size: An int indicating the size of the addresses in the chunk.
+    :param int initial_timestamp_size: An int indicating the size of the timestamps in the chunk.
+    :param int final_address_size: An int indicating the size of the addresses in the compressed chunk.
+    :param int final_timestamp_size: An int indicating the size of the timestamps in the compressed chunk.
+    :param string compressor: A string indicating the compressor to be used.
+    :param int offset: An int indicating the offset of the chunk (relative to the end of the CompressedFileHeader).
+    :param bytearray buffer: A bytearray where the chunk is converted. It is replaced by a larger one if it is too small.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+    :param list checksums: A list where the checksums of the chunk are appended (see CHECKSUM_STRUCT). None does not
+    calculate them.
+    :param conversion_options: Keyword arguments passed to the spikesFileToBytes function (see the getConversionOptions
+    function).
+
+    :return: This function returns three different objects, listed below:
+    - compressed_chunk (bytes): The compressed chunk.
+    - entry (tuple): The index entry of the chunk (see CHUNK_INDEX_STRUCT).
+    - buffer (bytearray): The buffer where the chunk was converted, which can be reused with the next chunk.
+    """
+    timestamps = spikes_chunk.timestamps
+
+    chunk_size = len(timestamps) * (final_address_size + final_timestamp_size)
+    if buffer is None or len(buffer) < chunk_size:
+        buffer = bytearray(chunk_size)
+
+    first_ts = int(np.min(timestamps))
+    chunk_bytes = spikesFileToBytes(spikes_chunk, initial_address_size, initial_timestamp_size, final_address_size,
+                                    final_timestamp_size, verbose=False, timestamp_base=first_ts, buffer=buffer,
+                                    **conversion_options)
+    compressed_chunk = compressData(chunk_bytes, compressor, verbose=False, level=level, dictionary_id=dictionary_id)
+
+    entry = (offset, len(compressed_chunk), len(timestamps), first_ts, int(np.max(timestamps)))
+    if checksums is not None:
+        checksums.append(calcChecksums(compressed_chunk, chunk_bytes))
+
+    return compressed_chunk, entry, buffer
+
+
+def getChunkIndexBytes(index, index_offset, checksums=None, groups=None):
+    """
+    Builds the chunk index of a chunked container followed by its trailer. If the checksums or the address groups of
+    the chunks are specified, their tables are placed before the index (in this order).
+
+    :param numpy.ndarray index: The chunk index (see CHUNK_INDEX_STRUCT).
+    :param int index_offset: An int indicating the offset of the first table or, if there is not, of the index
+    (relative to the end of the CompressedFileHeader), i.e. the size of all the compressed chunks.
+    :param list checksums: A list with the checksums of each chunk (see CHECKSUM_STRUCT). None does not write them.
+    :param list groups: A list with the address group of each chunk (see CHUNK_GROUP_STRUCT). None does not write them.
+
+    :return: The bytes of the tables (if any), the index and its trailer.
+    :rtype: bytes
+    """
+    index_bytes = np.asarray(index, dtype=CHUNK_INDEX_STRUCT).tobytes()
+    groups_size = 0
+    if groups is not None:
+        groups_size = len(groups) * CHUNK_GROUP_STRUCT.itemsize
+        index_bytes = np.array(groups, dtype=CHUNK_GROUP_STRUCT).tobytes() + index_bytes
+
+    checksums_table = b""
+    if checksums is not None:
+        # The last entry of the table contains the checksums of the index and of the rest of the table
+        checksums_table = np.array(checksums, dtype=CHECKSUM_STRUCT).tobytes()
+        checksums_table += np.array([(zlib.crc32(index_bytes), zlib.crc32(checksums_table))],
+                                    dtype=CHECKSUM_STRUCT).tobytes()
+    index_offset += len(checksums_table) + groups_size
+
+    return (checksums_table + index_bytes + index_offset.to_bytes(8, "big") + len(index).to_bytes(8, "big") +
+            CHUNK_INDEX_END)
+
+
+def readChunkIndexTrailer(trailer):
+    """
+    Reads the trailer of a chunked container.
+
+    :param bytearray, bytes trailer: The last CHUNK_INDEX_TRAILER_SIZE bytes of the chunked container.
+    :raises ValueError: The trailer is not valid (e.g. the compressed file has been truncated).
+
+    :return: This function returns two different objects, listed below:
+    - index_offset (int): An int indicating the offset of the chunk index.
+    - num_chunks (int): An int indicating the number of chunks.
+    """
+    if len(trailer) != CHUNK_INDEX_TRAILER_SIZE or bytes(trailer[16:]) != CHUNK_INDEX_END:
+        raise ValueError("The chunk index was not found. The compressed file could be truncated.")
+
+    index_offset = int.from_bytes(trailer[0:8], "big")
+    num_chunks = int.from_bytes(trailer[8:16], "big")
+
+    return index_offset, num_chunks
+
+
+def readChunkIndex(compressed_data):
+    """
+    Reads the chunk index of the compressed data of a chunked container.
+
+    :param bytearray, bytes compressed_data: The compressed data (without the CompressedFileHeader).
+
+    :return: The chunk index.
+    :rtype: numpy.ndarray
+    """
+    index_offset, num_chunks = readChunkIndexTrailer(compressed_data[-CHUNK_INDEX_TRAILER_SIZE:])
+
+    return np.frombuffer(compressed_data, CHUNK_INDEX_STRUCT, count=num_chunks, offset=index_offset)
+
+
+def readChunkGroups(compressed_data):
+    """
+    Reads the address group of each chunk of the compressed data of a chunked container split into address groups (see
+    the addAddressGroupOption function).
+
+    :param bytearray, bytes compressed_data: The compressed data (without the CompressedFileHeader).
+
+    :return: The address group of each chunk, in the order of the chunk index.
+    :rtype: numpy.ndarray
+    """
+    index_offset, num_chunks = readChunkIndexTrailer(compressed_data[-CHUNK_INDEX_TRAILER_SIZE:])
+
+    return np.frombuffer(compressed_data, CHUNK_GROUP_STRUCT, count=num_chunks,
+                         offset=index_offset - num_chunks * CHUNK_GROUP_STRUCT.itemsize)
+
+
+def calcChecksums(compressed_data, data):
+    """
+    Calculates the CRC-32 checksums (zlib.crc32) of some compressed data and of its decompressed data.
+
+    :param bytearray, bytes, memoryview compressed_data: The compressed data.
+    :param bytearray, bytes, memoryview data: The decompressed data.
+
+    :return: A tuple (compressed_crc, data_crc) with the checksums (see CHECKSUM_STRUCT).
+    :rtype: tuple
+    """
+    return zlib.crc32(compressed_data), zlib.crc32(data)
+
+
+def getChecksumTrailerBytes(checksums):
+    """
+    Builds the checksum trailer of a compressed file that is not a chunked container.
+
+    :param tuple checksums: A tuple (compressed_crc, data_crc) with the checksums of the whole data (see the
+    calcChecksums function).
+
+    :return: The bytes of the trailer.
+    :rtype: bytes
+    """
+    return np.array([checksums], dtype=CHECKSUM_STRUCT).tobytes() + CHECKSUM_END
+
+
+def readChecksumTrailer(trailer):
+    """
+    Reads the checksum trailer of a compressed file that is not a chunked container.
+
+    :param bytearray, bytes trailer: The last CHECKSUM_TRAILER_SIZE bytes of the compressed file.
+    :raises ValueError: The trailer is not valid (e.g. the compressed file has been truncated).
+
+    :return: A tuple (compressed_crc, data_crc) with the checksums of the whole data.
+    :rtype: tuple
+    """
+    if len(trailer) != CHECKSUM_TRAILER_SIZE or bytes(trailer[CHECKSUM_STRUCT.itemsize:]) != CHECKSUM_END:
+        raise ValueError("The checksums were not found. The compressed file could be truncated.")
+
+    checksums = np.frombuffer(trailer, CHECKSUM_STRUCT, count=1)[0]
+
+    return int(checksums["compressed_crc"]), int(checksums["data_crc"])
+
+
+def getChecksumTrailerSize(header):
+    """
+    Calculates the size of the checksum trailer at the end of a compressed file. Only the compressed files with the X
+    option that are not chunked containers have one (the checksums of chunked containers are stored before their index).
+
+    :param CompressedFileHeader header: The header of the compressed file.
+
+    :return: The size of the trailer (bytes).
+    :rtype: int
+    """
+    if header.getOption("X") is None or header.getOption("C") is not None:
+        return 0
+
+    return CHECKSUM_TRAILER_SIZE
+
+
+def decompressChunkedData(compressed_data, compressor, verbose=False, dictionary_id=None):
+    """
+    Decompress all the chunks of the compressed data of a chunked container via the specified compressor.
+
+    :param bytearray, bytes compressed_data: The compressed data (without the CompressedFileHeader).
+    :param string compressor: A string indicating the compressor to be used.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+
+    :return: The output data (decompressed data of all the chunks).
+    :rtype: bytearray
+    """
+    start_time = time.time()
+
+    decompressed_data = bytearray()
+    for entry in readChunkIndex(compressed_data):
+        offset = int(entry["offset"])
+        decompressed_data.extend(decompressData(compressed_data[offset:offset + int(entry["size"])], compressor,
+                                                dictionary_id=dictionary_id))
+
+    end_time = time.time()
+    if verbose:
+        print("-> Decompressed chunks in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return decompressed_data
+
+
+def chunksToSpikesFile(compressed_chunks, index, header, native=False, group_sequence=None):
+    """
+    Decompresses and converts a sequence of chunks of a chunked container into a single SpikesFile. If the container
+    is split into address groups (G option), the original order of the spikes is restored from its group sequence when
+    all the chunks are converted. Otherwise (e.g. when only some chunks are selected), the spikes of the groups are
+    merged in timestamp order (spikes with the same timestamp are sorted by group).
+
+    :param iterable compressed_chunks: An iterable of bytearray (or bytes) objects containing the compressed chunks.
+    :param numpy.ndarray index: The index entries of the chunks, in the same order.
+    :param CompressedFileHeader header: The CompressedFileHeader of the chunked container.
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
+    :param numpy.ndarray group_sequence: The group sequence of the container (see the decompressGroupSequence function).
+    It must only be specified if all the chunks are converted, in the order of the index. None merges the groups in
+    timestamp order.
+
+    :return: This function returns three different objects, listed below:
+    - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS.
+    - final_address_size (int): An int indicating the size of the addresses in the final SpikesFile.
+    - final_timestamp_size (int): An int indicating the size of the timestamps in the final SpikesFile.
+    """
+    # An empty chunk provides the data types of an empty SpikesFile
+    spikes_file, final_address_size, final_timestamp_size = \
+        bytesToSpikesFile(b"", header.address_size, header.timestamp_size, verbose=False, native=native,
+                          **getConversionOptions(header))
+
+    # The index provides the number of events, so the output arrays are allocated once
+    num_spikes = int(np.sum(index["events"], dtype=np.uint64))
+    address_dtype = spikes_file.addresses.dtype
+    timestamp_dtype = spikes_file.timestamps.dtype
+    if header.getOption("D") is not None and len(index) > 0 and int(np.max(index["last_ts"])) >= 1 << 32:
+        timestamp_dtype = np.dtype("=u8" if native else ">u8")
+    addresses = np.empty(num_spikes, dtype=address_dtype)
+    timestamps = np.empty(num_spikes, dtype=timestamp_dtype)
+
+    position = 0
+    for compressed_chunk, entry in zip(compressed_chunks, index):
+        data = decompressData(compressed_chunk, header.compressor, dictionary_id=getDictionaryOption(header))
+        chunk_spikes_file, final_address_size, final_timestamp_size = \
+            bytesToSpikesFile(data, header.address_size, header.timestamp_size, verbose=False,
+                              timestamp_base=int(entry["first_ts"]), **getConversionOptions(header))
+        chunk_events = len(chunk_spikes_file.addresses)
+        addresses[position:position + chunk_events] = chunk_spikes_file.addresses
+        timestamps[position:position + chunk_events] = chunk_spikes_file.timestamps
+        position += chunk_events
+
+    addresses = addresses[:position]
+    timestamps = timestamps[:position]
+    if group_sequence is not None:
+        # The chunks contain the spikes sorted by group, so they are moved back to their original positions
+        if len(group_sequence) != position:
+            raise ValueError("The group sequence does not match the number of spikes of the chunks.")
+        order = np.argsort(group_sequence, kind="stable")
+        sorted_addresses, sorted_timestamps = addresses, timestamps
+        addresses = np.empty_like(sorted_addresses)
+        timestamps = np.empty_like(sorted_timestamps)
+        addresses[order] = sorted_addresses
+        timestamps[order] = sorted_timestamps
+    elif header.getOption("G") is not None:
+        order = np.argsort(timestamps, kind="stable")
+        addresses = addresses[order]
+        timestamps = timestamps[order]
+
+    spikes_file = SpikesFile(addresses, timestamps)
+    final_timestamp_size = timestamp_dtype.itemsize
+
+    return spikes_file, final_address_size, final_timestamp_size
+
+
+def compressData(data, compressor, verbose=True, level=None, dictionary_id=None):
+    """
+    Compress the input data via the specified compressor.
+
+    :param bytearray, bytes data: The input data.
+    :param string compressor: A string indicating the compressor to be used (see the getCodec function).
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+
+    :return: The output data (compressed data).
+    :rtype: bytearray
+    """
+    start_time = time.time()
+
+    compressed_data = getCodec(compressor).compress(data, level=level, dictionary=getDictionary(dictionary_id))
+
+    end_time = time.time()
+    if verbose:
+        print("-> Compressed data in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return compressed_data
+
+
+def compressDataStream(data_chunks, compressor, file, data_size=None, verbose=False, level=None, dictionary_id=None):
+    """
+    Compresses a sequence of data chunks via the specified compressor and writes the compressed data to a file object as
+    it is produced, so the whole data is never held in memory. The result is a single compressed stream, which can be
+    decompressed with the decompressData function as if the joined chunks had been compressed with compressData.
+
+    :param iterable data_chunks: An iterable of bytearray (or bytes) objects containing the data to be compressed.
+    :param string compressor: A string indicating the compressor to be used.
+    :param file file: A binary file object where the compressed data is written.
+    :param int data_size: An int indicating the total size of the data (in bytes), if known. It is stored in the
+    compressed stream when the compressor allows it.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+
+    :return: None
+    """
+    start_time = time.time()
+
+    getCodec(compressor).compressStream(data_chunks, file, data_size=data_size, level=level,
+                                        dictionary=getDictionary(dictionary_id))
+
+    end_time = time.time()
+    if verbose:
+        print("-> Compressed data stream in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+
+def decompressData(compressed_data, compressor, verbose=False, dictionary_id=None):
+    """
+    Decompress the input compressed data via the specified compressor.
+
+    :param bytearray, bytes compressed_data: The input data.
+    :param string compressor: A string indicating the compressor to be used.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+
+    :return: The output data (decompressed data).
+    :rtype: bytearray
+    """
+    start_time = time.time()
+
+    decompressed_data = getCodec(compressor).decompress(compressed_data, dictionary=getDictionary(dictionary_id))
+
+    end_time = time.time()
+    if verbose:
+        print("-> Decompressed data in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return decompressed_data
+
+
+def decompressDataStream(compressed_chunks, compressor, verbose=False, dictionary_id=None):
+    """
+    Decompresses a compressed stream that is received as a sequence of compressed chunks and yields the decompressed data
+    as it is produced, so neither the whole compressed data nor the whole decompressed data is held in memory.
+
+    This is the inverse function of the compressDataStream function, and it also accepts the data compressed by the
+    compressData function.
+
+    :param iterable compressed_chunks: An iterable of bytearray (or bytes) objects containing the compressed stream.
+    :param string compressor: A string indicating the compressor to be used.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+
+    :return: A generator of bytes objects containing the decompressed data.
+    :rtype: generator
+    """
+    start_time = time.time()
+
+    yield from getCodec(compressor).decompressStream(compressed_chunks, dictionary=getDictionary(dictionary_id))
+
+    end_time = time.time()
+    if verbose:
+        print("-> Decompressed data stream in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+
+def getDecompressedSize(compressed_data, compressor):
+    """
+    Reads the size of the decompressed data from the beginning of a compressed stream, if the compressor stored it.
+
+    :param bytearray, bytes compressed_data: The beginning of the compressed stream (at least 18 bytes, if available).
+    :param string compressor: A string indicating the compressor used.
+
+    :return: An int indicating the size of the decompressed data, or None if it is unknown.
+    :rtype: int
+    """
+    return getCodec(compressor).getDecompressedSize(compressed_data)
+
+
+def readFileChunks(file, read_size=DEFAULT_READ_SIZE, size=None):
+    """
+    Reads a binary file object in chunks of at most read_size bytes, until its end or until size bytes are read.
+
+    :param file file: A binary file object.
+    :param int read_size: An int indicating the maximum size of each chunk (in bytes).
+    :param int size: An int indicating the number of bytes to be read. None reads until the end of the file.
+
+    :return: A generator of bytes objects containing the chunks.
+    :rtype: generator
+    """
+    remaining = size
+    while remaining is None or remaining > 0:
+        chunk = file.read(read_size if remaining is None else min(read_size, remaining))
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+
+
+def dataStreamToSpikesFile(data_chunks, header, data_size=None, native=False):
+    """
+    Converts a sequence of decompressed data chunks of interleaved spikes (see the spikesFileToBytes function) into a
+    SpikesFile, filling preallocated address and timestamp arrays as the chunks arrive. Chunks do not need to be aligned
+    to whole spikes.
+
+    :param iterable data_chunks: An iterable of bytearray (or bytes) objects containing the decompressed data.
+    :param CompressedFileHeader header: The CompressedFileHeader of the compressed file.
+    :param int data_size: An int indicating the total size of the decompressed data (in bytes), if known. Otherwise, the
+    arrays grow as needed.
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
+
+    :return: This function returns three different objects, listed below:
+    - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS.
+    - final_address_size (int): An int indicating the size of the addresses in the final SpikesFile.
+    - final_timestamp_size (int): An int indicating the size of the timestamps in the final SpikesFile.
+    """
+    delta_timestamps = header.getOption("D") is not None
+    spike_size = header.address_size + header.timestamp_size
+
+    # An empty chunk provides the data types of an empty SpikesFile
+    spikes_file, final_address_size, final_timestamp_size = \
+        bytesToSpikesFile(b"", header.address_size, header.timestamp_size, verbose=False,
+                          delta_timestamps=delta_timestamps, native=native)
+    byte_order = "=" if native else ">"
+    timestamp_dtype = np.dtype(byte_order + "u8") if delta_timestamps else spikes_file.timestamps.dtype
+
+    capacity = data_size // spike_size if data_size is not None else DEFAULT_CHUNK_SIZE
+    addresses = np.empty(capacity, dtype=spikes_file.addresses.dtype)
+    timestamps = np.empty(capacity, dtype=timestamp_dtype)
+
+    position = 0
+    timestamp_base = 0
+    remainder = b""
+    for data in data_chunks:
+        # Only whole spikes are converted. The remaining bytes are prepended to the next chunk
+        if remainder:
+            data = remainder + data
+        whole_size = len(data) - len(data) % spike_size
+        remainder = bytes(data[whole_size:])
+        if whole_size == 0:
+            continue
+
+        chunk_spikes_file, _, _ = bytesToSpikesFile(memoryview(data)[:whole_size], header.address_size,
+                                                    header.timestamp_size, verbose=False,
+                                                    delta_timestamps=delta_timestamps, timestamp_base=timestamp_base)
+        chunk_events = len(chunk_spikes_file.addresses)
+
+        if position + chunk_events > capacity:
+            capacity = max(2 * capacity, position + chunk_events)
+            addresses = np.concatenate((addresses[:position], np.empty(capacity - position, addresses.dtype)))
+            timestamps = np.concatenate((timestamps[:position], np.empty(capacity - position, timestamps.dtype)))
+
+        addresses[position:position + chunk_events] = chunk_spikes_file.addresses
+        timestamps[position:position + chunk_events] = chunk_spikes_file.timestamps
+        position += chunk_events
+
+        if delta_timestamps:
+            timestamp_base = int(timestamps[position - 1])
+
+    addresses = addresses[:position]
+    timestamps = timestamps[:position]
+    if delta_timestamps:
+        # Same timestamp size as the bytesToSpikesFile function
+        final_timestamp_size = 8 if position > 0 and timestamps[position - 1] >= 1 << 32 else 4
+        timestamps = timestamps.astype(byte_order + "u" + str(final_timestamp_size), copy=False)
+
+    return SpikesFile(addresses, timestamps), final_address_size, final_timestamp_size
+
+
+def compressedFileStreamToSpikesFile(file, verbose=False, read_size=DEFAULT_READ_SIZE, native=False):
+    """
+    Reads a compressed aedat file from a binary file object and converts it to a SpikesFile while it is being read, so
+    that the compressed data and the decompressed data are never held in memory as a whole. Only the output address and
+    timestamp arrays, which are preallocated, reach the size of the whole file.
+
+    Chunked containers are decompressed chunk by chunk, multi-frame files frame by frame and the remaining files are
+    decompressed as a stream of read_size chunks. Columnar, shuffled and bit-packed data that is not stored in a chunked
+    container is decompressed at once, as the compressedFileToSpikesFile function does.
+
+    :param file file: A binary file object positioned at the start of the compressed file. Chunked containers and files
+    with checksums (X option) require a seekable file.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int read_size: An int indicating the size of each read of the file (in bytes).
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian arrays instead of
+    big-endian ones (see the bytesToSpikesFile function).
+
+    :return: This function returns four different objects, listed below:
+    - header (CompressedFileHeader): The CompressedFileHeader of the compressed file.
+    - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS.
+    - final_address_size (int): An int indicating the size of the addresses in the final SpikesFile.
+    - final_timestamp_size (int): An int indicating the size of the timestamps in the final SpikesFile.
+    """
+    start_time = time.time()
+
+    # Read the header
+    header_start = file.tell()
+    header = readCompressedFileHeader(file)
+    header_size = header.getSize()
+
+    # The checksum trailer (if any) is not read
+    compressed_size = None
+    if getChecksumTrailerSize(header):
+        compressed_size = file.seek(0, os.SEEK_END) - header_start - header_size - getChecksumTrailerSize(header)
+        file.seek(header_start + header_size)
+
+    if header.getOption("C") is not None:
+        # Read the chunk index from the end of the file
+        file.seek(-CHUNK_INDEX_TRAILER_SIZE, os.SEEK_END)
+        index_offset, num_chunks = readChunkIndexTrailer(file.read(CHUNK_INDEX_TRAILER_SIZE))
+        file.seek(header_start + header_size + index_offset)
+        index = np.frombuffer(file.read(num_chunks * CHUNK_INDEX_STRUCT.itemsize), CHUNK_INDEX_STRUCT)
+
+        # The group sequence (if any) precedes the first chunk
+        group_sequence = None
+        if num_chunks > 0:
+            file.seek(header_start + header_size)
+            group_sequence = decompressGroupSequence(file.read(int(index[0]["offset"])), header)
+
+        # Read the chunks one by one
+        def readChunks():
+            for entry in index:
+                file.seek(header_start + header_size + int(entry["offset"]))
+                yield file.read(int(entry["size"]))
+
+        compressed_chunks = readChunks()
+        spikes_file, final_address_size, final_timestamp_size = chunksToSpikesFile(compressed_chunks, index, header,
+                                                                                   native=native,
+                                                                                   group_sequence=group_sequence)
+    elif any(header.getOption(option) is not None for option in ("L", "S", "B")):
+        data = decompressFileData(file.read(compressed_size), header)
+        spikes_file, final_address_size, final_timestamp_size = \
+            bytesToSpikesFile(data, header.address_size, header.timestamp_size, verbose=False, native=native,
+                              **getConversionOptions(header))
+    elif header.getOption("F") is not None:
+        # Read the frame table, then the frames one by one
+        frame_table_header = np.frombuffer(file.read(FRAME_TABLE_HEADER_STRUCT.itemsize), FRAME_TABLE_HEADER_STRUCT)
+        num_frames = int(frame_table_header["frames"][0])
+        frame_sizes = np.frombuffer(file.read(num_frames * FRAME_TABLE_STRUCT.itemsize), FRAME_TABLE_STRUCT)
+
+        data_chunks = (decompressData(file.read(int(frame_size)), header.compressor,
+                                      dictionary_id=getDictionaryOption(header)) for frame_size in frame_sizes)
+        spikes_file, final_address_size, final_timestamp_size = \
+            dataStreamToSpikesFile(data_chunks, header, int(frame_table_header["data_size"][0]), native=native)
+    else:
+        # The size of the decompressed data is stored in version 2 headers. Otherwise, peek the first chunk to get it
+        compressed_chunks = readFileChunks(file, read_size, compressed_size)
+        first_chunk = next(compressed_chunks, b"")
+        data_size = header.data_size
+        if data_size is None:
+            data_size = getDecompressedSize(first_chunk, header.compressor)
+
+        compressed_chunks = itertools.chain((first_chunk,), compressed_chunks)
+        data_chunks = decompressDataStream(compressed_chunks, header.compressor,
+                                           dictionary_id=getDictionaryOption(header))
+        spikes_file, final_address_size, final_timestamp_size = dataStreamToSpikesFile(data_chunks, header, data_size,
+                                                                                       native=native)
+
+    end_time = time.time()
+    if verbose:
+        print("compressedFileStreamToSpikesFile: " + str(len(spikes_file.addresses)) + " spikes decompressed in " +
+              '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return header, spikes_file, final_address_size, final_timestamp_size
+
+
+def calcFrameSize(data_size, threads):
+    """
+    Calculates the size of the frames of a multi-frame compressed file so that there are at least as many frames as
+    threads, but none of them is larger than DEFAULT_FRAME_SIZE bytes.
+
+    :param int data_size: An int indicating the size of the data to be compressed.
+    :param int threads: An int indicating the number of threads used to compress the data.
+
+    :return: An int indicating the size of the frames.
+    :rtype: int
+    """
+    return max(min(DEFAULT_FRAME_SIZE, int(math.ceil(data_size / threads))), 1)
+
+
+def compressFrames(data, compressor, frame_size, threads=1, verbose=False, level=None, dictionary_id=None):
+    """
+    Splits the input data into frames of frame_size bytes (the last one can be smaller) and compresses them independently
+    via the specified compressor, using a pool of threads. The compressed data starts with a frame table (see the
+    FRAME_TABLE_HEADER_STRUCT and FRAME_TABLE_STRUCT data types), followed by the compressed frames.
+
+    Since the frames are independent, they can be decompressed in parallel with the decompressFrames function.
+
+    :param bytearray, bytes data: The input data.
+    :param string compressor: A string indicating the compressor to be used.
+    :param int frame_size: An int indicating the size of the uncompressed data of each frame.
+    :param int threads: An int indicating the number of threads used to compress the frames.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+
+    :return: The output data (frame table and compressed frames).
+    :rtype: bytearray
+    """
+    start_time = time.time()
+
+    data = memoryview(data)
+    frames = [data[i:i + frame_size] for i in range(0, len(data), frame_size)]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        compressed_frames = list(executor.map(lambda frame: compressData(frame, compressor, verbose=False,
+                                                                       level=level, dictionary_id=dictionary_id),
+                                              frames))
+
+    # Frame table
+    table_header = np.array([(len(compressed_frames), len(data))], dtype=FRAME_TABLE_HEADER_STRUCT)
+    table = np.array([len(compressed_frame) for compressed_frame in compressed_frames], dtype=FRAME_TABLE_STRUCT)
+
+    compressed_data = bytearray(table_header.tobytes())
+    compressed_data.extend(table.tobytes())
+    for compressed_frame in compressed_frames:
+        compressed_data.extend(compressed_frame)
+
+    end_time = time.time()
+    if verbose:
+        print("-> Compressed " + str(len(frames)) + " frames in " + '{0:.3f}'.format(end_time - start_time) +
+              " seconds")
+
+    return compressed_data
+
+
+def decompressFrames(compressed_data, compressor, frame_size, threads=1, verbose=False, dictionary_id=None):
+    """
+    Decompresses the frames compressed by the compressFrames function in parallel. Each thread writes its frame directly
+    to its position of a preallocated output buffer, so the decompressed frames do not have to be joined afterwards.
+
+    This is the inverse function of the compressFrames function.
+
+    :param bytearray, bytes compressed_data: The input data (frame table and compressed frames).
+    :param string compressor: A string indicating the compressor to be used.
+    :param int frame_size: An int indicating the size of the uncompressed data of each frame.
+    :param int threads: An int indicating the number of threads used to decompress the frames.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+
+    :return: The output data (decompressed data of all the frames).
+    :rtype: bytearray
+    """
+    start_time = time.time()
+
+    # Read the frame table
+    table_header = np.frombuffer(compressed_data, FRAME_TABLE_HEADER_STRUCT, count=1)[0]
+    num_frames = int(table_header["frames"])
+    table = np.frombuffer(compressed_data, FRAME_TABLE_STRUCT, count=num_frames,
+                          offset=FRAME_TABLE_HEADER_STRUCT.itemsize)
+    frame_offsets = FRAME_TABLE_HEADER_STRUCT.itemsize + FRAME_TABLE_STRUCT.itemsize * num_frames + \
+        np.concatenate(([0], np.cumsum(table, dtype=np.int64)))
+
+    codec = getCodec(compressor)
+    dictionary = getDictionary(dictionary_id)
+    compressed_data = memoryview(compressed_data)
+    decompressed_data = bytearray(int(table_header["data_size"]))
+    output = memoryview(decompressed_data)
+
+    def decompressFrame(i):
+        frame = compressed_data[int(frame_offsets[i]):int(frame_offsets[i + 1])]
+        frame_output = output[i * frame_size:(i + 1) * frame_size]
+
+        # Decompress directly into the output buffer (if the codec allows it)
+        codec.decompressInto(frame, frame_output, dictionary=dictionary)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(decompressFrame, range(num_frames)))
+
+    end_time = time.time()
+    if verbose:
+        print("-> Decompressed " + str(num_frames) + " frames in " + '{0:.3f}'.format(end_time - start_time) +
+              " seconds")
+
+    return decompressed_data
+
+
+def decompressFileData(compressed_data, header, threads=1, verbose=False):
+    """
+    Decompresses the compressed data of a (non-chunked) compressed file according to its CompressedFileHeader: if the
+    header contains the F option, the data is decompressed frame by frame with the decompressFrames function and,
+    otherwise, with the decompressData function.
+
+    :param bytearray, bytes compressed_data: The compressed data (without the CompressedFileHeader).
+    :param CompressedFileHeader header: The header of the compressed file.
+    :param int threads: An int indicating the number of threads used to decompress the frames.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+
+    :return: The output data (decompressed data).
+    :rtype: bytearray
+    """
+    frame_size = header.getOption("F")
+    if frame_size is None:
+        return decompressData(compressed_data, header.compressor, verbose=verbose,
+                              dictionary_id=getDictionaryOption(header))
+
+    return decompressFrames(compressed_data, header.compressor, int.from_bytes(frame_size, "big"), threads=threads,
+                            verbose=verbose, dictionary_id=getDictionaryOption(header))
+
+
+def getCompressedFile(header, data, verbose=False, threads=1, level=None):
+    """
+    Assembles the full compressed aedat file by joining the CompressedFileHeader object to the compressed spikes data.
+    The size of the data is stored in the metadata of the header.
+
+    If the header contains the F option, the data is compressed in frames of the specified size (see the compressFrames
+    function), and if it contains the K option, it is compressed with the specified trained dictionary. If it contains
+    the X option, the compressed file ends with the checksums of the data (see the getChecksumTrailerBytes function).
+
+    :param CompressedFileHeader header: The header to attach to the compressed file.
+    :param bytearray, bytes data: The input bytearray containing data to be compressed.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param int threads: An int indicating the number of threads used to compress the frames.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+
+    :return: The output bytearray. It contains the CompressedFileHeader bound to the compressed spikes data.
+    :rtype: bytearray
+    """
+    start_time = time.time()
+
+    # Create file with header (its metadata block contains the size of the data)
+    header.setMetadata(data_size=len(data))
+    compressed_file = header.toBytes()
+
+    # Compress data and extend the compressed file with it
+    frame_size = header.getOption("F")
+    if frame_size is None:
+        compressed_data = compressData(data, header.compressor, verbose=False, level=level,
+                                       dictionary_id=getDictionaryOption(header))
+    else:
+        compressed_data = compressFrames(data, header.compressor, int.from_bytes(frame_size, "big"), threads=threads,
+                                         level=level, dictionary_id=getDictionaryOption(header))
+    compressed_file.extend(compressed_data)
+    if header.getOption("X") is not None:
+        compressed_file.extend(getChecksumTrailerBytes(calcChecksums(compressed_data, data)))
+
+    end_time = time.time()
+    if verbose:
+        print("-> Compressed data attached to the header in " + '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    return compressed_file
+
+
+def storeFile(file_bytes, initial_file_path, ask_user=False, overwrite=False):
     """
     Stores a file.
 
@@ -409,19 +2442,24 @@ def storeFile(file_bytes, initial_file_path, ask_user=False, overwrite=False):
     :param string initial_file_path: A string indicating where the file is intended to be written.
     :param boolean ask_user: A boolean indicating whether or not to prompt the user to overwrite a file that has been found at the specified path.
     :param boolean overwrite: A boolean indicating wheter or not a file that has been found at the specified path must be or not be overwritten.
+
+    :return: The output string indicating where the file has been written (see the checkFileExists function).
+    :rtype: string
     """
     # Check the file
     final_file_path = checkFileExists(initial_file_path, ask_user=ask_user, overwrite=overwrite)
 
-    # Check the destination folder
-    if not os.path.exists(os.path.dirname(final_file_path)):
-        os.makedirs(os.path.dirname(final_file_path))
+    # Check the destination folder (other processes may be creating it at the same time)
+    if os.path.dirname(final_file_path):
+        os.makedirs(os.path.dirname(final_file_path), exist_ok=True)
 
     # Write the file
     file = open(final_file_path, "wb")
     file.write(file_bytes)
     file.close()
 
+    return final_file_path
+
 
 def checkFileExists(initial_file_path, ask_user=False, overwrite=False):
     """
@@ -467,20 +2505,34 @@ def checkFileExists(initial_file_path, ask_user=False, overwrite=False):
     return final_file_path
 
 
-def loadFile(file_path):
+def loadFile(file_path, memory_map=False):
     """
     Loads a file.
 
+    If memory_map is True, the file is not read but mapped into memory (read-only), so its pages are only read from disk
+    when they are accessed. This is useful to inspect the headers of many compressed files, or to decompress a file
+    without holding a copy of its compressed data (see the extractCompressedData function).
+
     :param string file_path: A string indicating the file path.
+    :param boolean memory_map: A boolean indicating whether or not to return a memory map of the file.
 
-    :return: The output bytearray.
+    :return: The output bytearray (or memory map).
     :rtype: bytearray
     """
-    # Read all the file
     file = open(file_path, "rb")
-    file_bytes = file.read()
 
-    # Close the file
-    file.close()
+    try:
+        if memory_map:
+            # Empty files cannot be mapped
+            if os.fstat(file.fileno()).st_size == 0:
+                file_bytes = b""
+            else:
+                file_bytes = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # Read all the file
+            file_bytes = file.read()
+    finally:
+        # Close the file. A memory map remains valid after closing it
+        file.close()
 
     return file_bytes
@@ -1,12 +1,19 @@
 import copy
 import math
+import sys
 import time
 
 import numpy as np
 from pyNAVIS import SpikesFile
 
+# Number of records that the packBits and unpackBits functions convert at once. Each bit of a block takes a byte while
+# it is converted, so blocks bound the memory used beyond the packed data and the columns. It is a multiple of 8, so
+# the bits of every block fill whole bytes
+BIT_PACKING_BLOCK_SIZE = 1 << 16
 
-def bytesToSpikesFile(bytes_data, initial_address_size, initial_timestamp_size, verbose=True):
+
+def bytesToSpikesFile(bytes_data, initial_address_size, initial_timestamp_size, verbose=True, delta_timestamps=False,
+                      timestamp_base=0, columnar=False, shuffle=False, bit_widths=None, native=False):
     """
     Converts a bytearray of raw spikes of a-byte addresses and b-byte timestamps, where a and b are initial_address_size
     and initial_timestamp_size fields, respectively, to a SpikesFile of raw spikes of the same shape (or with 4-byte
@@ -18,6 +25,15 @@ def bytesToSpikesFile(bytes_data, initial_address_size, initial_timestamp_size,
     :param int initial_address_size: An int indicating the size of the addresses in bytes_data.
     :param int initial_timestamp_size: An int indicating the size of the timestamps in bytes_data.
     :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param boolean delta_timestamps: A boolean indicating whether or not bytes_data contains zigzag-encoded timestamp
+    deltas instead of timestamps (see the spikesFileToBytes function).
+    :param int timestamp_base: An int indicating the timestamp the first delta is relative to.
+    :param boolean columnar: A boolean indicating whether or not bytes_data has a columnar layout.
+    :param boolean shuffle: A boolean indicating whether or not the bytes of bytes_data are shuffled.
+    :param tuple bit_widths: A tuple (address_bits, timestamp_bits) indicating the exact bit widths of the fields if
+    bytes_data is bit-packed (see the spikesFileToBytes function). None if it is not.
+    :param boolean native: A boolean indicating whether or not the SpikesFile contains native-endian contiguous arrays
+    instead of big-endian views of bytes_data. Native arrays avoid byte swaps in every later NumPy operation.
 
     :return: This function returns three different objects, listed below:
     - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS.
@@ -28,7 +44,8 @@ def bytesToSpikesFile(bytes_data, initial_address_size, initial_timestamp_size,
         When input_options sizes are 3 bytes it is needed to work differently due to NumPy and Python does not support
         np.uint24 (or working with data types of 3 bytes). It cost more time that viewing the arrays as np.uint8 (1 byte),
         np.uint16 (2 bytes) or np.uint32 (4 bytes). When processing 3-byte addresses or timestamps, the returned
-        SpikesFile will contain 4-byte addresses or timestamps to allow SpikesFile processing.
+        SpikesFile will contain 4-byte addresses or timestamps to allow SpikesFile processing (see the widenUint24
+        function).
 
         Based on the above comment, there are two different cases that must be considered:
 
@@ -39,11 +56,23 @@ def bytesToSpikesFile(bytes_data, initial_address_size, initial_timestamp_size,
 
         Currently all compressed files use 4-byte addresses and timestamps except those which were compressing with the
         LZMA compressor. You can find more information about this in the spikesFileToCompressedFile function.
+
+        When bytes_data contains timestamp deltas, the timestamps are restored via a cumulative sum and the returned
+        SpikesFile will contain 4-byte timestamps (8-byte timestamps if they do not fit in 4 bytes).
+
+        When bytes_data is bit-packed, initial_address_size and initial_timestamp_size are the bit widths rounded up to
+        whole bytes, and the fields are unpacked into the smallest NumPy unsigned type that can hold them.
+
+        When native is True, the fields are byte-swapped (if needed) while they are copied out of bytes_data, and 3-byte
+        fields are widened to native 4-byte ints in the same pass. The sizes of the fields are the same as otherwise.
     """
     if verbose:
         start_time = time.time()
         print("bytesToSpikesFile: Converting spikes bytes to SpikesFile")
 
+    # Byte order of the output arrays
+    byte_order = "=" if native else ">"
+
     # Storing new sizes
     final_address_size = copy.deepcopy(initial_address_size)
     final_timestamp_size = copy.deepcopy(initial_timestamp_size)
@@ -58,35 +87,79 @@ def bytesToSpikesFile(bytes_data, initial_address_size, initial_timestamp_size,
     else:
         timestamp_param = ">u" + str(final_timestamp_size)
 
-    # Separate addresses and timestamps
-    spikes_struct = np.dtype(address_param + ", " + timestamp_param)
-    spikes = np.frombuffer(bytes_data, spikes_struct)
+    if bit_widths is not None:
+        # Bit-packed data starts with the number of spikes
+        num_spikes = int(np.frombuffer(bytes_data, ">u8", count=1)[0]) if len(bytes_data) > 0 else 0
+        packed_data = memoryview(bytes_data)[8:]
+        address_bits, timestamp_bits = bit_widths
 
-    if initial_address_size == 3:
-        # Filling timestamps to reach 4-byte ints
-        address_struct = constructStruct("zeros", (4 - initial_address_size,),
-                                         "addresses", (initial_address_size,))
-        addresses = np.zeros(len(spikes['f0']), dtype=address_struct)
-        addresses['addresses'] = np.array(spikes['f0'], copy=False)
-        addresses = addresses.view(">u4")
+        if columnar:
+            addresses_end = int(math.ceil(num_spikes * address_bits / 8))
+            address_field = unpackBits(packed_data[:addresses_end], [address_bits], num_spikes)[0]
+            timestamp_field = unpackBits(packed_data[addresses_end:], [timestamp_bits], num_spikes)[0]
+        else:
+            address_field, timestamp_field = unpackBits(packed_data, [address_bits, timestamp_bits], num_spikes)
 
-        # Modify the output_options with the new size
-        final_address_size = 4
+        # Smallest unsigned types that can hold the unpacked fields
+        final_address_size = min(size for size in (1, 2, 4, 8) if size >= initial_address_size)
+        final_timestamp_size = min(size for size in (1, 2, 4, 8) if size >= initial_timestamp_size)
+        addresses = address_field.astype(byte_order + "u" + str(final_address_size))
+        timestamps = timestamp_field.astype(byte_order + "u" + str(final_timestamp_size))
     else:
-        addresses = spikes['f0']
+        # Undo the byte shuffle
+        num_spikes = len(bytes_data) // (initial_address_size + initial_timestamp_size)
+        if shuffle:
+            if columnar:
+                addresses_end = num_spikes * initial_address_size
+                bytes_data = unshuffleBytes(bytes_data[:addresses_end], initial_address_size) + \
+                    unshuffleBytes(bytes_data[addresses_end:], initial_timestamp_size)
+            else:
+                bytes_data = unshuffleBytes(bytes_data, initial_address_size + initial_timestamp_size)
+
+        # Separate addresses and timestamps
+        if columnar:
+            address_field = np.frombuffer(bytes_data, np.dtype(address_param), count=num_spikes)
+            timestamp_field = np.frombuffer(bytes_data, np.dtype(timestamp_param), count=num_spikes,
+                                            offset=num_spikes * initial_address_size)
+        else:
+            spikes_struct = np.dtype(address_param + ", " + timestamp_param)
+            spikes = np.frombuffer(bytes_data, spikes_struct)
+            address_field = spikes['f0']
+            timestamp_field = spikes['f1']
+
+        if initial_address_size == 3:
+            # Filling addresses to reach 4-byte ints
+            addresses = widenUint24(bytes_data, 0, 3 if columnar else initial_address_size + initial_timestamp_size,
+                                    num_spikes, native=native)
+
+            # Modify the output_options with the new size
+            final_address_size = 4
+        elif native:
+            addresses = address_field.astype(address_field.dtype.newbyteorder("="))
+        else:
+            addresses = address_field
+
+        if initial_timestamp_size == 3:
+            # Filling timestamps to reach 4-byte ints
+            if columnar:
+                timestamps = widenUint24(bytes_data, num_spikes * initial_address_size, 3, num_spikes, native=native)
+            else:
+                timestamps = widenUint24(bytes_data, initial_address_size, initial_address_size + initial_timestamp_size,
+                                         num_spikes, native=native)
+
+            # Modify the output_options with the new size
+            final_timestamp_size = 4
+        elif native and not delta_timestamps:
+            timestamps = timestamp_field.astype(timestamp_field.dtype.newbyteorder("="))
+        else:
+            timestamps = timestamp_field
 
-    if initial_timestamp_size == 3:
-        # Filling timestamps to reach 4-byte ints
-        timestamp_struct = constructStruct("zeros", (4 - initial_timestamp_size,),
-                                           "timestamps", (initial_timestamp_size,))
-        timestamps = np.zeros(len(spikes['f1']), dtype=timestamp_struct)
-        timestamps['timestamps'] = np.array(spikes['f1'], copy=False)
-        timestamps = timestamps.view(">u4")
+    if delta_timestamps:
+        timestamps = deltasToTimestamps(timestamps, timestamp_base)
 
         # Modify the output_options with the new size
-        final_timestamp_size = 4
-    else:
-        timestamps = spikes['f1']
+        final_timestamp_size = 8 if len(timestamps) > 0 and np.max(timestamps) >= 1 << 32 else 4
+        timestamps = timestamps.astype(byte_order + "u" + str(final_timestamp_size))
 
     # Return the SpikesFile
     spikes_file = SpikesFile(addresses, timestamps)
@@ -99,7 +172,8 @@ def bytesToSpikesFile(bytes_data, initial_address_size, initial_timestamp_size,
 
 
 def spikesFileToBytes(spikes_file, initial_address_size, initial_timestamp_size, final_address_size,
-                      final_timestamp_size, verbose=True):
+                      final_timestamp_size, verbose=True, delta_timestamps=False, timestamp_base=0, columnar=False,
+                      shuffle=False, bit_widths=None, buffer=None):
     """
     Converts a SpikesFile of raw spikes of a-byte addresses and b-byte timestamps, where a and b are specified by
     settings, to a bytearray of raw spikes of c-byte addresses and d-byte timestamps, where c and d are
@@ -107,86 +181,106 @@ def spikesFileToBytes(spikes_file, initial_address_size, initial_timestamp_size,
 
     This is the inverse function of the bytesToSpikesFile function.
 
+    If delta_timestamps is True, the differences between consecutive timestamps are stored instead of the timestamps
+    (the first one is relative to timestamp_base). These deltas are zigzag-encoded, so that small negative deltas
+    (out-of-order events) are also small unsigned ints. Since timestamps are monotonically increasing, deltas are much
+    smaller than timestamps and can be stored with a smaller final_timestamp_size (see the calcRequiredDeltaBytes
+    function), which is also easier to compress.
+
+    By default, addresses and timestamps are interleaved spike by spike. If columnar is True, all the addresses are stored
+    first, followed by all the timestamps, so that the compressor does not mix their very different byte distributions.
+    If shuffle is True, the bytes of each field are also grouped by significance (byte planes) as the Blosc shuffle filter
+    does: the first byte of every value, then the second one, etc. Since the most significant bytes rarely change, this
+    produces long runs that are compressed better and faster.
+
+    If bit_widths is specified, each field is stored with its exact bit width instead of whole bytes (see the
+    calcRequiredBits function), so final_address_size and final_timestamp_size are ignored. The bit-packed data starts
+    with the number of spikes (8 bytes), followed by the packed records (or by the packed addresses and then the packed
+    timestamps if columnar is True, each of them padded to a whole byte). The byte shuffle cannot be combined with it.
+
+    The fields are converted while they are written to their positions of the output bytearray (see the writeField
+    function), so no intermediate arrays are created. If buffer is specified, the spikes are written into it instead of
+    into a new bytearray, and a memoryview of the used part of the buffer is returned. Bit-packed data is not written
+    into the buffer.
+
     :param SpikesFile spikes_file: The input SpikesFile object from pyNAVIS.
     :param int initial_address_size: An int indicating the size of the addresses in spikes_file.
     :param int initial_timestamp_size: An int indicating the size of the timestamps in spikes_file.
     :param int final_address_size: An int indicating the size of the addresses in the final bytearray.
     :param int final_timestamp_size: An int indicating the size of the timestamps in the final bytearray.
     :param boolean verbose: A boolean indicating whether or not debug comments must be printed.
-
-    :return: The output bytearray.
+    :param boolean delta_timestamps: A boolean indicating whether or not to store zigzag-encoded timestamp deltas.
+    :param int timestamp_base: An int indicating the timestamp the first delta is relative to.
+    :param boolean columnar: A boolean indicating whether or not to store all the addresses before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not to shuffle the bytes of each field into byte planes.
+    :param tuple bit_widths: A tuple (address_bits, timestamp_bits) indicating the exact bit widths of the fields. None
+    disables bit-packing.
+    :param bytearray, memoryview buffer: A writable buffer where the spikes are written. None allocates a new bytearray.
+
+    :return: The output bytearray (or a memoryview of buffer).
     :rtype: bytearray
     """
+    if bit_widths is not None and shuffle:
+        raise ValueError("The byte shuffle cannot be combined with bit-packing.")
+
     if verbose:
         start_time = time.time()
         print("spikesFileToBytes: Converting the SpikesFile to raw bytes")
 
-    # ----- ADDRESSES -----
-    # 1-byte, 2-byte or 4-byte output addresses (pruning, no operation and filling cases)
-    if final_address_size != 3:
-        address_struct = np.dtype(">u" + str(final_address_size))
-        addresses = spikes_file.addresses.astype(dtype=address_struct, copy=False)
-
-    # 3-byte output addresses
-    else:
-        # Pruning case
-        if initial_address_size > final_address_size:
-            address_struct = constructStruct("pruned", (initial_address_size - final_address_size,),
-                                             "not_pruned", (final_address_size,))
-
-            # There can be a problem if addresses are not encoded in big endian
-            addresses = np.array(spikes_file.addresses, copy=False).view(address_struct)['not_pruned']
-
-        # Filling and no operation cases
+    input_timestamps = spikes_file.timestamps
+    if delta_timestamps:
+        input_timestamps = timestampsToDeltas(input_timestamps, timestamp_base)
+
+    # ----- BIT-PACKING -----
+    if bit_widths is not None:
+        address_bits, timestamp_bits = bit_widths
+        for values, bits in ((spikes_file.addresses, address_bits), (input_timestamps, timestamp_bits)):
+            if len(values) > 0 and int(np.max(values)) >> bits:
+                raise ValueError("The spikes do not fit in " + str(bits) + " bits.")
+
+        data_bytes = bytearray(np.array([len(input_timestamps)], dtype=">u8").tobytes())
+        if columnar:
+            data_bytes += packBits([spikes_file.addresses], [address_bits])
+            data_bytes += packBits([input_timestamps], [timestamp_bits])
         else:
-            address_struct = constructStruct("zeros", (final_address_size - initial_address_size,),
-                                             "addresses", (final_address_size,))
-            addresses = np.zeros(len(spikes_file.addresses), dtype=address_struct)
-            addresses['addresses'] = np.array(spikes_file.addresses, copy=False)
-
-    # ----- TIMESTAMPS -----
-    # 1-byte, 2-byte or 4-byte output timestamps (pruning, no operation and filling cases)
-    if final_timestamp_size != 3:
-        timestamp_struct = np.dtype(">u" + str(final_timestamp_size))
-        timestamps = spikes_file.timestamps.astype(dtype=timestamp_struct, copy=False)
-
-    # 3-byte output timestamps
-    else:
-        # Pruning case
-        if initial_timestamp_size > final_timestamp_size:
-            timestamp_struct = constructStruct("pruned", (initial_timestamp_size - final_timestamp_size,),
-                                               "not_pruned", (final_timestamp_size,))
+            data_bytes += packBits([spikes_file.addresses, input_timestamps], [address_bits, timestamp_bits])
 
-            # There can be a problem if timestamps are not encoded in big endian
-            timestamps = np.array(spikes_file.timestamps, copy=False).view(timestamp_struct)['not_pruned']
+        if verbose:
+            end_time = time.time()
+            print("spikesFileToBytes: Data conversion has took " + '{0:.3f}'.format(end_time - start_time) +
+                  " seconds")
 
-        # Filling and no operation cases
-        else:
-            timestamp_struct = constructStruct("zeros", (final_timestamp_size - initial_timestamp_size,),
-                                               "timestamps", (final_timestamp_size,))
-            timestamps = np.zeros(len(spikes_file.timestamps), dtype=timestamp_struct)
-            timestamps['timestamps'] = np.array(spikes_file.timestamps, copy=False)
+        return data_bytes
 
     # ----- BYTES_DATA -----
-    # Create an array that contains the retyped addresses and timestamps
-    if final_address_size == 3:
-        address_param = ">3u1"
+    # Addresses and timestamps are written straight into their positions of the output buffer
+    num_spikes = len(input_timestamps)
+    data_size = num_spikes * (final_address_size + final_timestamp_size)
+    if buffer is None:
+        data_bytes = bytearray(data_size)
+    elif len(buffer) < data_size:
+        raise ValueError("The buffer is too small: " + str(data_size) + " bytes are needed.")
     else:
-        address_param = ">u" + str(final_address_size)
-
-    if final_timestamp_size == 3:
-        timestamp_param = ">3u1"
+        data_bytes = memoryview(buffer).cast("B")[:data_size]
+
+    if columnar:
+        # All the addresses followed by all the timestamps
+        writeField(spikes_file.addresses, final_address_size, data_bytes, 0, final_address_size)
+        writeField(input_timestamps, final_timestamp_size, data_bytes, num_spikes * final_address_size,
+                   final_timestamp_size)
+
+        if shuffle:
+            addresses_end = num_spikes * final_address_size
+            data_bytes[:] = shuffleBytes(data_bytes[:addresses_end], final_address_size) + \
+                shuffleBytes(data_bytes[addresses_end:], final_timestamp_size)
     else:
-        timestamp_param = ">u" + str(final_timestamp_size)
-
-    spikes_struct = np.dtype(address_param + ", " + timestamp_param)
-    new_spikes_file = np.zeros(len(addresses), dtype=spikes_struct)
-    new_spikes_file['f0'] = addresses
-    new_spikes_file['f1'] = timestamps
+        # Addresses and timestamps joined spike by spike
+        writeField(spikes_file.addresses, final_address_size, data_bytes, 0, final_address_size + final_timestamp_size)
+        writeField(input_timestamps, final_timestamp_size, data_bytes, final_address_size,
+                   final_address_size + final_timestamp_size)
 
-    # Numpy tobytes() function already joins addresses with timestamps spike by spike due to
-    # the spikes_struct structure
-    data_bytes = new_spikes_file.tobytes()
+        if shuffle:
+            data_bytes[:] = shuffleBytes(data_bytes, final_address_size + final_timestamp_size)
 
     if verbose:
         end_time = time.time()
@@ -195,6 +289,43 @@ def spikesFileToBytes(spikes_file, initial_address_size, initial_timestamp_size,
     return data_bytes
 
 
+def writeField(values, size, buffer, offset, stride):
+    """
+    Writes a field of unsigned ints into a buffer of raw spikes as size-byte big-endian ints, starting at offset and
+    every stride bytes. The values are converted by NumPy while they are copied through a strided view over the buffer,
+    so no intermediate array is created (except when size is 3 bytes and values are not contiguous big-endian ints).
+
+    Values that do not fit in size bytes are truncated, keeping their least significant bytes (this is how addresses and
+    timestamps are pruned).
+
+    :param numpy.ndarray values: The input values.
+    :param int size: An int indicating the size of each value in the buffer (1, 2, 3, 4 or 8 bytes).
+    :param bytearray, memoryview buffer: The writable output buffer.
+    :param int offset: An int indicating the position of the first value in the buffer.
+    :param int stride: An int indicating the distance between consecutive values (e.g. the size of each spike).
+
+    :return: None
+    """
+    values = np.asarray(values)
+    count = len(values)
+    if count == 0:
+        return
+
+    if size != 3:
+        field = np.ndarray((count,), dtype=">u" + str(size), buffer=buffer, offset=offset, strides=(stride,))
+        field[...] = values
+    else:
+        # NumPy does not support 3-byte ints, so the three least significant bytes of each value are copied
+        if values.dtype.kind not in "ui" or values.dtype.itemsize < 3 or values.dtype.byteorder == "<" or \
+                (values.dtype.byteorder == "=" and sys.byteorder == "little"):
+            values = values.astype(">u4")
+        values = np.ascontiguousarray(values)
+        value_bytes = values.view(np.uint8).reshape(count, values.dtype.itemsize)[:, values.dtype.itemsize - 3:]
+
+        field = np.ndarray((count, 3), dtype=np.uint8, buffer=buffer, offset=offset, strides=(stride, 1))
+        field[...] = value_bytes
+
+
 def calcRequiredBytes(spikes_file, settings):
     """
     Calculates the minimum number of bytes required for address and timestamp representation based on the input settings
@@ -210,17 +341,395 @@ def calcRequiredBytes(spikes_file, settings):
     :return: A CompressedFileHeader object.
     :rtype: CompressedFileHeader
     """
+    return calcRequiredBytesFromMaxTs(spikes_file.max_ts, settings)
+
+
+def calcRequiredBytesFromMaxTs(max_ts, settings):
+    """
+    Calculates the minimum number of bytes required for address and timestamp representation based on the input settings
+    and the maximum timestamp of a recording. This is the same calculation performed by the calcRequiredBytes function,
+    but it does not need the whole SpikesFile to be loaded (e.g. when the file is processed in chunks).
+
+    :param int max_ts: An int indicating the maximum timestamp of the recording.
+    :param MainSettings settings: A MainSettings object from pyNAVIS.
+
+    :return: This function returns two different objects, listed below:
+    - address_size (int): An int indicating the minimum size of the addresses.
+    - timestamp_size (int): An int indicating the minimum size of the timestamps.
+    """
     # Address size
     address_size = int(math.ceil(settings.num_channels * (settings.mono_stereo + 1) *
                                  (settings.on_off_both + 1) / 256))
 
-    # Timestamp size
-    dec2bin = bin(spikes_file.max_ts)[2:]
+    # Timestamp size. Adapted timestamps can be floats, so they are truncated as when they are converted to ints
+    dec2bin = bin(int(max_ts))[2:]
     timestamp_size = int(math.ceil(len(dec2bin) / 8))
 
     return address_size, timestamp_size
 
 
+def calcRequiredBits(spikes_file, settings):
+    """
+    Calculates the minimum number of bits required for address and timestamp representation based on the input settings.
+    This is the same calculation performed by the calcRequiredBytes function, but without rounding up to whole bytes.
+
+    :param SpikesFile spikes_file: The input SpikesFile object from pyNAVIS.
+    :param MainSettings settings: A MainSettings object from pyNAVIS.
+
+    :return: This function returns two different objects, listed below:
+    - address_bits (int): An int indicating the minimum number of bits of the addresses.
+    - timestamp_bits (int): An int indicating the minimum number of bits of the timestamps.
+    """
+    return calcRequiredBitsFromMaxTs(spikes_file.max_ts, settings)
+
+
+def calcRequiredBitsFromMaxTs(max_ts, settings):
+    """
+    Calculates the minimum number of bits required for address and timestamp representation based on the input settings
+    and the maximum timestamp of a recording (see the calcRequiredBytesFromMaxTs function).
+
+    :param int max_ts: An int indicating the maximum timestamp of the recording.
+    :param MainSettings settings: A MainSettings object from pyNAVIS.
+
+    :return: This function returns two different objects, listed below:
+    - address_bits (int): An int indicating the minimum number of bits of the addresses.
+    - timestamp_bits (int): An int indicating the minimum number of bits of the timestamps.
+    """
+    # Address bits. Addresses go from 0 to the number of addresses minus one
+    num_addresses = int(settings.num_channels * (settings.mono_stereo + 1) * (settings.on_off_both + 1))
+    address_bits = max((num_addresses - 1).bit_length(), 1)
+
+    # Timestamp bits. Adapted timestamps can be floats, so they are truncated as when they are converted to ints
+    timestamp_bits = max(int(max_ts).bit_length(), 1)
+
+    return address_bits, timestamp_bits
+
+
+def calcRequiredDeltaBits(timestamps, timestamp_base=0):
+    """
+    Calculates the minimum number of bits required to represent the zigzag-encoded timestamp deltas calculated by the
+    timestampsToDeltas function.
+
+    :param numpy.ndarray timestamps: The input timestamps.
+    :param int timestamp_base: An int indicating the timestamp the first delta is relative to.
+
+    :return: An int indicating the minimum number of bits of the timestamp deltas.
+    :rtype: int
+    """
+    max_delta = int(np.max(timestampsToDeltas(timestamps, timestamp_base))) if len(timestamps) > 0 else 0
+
+    return max(max_delta.bit_length(), 1)
+
+
+def calcConvertedSize(num_spikes, address_size, timestamp_size, columnar=False, bit_widths=None, **conversion_options):
+    """
+    Calculates the size of the bytearray returned by the spikesFileToBytes function for a number of spikes, without
+    converting them (e.g. to store it in the metadata of a CompressedFileHeader).
+
+    :param int num_spikes: An int indicating the number of spikes.
+    :param int address_size: An int indicating the size of the addresses in the bytearray.
+    :param int timestamp_size: An int indicating the size of the timestamps in the bytearray.
+    :param boolean columnar: A boolean indicating whether or not all the addresses are stored before all the timestamps.
+    :param tuple bit_widths: A tuple (address_bits, timestamp_bits) indicating the exact bit widths of the fields. None
+    if the fields are not bit-packed.
+    :param conversion_options: Other keyword arguments of the spikesFileToBytes function, which do not change the size.
+
+    :return: An int indicating the size of the bytearray (bytes).
+    :rtype: int
+    """
+    if bit_widths is None:
+        return num_spikes * (address_size + timestamp_size)
+
+    # The number of spikes (8 bytes) followed by the packed fields, padded to a whole byte
+    address_bits, timestamp_bits = bit_widths
+    if columnar:
+        return 8 + int(math.ceil(num_spikes * address_bits / 8)) + int(math.ceil(num_spikes * timestamp_bits / 8))
+
+    return 8 + int(math.ceil(num_spikes * (address_bits + timestamp_bits) / 8))
+
+
+def calcAddressGroups(addresses, group_size=None, split_polarity=False):
+    """
+    Calculates the address group of each address. Groups are blocks of group_size consecutive addresses (e.g. the
+    addresses of one ear or of a block of channels of a NAS, see the getNASAddresses function) and, if split_polarity is
+    True, each block is split into its even (ON) and odd (OFF) addresses.
+
+    :param numpy.ndarray, list addresses: The addresses.
+    :param int group_size: An int indicating the number of consecutive addresses of each block. None (or 0) uses a single
+    block.
+    :param boolean split_polarity: A boolean indicating whether or not each block is split by polarity.
+
+    :return: The address group of each address.
+    :rtype: numpy.ndarray
+    """
+    addresses = np.asarray(addresses, dtype=np.int64)
+    groups = addresses // group_size if group_size else np.zeros(len(addresses), dtype=np.int64)
+    if split_polarity:
+        groups = groups * 2 + addresses % 2
+
+    return groups
+
+
+def getNASAddresses(settings, channels=None, ears=None, polarities=None):
+    """
+    Calculates the addresses of some channels, ears and polarities of a NAS, e.g. to decode only their spikes (see the
+    extractAddresses function). The addresses of the right ear (1) follow the ones of the left ear (0), and the two
+    addresses of each channel of an ON/OFF NAS are its ON (0) and OFF (1) addresses.
+
+    :param MainSettings settings: A MainSettings object from pyNAVIS.
+    :param iterable channels: The channels (from 0 to num_channels - 1). None selects all of them.
+    :param iterable ears: The ears (0 or 1). None selects all of them.
+    :param iterable polarities: The polarities (0 or 1). None selects all of them.
+
+    :return: The sorted addresses.
+    :rtype: numpy.ndarray
+    """
+    num_polarities = settings.on_off_both + 1
+    channels = range(settings.num_channels) if channels is None else channels
+    ears = range(settings.mono_stereo + 1) if ears is None else ears
+    polarities = range(num_polarities) if polarities is None else polarities
+
+    addresses = [(ear * settings.num_channels + channel) * num_polarities + polarity
+                 for ear in ears for channel in channels for polarity in polarities]
+
+    return np.unique(np.array(addresses, dtype=np.int64))
+
+
+def packBits(columns, bit_widths):
+    """
+    Packs several columns of unsigned ints into a bit stream where each value takes exactly its column bit width. The
+    values are stored record by record (the first value of every column, then the second one, etc.), most significant
+    bit first, and the bit stream is padded with zeros to a whole byte.
+
+    The records are packed in blocks of BIT_PACKING_BLOCK_SIZE records, directly into the output bytearray.
+
+    This is the inverse function of the unpackBits function.
+
+    :param list columns: A list of numpy.ndarray of the same length containing the values of each column.
+    :param list bit_widths: A list of ints indicating the bit width of each column (up to 64 bits).
+
+    :return: The packed data.
+    :rtype: bytearray
+    """
+    columns = [np.asarray(values) for values in columns]
+    count = len(columns[0]) if columns else 0
+    record_bits = sum(bit_widths)
+    packed_data = bytearray((count * record_bits + 7) // 8)
+    packed_bytes = np.frombuffer(packed_data, np.uint8)
+
+    for block_start in range(0, count, BIT_PACKING_BLOCK_SIZE):
+        block_end = min(block_start + BIT_PACKING_BLOCK_SIZE, count)
+        bits = np.empty((block_end - block_start, record_bits), dtype=np.uint8)
+
+        start = 0
+        for values, bit_width in zip(columns, bit_widths):
+            # Only the least significant bytes that contain the bit width are unpacked
+            num_bytes = int(math.ceil(bit_width / 8))
+            value_bytes = values[block_start:block_end].astype(">u8").view(np.uint8).reshape(-1, 8)[:, 8 - num_bytes:]
+            bits[:, start:start + bit_width] = np.unpackbits(value_bytes, axis=1)[:, num_bytes * 8 - bit_width:]
+            start += bit_width
+
+        block_bytes = np.packbits(bits)
+        data_start = block_start * record_bits // 8
+        packed_bytes[data_start:data_start + len(block_bytes)] = block_bytes
+
+    return packed_data
+
+
+def unpackBits(data, bit_widths, count):
+    """
+    Unpacks the columns of unsigned ints packed by the packBits function.
+
+    The records are unpacked in blocks of BIT_PACKING_BLOCK_SIZE records, directly into the output columns.
+
+    This is the inverse function of the packBits function.
+
+    :param bytearray, bytes data: The packed data.
+    :param list bit_widths: A list of ints indicating the bit width of each column (up to 64 bits).
+    :param int count: An int indicating the number of records.
+
+    :return: A list of numpy.ndarray (one per column) of 8-byte unsigned ints.
+    :rtype: list
+    """
+    record_bits = sum(bit_widths)
+    data = np.frombuffer(data, np.uint8)
+    columns = [np.empty(count, dtype=">u8") for _ in bit_widths]
+
+    for block_start in range(0, count, BIT_PACKING_BLOCK_SIZE):
+        block_end = min(block_start + BIT_PACKING_BLOCK_SIZE, count)
+        block_bits = (block_end - block_start) * record_bits
+        data_start = block_start * record_bits // 8
+        bits = np.unpackbits(data[data_start:data_start + (block_bits + 7) // 8], count=block_bits)
+        bits = bits.reshape(-1, record_bits)
+
+        start = 0
+        for column, bit_width in zip(columns, bit_widths):
+            # Fill the bits of each value up to whole bytes and then up to 8-byte ints
+            num_bytes = int(math.ceil(bit_width / 8))
+            value_bits = np.zeros((len(bits), num_bytes * 8), dtype=np.uint8)
+            value_bits[:, num_bytes * 8 - bit_width:] = bits[:, start:start + bit_width]
+            value_bytes = np.zeros((len(bits), 8), dtype=np.uint8)
+            value_bytes[:, 8 - num_bytes:] = np.packbits(value_bits, axis=1)
+            column[block_start:block_end] = value_bytes.view(">u8").ravel()
+            start += bit_width
+
+    return columns
+
+
+def shuffleBytes(data, item_size):
+    """
+    Shuffles the bytes of a sequence of items of item_size bytes into byte planes: the first byte of every item is
+    stored first, then the second byte of every item, etc. This is the byte shuffle filter used by Blosc.
+
+    This is the inverse function of the unshuffleBytes function.
+
+    :param bytearray, bytes data: The input data. Its size must be a multiple of item_size.
+    :param int item_size: An int indicating the size of the items.
+
+    :return: The shuffled data.
+    :rtype: bytes
+    """
+    return np.frombuffer(data, np.uint8).reshape(-1, item_size).T.tobytes()
+
+
+def unshuffleBytes(data, item_size):
+    """
+    Restores the items of item_size bytes from their byte planes.
+
+    This is the inverse function of the shuffleBytes function.
+
+    :param bytearray, bytes data: The input (shuffled) data. Its size must be a multiple of item_size.
+    :param int item_size: An int indicating the size of the items.
+
+    :return: The unshuffled data.
+    :rtype: bytes
+    """
+    return np.frombuffer(data, np.uint8).reshape(item_size, -1).T.tobytes()
+
+
+def timestampsToDeltas(timestamps, timestamp_base=0):
+    """
+    Calculates the zigzag-encoded differences between consecutive timestamps. The first delta is calculated with respect
+    to timestamp_base. Zigzag encoding maps signed deltas to unsigned ints (0, -1, 1, -2, 2... are mapped to 0, 1, 2,
+    3, 4...), so that out-of-order events do not produce huge unsigned values.
+
+    This is the inverse function of the deltasToTimestamps function.
+
+    :param numpy.ndarray timestamps: The input timestamps.
+    :param int timestamp_base: An int indicating the timestamp the first delta is relative to.
+
+    :return: The zigzag-encoded deltas.
+    :rtype: numpy.ndarray
+    """
+    deltas = np.diff(np.asarray(timestamps, dtype=np.int64), prepend=np.int64(timestamp_base))
+
+    return ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+
+
+def deltasToTimestamps(deltas, timestamp_base=0):
+    """
+    Restores the timestamps from their zigzag-encoded deltas via a cumulative sum.
+
+    This is the inverse function of the timestampsToDeltas function.
+
+    :param numpy.ndarray deltas: The input zigzag-encoded deltas.
+    :param int timestamp_base: An int indicating the timestamp the first delta is relative to.
+
+    :return: The restored timestamps.
+    :rtype: numpy.ndarray
+    """
+    deltas = np.asarray(deltas, dtype=np.uint64)
+    timestamps = (deltas >> np.uint64(1)).view(np.int64) ^ -(deltas & np.uint64(1)).view(np.int64)
+    np.cumsum(timestamps, out=timestamps)
+    timestamps += timestamp_base
+
+    return timestamps
+
+
+def calcRequiredDeltaBytes(timestamps, timestamp_base=0):
+    """
+    Calculates the minimum number of bytes required to represent the zigzag-encoded timestamp deltas calculated by the
+    timestampsToDeltas function.
+
+    :param numpy.ndarray timestamps: The input timestamps.
+    :param int timestamp_base: An int indicating the timestamp the first delta is relative to.
+
+    :return: An int indicating the minimum size of the timestamp deltas.
+    :rtype: int
+    """
+    max_delta = int(np.max(timestampsToDeltas(timestamps, timestamp_base))) if len(timestamps) > 0 else 0
+
+    return calcDeltaBytesFromMaxDelta(max_delta)
+
+
+def calcDeltaBytesFromMaxDelta(max_delta):
+    """
+    Calculates the minimum number of bytes required to represent zigzag-encoded timestamp deltas up to max_delta. Sizes
+    between 5 and 7 bytes are not supported by NumPy, so 8 bytes are used instead.
+
+    :param int max_delta: An int indicating the maximum zigzag-encoded delta.
+
+    :return: An int indicating the minimum size of the timestamp deltas.
+    :rtype: int
+    """
+    delta_size = int(math.ceil(len(bin(int(max_delta))[2:]) / 8))
+
+    return delta_size if delta_size <= 4 else 8
+
+
+def widenUint24(data, offset, stride, count, native=False):
+    """
+    Widens count 3-byte big-endian unsigned ints, stored in data every stride bytes from offset, to 4-byte big-endian
+    (or native-endian, if native is True) unsigned ints in a single vectorized pass.
+
+    Instead of copying the values into a zeroed structured array, each value is read as a 4-byte little-endian int
+    through a strided view over data that also covers the byte before it (or the byte after it for a value at the start
+    of data). Masking out (or shifting out) that extra byte leaves the bytes of the value in big-endian order, with a
+    zero most significant byte. The result of the arithmetic (which NumPy returns in native order) is stored as
+    little-endian before it is viewed as big-endian, so this also holds on big-endian hosts. If the value at the start
+    of data is also its last byte, the values are copied into the 4-byte array instead. Native-endian ints are read as
+    4-byte big-endian ints instead, so the same masking (or shifting) leaves the value itself.
+
+    :param bytearray, bytes data: The input data (e.g. raw spikes data).
+    :param int offset: An int indicating the position of the first value in data.
+    :param int stride: An int indicating the distance between consecutive values (e.g. the size of each spike).
+    :param int count: An int indicating the number of values.
+    :param boolean native: A boolean indicating whether or not the values are widened to native-endian ints.
+
+    :return: A numpy.ndarray of count ">u4" (or native "u4") values.
+    :rtype: numpy.ndarray
+    """
+    if count == 0:
+        return np.empty(0, dtype="=u4" if native else ">u4")
+
+    if native:
+        if offset >= 1:
+            # Each value and the byte before it
+            values = np.ndarray((count,), dtype=">u4", buffer=data, offset=offset - 1, strides=(stride,))
+            return np.bitwise_and(values, np.uint32(0x00FFFFFF))
+        elif offset + (count - 1) * stride + 4 <= len(data):
+            # Each value and the byte after it
+            values = np.ndarray((count,), dtype=">u4", buffer=data, offset=offset, strides=(stride,))
+            return np.right_shift(values, np.uint32(8))
+
+        return widenUint24(data, offset, stride, count).astype("=u4")
+
+    if offset >= 1:
+        # Each value and the byte before it
+        values = np.ndarray((count,), dtype="<u4", buffer=data, offset=offset - 1, strides=(stride,))
+        widened = np.bitwise_and(values, np.uint32(0xFFFFFF00)).astype("<u4", copy=False)
+    elif offset + (count - 1) * stride + 4 <= len(data):
+        # Each value and the byte after it
+        values = np.ndarray((count,), dtype="<u4", buffer=data, offset=offset, strides=(stride,))
+        widened = np.left_shift(values, np.uint32(8)).astype("<u4", copy=False)
+    else:
+        values = np.ndarray((count, 3), dtype=np.uint8, buffer=data, offset=offset, strides=(stride, 1))
+        widened = np.zeros((count, 4), dtype=np.uint8)
+        widened[:, 1:] = values
+
+    return widened.view(">u4").reshape(count)
+
+
 def constructStruct(first_field, first_field_size, second_field, second_file_size):
     """
     Constructs a numpy data type of two fields to represent the data structure of a bytearray. This function has been
@@ -0,0 +1,177 @@
+import copy
+import threading
+
+from pyNAVIS import SpikesFile
+
+from AERzip.compressionFunctions import getCompressedFileInfo, extractDataFromCompressedFile
+
+
+def openCompressedFile(file_path, native=True, threads=1, memory_map=False, streaming=False, cache=None):
+    """
+    Opens a compressed aedat file without decompressing its spikes. Only the CompressedFileHeader (and, for version 1
+    headers of chunked containers, the chunk index) is read, so scanning a dataset costs as much as reading the headers
+    of its files (see the LazySpikesFile class).
+
+    :param string file_path: A string indicating the compressed aedat file path.
+    :param boolean native: A boolean indicating whether or not the spikes are decoded into native-endian arrays instead
+    of big-endian ones (see the bytesToSpikesFile function).
+    :param int threads: An int indicating the number of threads used to decompress the frames of the file (if any).
+    :param boolean memory_map: A boolean indicating whether or not to map the compressed file into memory instead of
+    reading it (see the loadFile function).
+    :param boolean streaming: A boolean indicating whether or not to decompress the file while it is being read (see the
+    compressedFileStreamToSpikesFile function).
+    :param DecodedCache cache: A DecodedCache where the decoded spikes are looked up and stored (see the cacheFunctions
+    module). None does not use a cache.
+
+    :return: The LazySpikesFile of the compressed file.
+    :rtype: LazySpikesFile
+    """
+    return LazySpikesFile(file_path, native=native, threads=threads, memory_map=memory_map, streaming=streaming,
+                          cache=cache)
+
+
+class LazySpikesFile(SpikesFile):
+    """
+    A LazySpikesFile is a SpikesFile whose spikes are decompressed from a compressed aedat file the first time that its
+    addresses or timestamps (or the index of its first or last spike) are accessed, and are kept until the release
+    function is called. Its header is read when it is created, so the number of spikes (num_events) and the timestamp
+    range (min_ts and max_ts) are returned without decompressing the file if the header contains them (see the
+    getCompressedFileInfo function).
+
+    A LazySpikesFile can be passed to the functions of pyNAVIS and AERzip that take a SpikesFile. Attributes that are
+    modified (e.g. by the Functions.adapt_timestamps function of pyNAVIS) are kept until the spikes are released, and
+    then they are decompressed again from the file. It can also be copied (e.g. by the functions of pyNAVIS that copy
+    their input) and pickled (e.g. to send it to another process), together with its decompressed spikes, if any.
+
+    :param string file_path: A string indicating the compressed aedat file path.
+    :param boolean native: A boolean indicating whether or not the spikes are decoded into native-endian arrays.
+    :param decode_options: Keyword arguments passed to the extractDataFromCompressedFile function (threads, memory_map,
+    streaming and cache).
+    """
+
+    def __init__(self, file_path, native=True, **decode_options):
+        # The attributes of the SpikesFile are properties, so its constructor is not called
+        self.file_path = file_path
+        self.header, self.compressed_size = getCompressedFileInfo(file_path)
+        self.decode_options = dict(decode_options, native=native)
+
+        self.spikes_file = None
+        self.final_address_size = None
+        self.final_timestamp_size = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # The lock cannot be copied or pickled, so the copy gets a new one
+        state = self.__dict__.copy()
+        del state["lock"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        lazy_spikes_file = self.__class__.__new__(self.__class__)
+        memo[id(self)] = lazy_spikes_file
+        lazy_spikes_file.__setstate__(copy.deepcopy(self.__getstate__(), memo))
+
+        return lazy_spikes_file
+
+    @property
+    def loaded(self):
+        """
+        Whether or not the spikes have been decompressed and are kept in memory.
+        """
+        return self.spikes_file is not None
+
+    def load(self):
+        """
+        Decompresses the spikes of the file, unless they are already kept in memory.
+
+        :return: The SpikesFile object from pyNAVIS with the decompressed spikes.
+        :rtype: SpikesFile
+        """
+        with self.lock:
+            if self.spikes_file is None:
+                _, spikes_file, self.final_address_size, self.final_timestamp_size = \
+                    extractDataFromCompressedFile(self.file_path, verbose=False, **self.decode_options)
+                self.spikes_file = spikes_file
+
+            return self.spikes_file
+
+    def release(self):
+        """
+        Releases the decompressed spikes (and any modification of them), so that their memory can be freed. They are
+        decompressed again the next time that they are accessed.
+        """
+        with self.lock:
+            self.spikes_file = None
+
+    @property
+    def num_events(self):
+        """
+        The number of spikes of the file, read from the header if it contains it.
+        """
+        if self.spikes_file is None and self.header.num_events is not None:
+            return self.header.num_events
+
+        return len(self.timestamps)
+
+    @property
+    def addresses(self):
+        return self.load().addresses
+
+    @addresses.setter
+    def addresses(self, addresses):
+        self.load().addresses = addresses
+
+    @property
+    def timestamps(self):
+        return self.load().timestamps
+
+    @timestamps.setter
+    def timestamps(self, timestamps):
+        self.load().timestamps = timestamps
+
+    @property
+    def min_ts(self):
+        if self.spikes_file is None and self.header.num_events == 0:
+            return None
+        if self.spikes_file is None and self.header.min_ts is not None:
+            return self.header.min_ts
+
+        return self.load().min_ts
+
+    @min_ts.setter
+    def min_ts(self, min_ts):
+        self.load().min_ts = min_ts
+
+    @property
+    def max_ts(self):
+        if self.spikes_file is None and self.header.num_events == 0:
+            return None
+        if self.spikes_file is None and self.header.max_ts is not None:
+            return self.header.max_ts
+
+        return self.load().max_ts
+
+    @max_ts.setter
+    def max_ts(self, max_ts):
+        self.load().max_ts = max_ts
+
+    @property
+    def min_ts_index(self):
+        return self.load().min_ts_index
+
+    @min_ts_index.setter
+    def min_ts_index(self, min_ts_index):
+        self.load().min_ts_index = min_ts_index
+
+    @property
+    def max_ts_index(self):
+        return self.load().max_ts_index
+
+    @max_ts_index.setter
+    def max_ts_index(self, max_ts_index):
+        self.load().max_ts_index = max_ts_index
@@ -0,0 +1,330 @@
+import os
+import time
+
+import numpy as np
+from pyNAVIS import Functions, SpikesFile
+
+from AERzip.CompressedFileHeader import CompressedFileHeader
+from AERzip.conversionFunctions import calcRequiredBytesFromMaxTs, calcConvertedSize
+from AERzip.compressionFunctions import calcFinalSizes, addConversionOptions, getConversionOptions, \
+    addDictionaryOption, compressChunk, getChunkIndexBytes, CHUNK_INDEX_STRUCT
+
+# Default thresholds of a FrameEncoder: size (bytes) of the converted spikes of each frame and maximum time (seconds) that
+# a spike waits in memory before it is written
+DEFAULT_LIVE_FRAME_SIZE = 64 * 1024
+DEFAULT_LIVE_LATENCY = 0.005
+
+
+class FrameEncoder:
+    """
+    A FrameEncoder compresses the spikes of a live NAS (e.g. captured from the hardware) while they arrive, so that the
+    raw recording never has to be buffered as a whole. Batches of spikes are pushed with the push function, and they
+    are compressed into a frame (a chunk of a chunked container, see the spikesFileToCompressedFile function) as soon as
+    frame_size bytes of converted spikes are pending or the oldest pending spike has waited max_latency seconds.
+
+    The duration of the stream is unknown, so timestamps keep the size of the captured ones (settings.timestamp_size),
+    and the final sizes of the fields are calculated by the calcFinalSizes function, as in the
+    spikesFileToCompressedFile function. Timestamps are adapted as the compressDataFromStoredNASFile function does,
+    taking the first timestamp of the stream as its minimum, so the stream must start with its smallest timestamp.
+
+    This is the base class of the LiveEncoder (which writes the frames to a file) and StreamSender (which sends them
+    through a socket) classes. Subclasses implement the writeCompressedFrame and closeOutput functions.
+
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the NAS.
+    :param string compressor: A string indicating the compressor to be used.
+    :param int frame_size: An int indicating the size (bytes) of the converted spikes of each frame.
+    :param float max_latency: A float indicating the maximum time (seconds) that a spike waits before it is written.
+    None disables the time threshold.
+    :param boolean adapt_timestamps: A boolean indicating whether or not to adapt the timestamps (see above).
+    :param boolean columnar: A boolean indicating whether or not to store all the addresses before all the timestamps.
+    :param boolean shuffle: A boolean indicating whether or not to shuffle the bytes of each field into byte planes.
+    :param int level: An int indicating the compression level. None uses the default level of the codec.
+    :param int dictionary_id: An int indicating the ID of the trained dictionary to be used. None disables it.
+    :param boolean prune_bytes: A boolean indicating whether or not to prune the bytes of the fields. None uses the
+    default behaviour of the codec.
+    """
+
+    def __init__(self, settings, compressor, frame_size=DEFAULT_LIVE_FRAME_SIZE, max_latency=DEFAULT_LIVE_LATENCY,
+                 adapt_timestamps=True, columnar=False, shuffle=False, level=None, dictionary_id=None,
+                 prune_bytes=None):
+        if frame_size < 1:
+            raise ValueError("The frame size must be a positive number of bytes.")
+
+        self.settings = settings
+        self.compressor = compressor
+        self.max_latency = max_latency
+        self.adapt_timestamps = adapt_timestamps
+        self.level = level
+        self.dictionary_id = dictionary_id
+
+        # Get the bytes to be discarded (the address size only depends on the settings)
+        desired_address_size, _ = calcRequiredBytesFromMaxTs(0, settings)
+        self.final_address_size, self.final_timestamp_size = calcFinalSizes(compressor, desired_address_size,
+                                                                            settings.timestamp_size, verbose=False,
+                                                                            prune_bytes=prune_bytes)
+        self.frame_events = max(frame_size // (self.final_address_size + self.final_timestamp_size), 1)
+
+        self.header = CompressedFileHeader(compressor, self.final_address_size, self.final_timestamp_size)
+        self.header.addOption("C")
+        addConversionOptions(self.header, columnar=columnar, shuffle=shuffle)
+        addDictionaryOption(self.header, dictionary_id)
+        self.conversion_options = getConversionOptions(self.header)
+
+        self.address_dtype = np.dtype(">u" + str(settings.address_size))
+        self.timestamp_dtype = np.dtype(">u" + str(settings.timestamp_size))
+
+        self.entries = []
+        self.checksums = None
+        self.index_offset = 0
+        self.num_events = 0
+        self.data_size = 0
+        self.min_ts = None
+        self.buffer = bytearray()
+        self.closed = False
+
+        self.pending_addresses = []
+        self.pending_timestamps = []
+        self.pending_events = 0
+        self.pending_since = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def num_frames(self):
+        """
+        The number of frames written.
+        """
+        return len(self.entries)
+
+    def push(self, addresses, timestamps):
+        """
+        Adds a batch of spikes to the stream. The pending spikes are compressed into as many frames as they fill, and
+        into one more frame if the oldest one has waited max_latency seconds.
+
+        :param numpy.ndarray, list addresses: The addresses of the spikes.
+        :param numpy.ndarray, list timestamps: The timestamps of the spikes (as captured, in ticks).
+
+        :return: The number of frames written.
+        :rtype: int
+        """
+        if self.closed:
+            raise ValueError("The encoder has been closed.")
+        # The spikes are copied, since capture buffers are usually reused
+        addresses = np.array(addresses, dtype=self.address_dtype)
+        timestamps = np.array(timestamps, dtype=self.timestamp_dtype)
+        if len(addresses) != len(timestamps):
+            raise ValueError("The number of addresses and timestamps must be the same.")
+
+        if len(timestamps):
+            if self.pending_since is None:
+                self.pending_since = time.monotonic()
+            self.pending_addresses.append(addresses)
+            self.pending_timestamps.append(timestamps)
+            self.pending_events += len(timestamps)
+
+        num_frames = 0
+        if self.pending_events >= self.frame_events:
+            num_frames += self.writePendingFrames(full_frames_only=True)
+
+        return num_frames + self.poll()
+
+    def poll(self):
+        """
+        Compresses the pending spikes into a frame if the oldest one has waited max_latency seconds. This function is
+        called by the push function, and it should also be called periodically when no spikes arrive (e.g. every
+        max_latency seconds) to bound the latency of the last ones.
+
+        :return: The number of frames written.
+        :rtype: int
+        """
+        if self.pending_since is None or self.max_latency is None:
+            return 0
+        if time.monotonic() - self.pending_since < self.max_latency:
+            return 0
+
+        return self.writePendingFrames()
+
+    def flush(self):
+        """
+        Compresses all the pending spikes, regardless of the thresholds.
+
+        :return: The number of frames written.
+        :rtype: int
+        """
+        return self.writePendingFrames()
+
+    def close(self):
+        """
+        Compresses all the pending spikes and closes the output. Closing a closed encoder does nothing.
+
+        :return: The CompressedFileHeader of the stream.
+        :rtype: CompressedFileHeader
+        """
+        if not self.closed:
+            self.flush()
+            self.closeOutput()
+            self.closed = True
+
+        return self.header
+
+    def writePendingFrames(self, full_frames_only=False):
+        """
+        Compresses the pending spikes into frames of at most frame_size bytes and writes them.
+
+        :param boolean full_frames_only: A boolean indicating whether or not the spikes that do not fill a whole frame
+        remain pending.
+
+        :return: The number of frames written.
+        :rtype: int
+        """
+        if self.pending_events == 0:
+            return 0
+
+        addresses = np.concatenate(self.pending_addresses)
+        timestamps = np.concatenate(self.pending_timestamps)
+
+        num_frames = 0
+        position = 0
+        while position < len(timestamps):
+            if full_frames_only and len(timestamps) - position < self.frame_events:
+                break
+
+            self.writeFrame(addresses[position:position + self.frame_events],
+                            timestamps[position:position + self.frame_events])
+            position += self.frame_events
+            num_frames += 1
+
+        # Keep the rest of the spikes (if any) pending
+        if position < len(timestamps):
+            self.pending_addresses = [addresses[position:]]
+            self.pending_timestamps = [timestamps[position:]]
+            self.pending_events = len(timestamps) - position
+        else:
+            self.pending_addresses = []
+            self.pending_timestamps = []
+            self.pending_events = 0
+            self.pending_since = None
+
+        return num_frames
+
+    def writeFrame(self, addresses, timestamps):
+        """
+        Compresses some spikes into a frame and writes it (see the writeCompressedFrame function).
+
+        :param numpy.ndarray addresses: The addresses of the spikes.
+        :param numpy.ndarray timestamps: The timestamps of the spikes (as captured, in ticks).
+        """
+        spikes_frame = SpikesFile(addresses, timestamps)
+
+        if self.adapt_timestamps:
+            # The first timestamp of the stream is its minimum (as with the min_ts of a whole recording)
+            if self.min_ts is None:
+                self.min_ts = int(timestamps[0])
+            if self.min_ts != 0:
+                spikes_frame.min_ts = self.min_ts
+                Functions.adapt_timestamps(spikes_frame, self.settings)
+
+        compressed_frame, entry, self.buffer = compressChunk(spikes_frame, self.settings.address_size,
+                                                             self.settings.timestamp_size, self.final_address_size,
+                                                             self.final_timestamp_size, self.compressor,
+                                                             self.index_offset, buffer=self.buffer, level=self.level,
+                                                             dictionary_id=self.dictionary_id,
+                                                             checksums=self.checksums, **self.conversion_options)
+        self.entries.append(entry)
+        self.index_offset += len(compressed_frame)
+        self.num_events += len(timestamps)
+        self.data_size += calcConvertedSize(len(timestamps), self.final_address_size, self.final_timestamp_size,
+                                            **self.conversion_options)
+
+        self.writeCompressedFrame(compressed_frame, entry)
+
+    def writeCompressedFrame(self, compressed_frame, entry):
+        """
+        Writes a compressed frame to the output. It must be implemented by subclasses.
+
+        :param bytes compressed_frame: The compressed frame.
+        :param tuple entry: The index entry of the frame (see CHUNK_INDEX_STRUCT).
+        """
+        raise NotImplementedError
+
+    def closeOutput(self):
+        """
+        Closes the output once all the frames have been written. It must be implemented by subclasses.
+        """
+        raise NotImplementedError
+
+
+class LiveEncoder(FrameEncoder):
+    """
+    A LiveEncoder writes the frames of a FrameEncoder to a file, as a chunked container that is valid at any moment
+    between two calls of the encoder: it is created with an empty chunk index, and each frame overwrites the previous
+    index and is followed by the new one in a single write. Thus, it can be read with the extractDataFromCompressedFile
+    (or extractTimeRange) function while the NAS is still recording, and the spikes of the last frame are lost at most
+    if the capture is interrupted. The checksums of the frames are stored before the index (see the
+    verifyCompressedFile function).
+
+    The metadata of the header (see the CompressedFileHeader class) is unknown while the NAS is recording, so the
+    header never describes fewer frames than the body of an interrupted capture (the getCompressedFileInfo function
+    reads it from the chunk index instead). It is written when the encoder is closed.
+
+    :param string file_path: A string indicating where the compressed file is written. An existing file is overwritten.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the NAS.
+    :param string compressor: A string indicating the compressor to be used.
+    :param boolean sync: A boolean indicating whether or not each frame is synchronized with the disk (os.fsync).
+    :param encoder_options: Keyword arguments passed to the FrameEncoder class (frame_size, max_latency, etc.).
+    """
+
+    def __init__(self, file_path, settings, compressor, sync=False, **encoder_options):
+        super().__init__(settings, compressor, **encoder_options)
+        self.sync = sync
+
+        self.header.addOption("X")
+        self.checksums = []
+
+        # Check the destination folder
+        if os.path.dirname(file_path) and not os.path.exists(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+
+        # The file starts as an empty chunked container
+        self.file_path = file_path
+        self.file = open(file_path, "wb")
+        self.file.write(self.header.toBytes())
+        self.writeIndex(b"")
+
+    def writeCompressedFrame(self, compressed_frame, entry):
+        self.writeIndex(compressed_frame)
+
+    def closeOutput(self):
+        # The body is complete, so the header can describe it
+        index = np.array(self.entries, dtype=CHUNK_INDEX_STRUCT)
+        self.header.setMetadata(num_events=self.num_events, data_size=self.data_size)
+        if len(index):
+            self.header.setMetadata(min_ts=np.min(index["first_ts"]), max_ts=np.max(index["last_ts"]))
+        self.file.seek(0)
+        self.file.write(self.header.toBytes())
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+        self.file.close()
+        self.file = None
+
+    def writeIndex(self, compressed_frame):
+        """
+        Writes a frame (if any) over the current chunk index, followed by the checksums of the frames, the new chunk
+        index and its trailer, so that the file is a valid chunked container again as soon as the write finishes.
+
+        :param bytes compressed_frame: The compressed frame, or an empty bytes object.
+        """
+        index = np.array(self.entries, dtype=CHUNK_INDEX_STRUCT)
+
+        self.file.seek(self.header.getSize() + self.index_offset - len(compressed_frame))
+        self.file.write(bytes(compressed_frame) + getChunkIndexBytes(index, self.index_offset,
+                                                                     checksums=self.checksums))
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
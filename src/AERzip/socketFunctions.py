@@ -0,0 +1,268 @@
+import socket
+import struct
+import threading
+
+import numpy as np
+from pyNAVIS import SpikesFile
+
+from AERzip.compressionFunctions import readCompressedFileHeader, decompressData, getConversionOptions, \
+    getDictionaryOption
+from AERzip.conversionFunctions import bytesToSpikesFile
+from AERzip.liveFunctions import FrameEncoder
+
+# A stream starts with a CompressedFileHeader (with the "C" option, since each frame is a chunk of a chunked container,
+# and with unknown metadata) followed by the frames. Each frame is prefixed by its compressed size (4 bytes), its number
+# of events (4 bytes) and its first and last timestamps (8 bytes each). A prefix with 0 events ends the stream
+STREAM_FRAME_STRUCT = struct.Struct(">IIQQ")
+
+
+def connectStreamSocket(address):
+    """
+    Connects a socket to a receiver that is listening at an address (see the listenStreamSocket function).
+
+    :param string, tuple address: A string indicating the path of a Unix socket, or a (host, port) tuple indicating a TCP
+    address.
+
+    :return: The connected socket.
+    :rtype: socket.socket
+    """
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+    else:
+        sock = socket.create_connection(address)
+
+        # Frames are sent as soon as they are compressed, so they must not wait for more data
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    return sock
+
+
+def listenStreamSocket(address, backlog=1):
+    """
+    Creates a socket that listens at an address, so that senders can connect to it (see the connectStreamSocket
+    function). Use its accept function to get the socket of each sender.
+
+    :param string, tuple address: A string indicating the path of a Unix socket (which must not exist), or a (host, port)
+    tuple indicating a TCP address (port 0 chooses a free port, see the getsockname function of the socket).
+    :param int backlog: An int indicating the number of pending connections.
+
+    :return: The listening socket.
+    :rtype: socket.socket
+    """
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(address)
+        sock.listen(backlog)
+    else:
+        sock = socket.create_server(address, backlog=backlog)
+
+    return sock
+
+
+def receiveExactly(sock, size, allow_end=False):
+    """
+    Receives exactly size bytes from a socket.
+
+    :param socket.socket sock: The socket.
+    :param int size: An int indicating the number of bytes.
+    :param boolean allow_end: A boolean indicating whether or not the connection can be closed before the first byte.
+    :raises ValueError: The connection was closed before receiving all the bytes.
+
+    :return: The received bytearray, or None if the connection was closed before the first byte and allow_end is True.
+    :rtype: bytearray
+    """
+    data = bytearray(size)
+    view = memoryview(data)
+    position = 0
+    while position < size:
+        received = sock.recv_into(view[position:])
+        if received == 0:
+            if position == 0 and allow_end:
+                return None
+            raise ValueError("The connection was closed in the middle of the stream.")
+        position += received
+
+    return data
+
+
+class StreamSender(FrameEncoder):
+    """
+    A StreamSender sends the frames of a FrameEncoder through a connected socket (see the connectStreamSocket function):
+    the header of the stream is sent when it is created, each frame is sent with its prefix (see STREAM_FRAME_STRUCT) as
+    soon as it is compressed, and the end of the stream is sent when it is closed. The socket is not closed.
+
+    :param socket.socket sock: The connected socket.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the NAS.
+    :param string compressor: A string indicating the compressor to be used.
+    :param encoder_options: Keyword arguments passed to the FrameEncoder class (frame_size, max_latency, etc.).
+    """
+
+    def __init__(self, sock, settings, compressor, **encoder_options):
+        super().__init__(settings, compressor, **encoder_options)
+
+        self.sock = sock
+        self.bytes_sent = 0
+        self.send(self.header.toBytes())
+
+    def send(self, data):
+        """
+        Sends some bytes through the socket.
+
+        :param bytes, bytearray data: The bytes.
+        """
+        self.sock.sendall(data)
+        self.bytes_sent += len(data)
+
+    def writeCompressedFrame(self, compressed_frame, entry):
+        _, size, events, first_ts, last_ts = entry
+        self.send(STREAM_FRAME_STRUCT.pack(size, events, first_ts, last_ts) + compressed_frame)
+
+    def closeOutput(self):
+        self.send(STREAM_FRAME_STRUCT.pack(0, 0, 0, 0))
+
+
+class StreamReceiver:
+    """
+    A StreamReceiver receives the frames sent by a StreamSender through a connected socket (see the listenStreamSocket
+    function) and decodes each one into a batch of spikes as soon as it arrives. The header of the stream is received
+    when it is created. If the stream uses a trained dictionary, it must have been loaded (see the loadDictionary
+    function).
+
+    Batches are received with the receiveBatch function, or by iterating over the StreamReceiver until the end of the
+    stream.
+
+    :param socket.socket sock: The connected socket.
+    :raises ValueError: The stream does not start with a valid header.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+
+        self.header = readCompressedFileHeader(self)
+        if self.header.getOption("C") is None:
+            raise ValueError("The stream does not start with the header of an AERzip stream.")
+        self.conversion_options = getConversionOptions(self.header)
+        self.dictionary_id = getDictionaryOption(self.header)
+
+        self.num_frames = 0
+        self.num_events = 0
+        self.bytes_received = self.header.getSize()
+        self.ended = False
+
+    def read(self, size):
+        """
+        Receives exactly size bytes from the socket, so that the StreamReceiver can be read as a file object (e.g. by the
+        readCompressedFileHeader function).
+
+        :param int size: An int indicating the number of bytes.
+
+        :return: The received bytearray.
+        :rtype: bytearray
+        """
+        return receiveExactly(self.sock, size)
+
+    def __iter__(self):
+        while True:
+            spikes_batch = self.receiveBatch()
+            if spikes_batch is None:
+                return
+            yield spikes_batch
+
+    def receiveFrame(self):
+        """
+        Receives the next frame of the stream, without decoding it.
+
+        :return: This function returns two different objects, listed below:
+        - compressed_frame (bytearray): The compressed frame, or None if the stream has ended.
+        - first_ts (int): An int indicating the first timestamp of the frame, or None if the stream has ended.
+        """
+        if self.ended:
+            return None, None
+
+        prefix = receiveExactly(self.sock, STREAM_FRAME_STRUCT.size, allow_end=True)
+        if prefix is None:
+            raise ValueError("The connection was closed before the end of the stream.")
+        size, events, first_ts, _ = STREAM_FRAME_STRUCT.unpack(prefix)
+        self.bytes_received += len(prefix)
+
+        if events == 0:
+            self.ended = True
+            return None, None
+
+        compressed_frame = receiveExactly(self.sock, size)
+        self.bytes_received += size
+        self.num_frames += 1
+        self.num_events += events
+
+        return compressed_frame, first_ts
+
+    def receiveBatch(self):
+        """
+        Receives and decodes the next frame of the stream.
+
+        :return: The output SpikesFile object from pyNAVIS with the spikes of the frame, or None if the stream has ended.
+        :rtype: SpikesFile
+        """
+        compressed_frame, first_ts = self.receiveFrame()
+        if compressed_frame is None:
+            return None
+
+        data = decompressData(compressed_frame, self.header.compressor, dictionary_id=self.dictionary_id)
+        spikes_batch, _, _ = bytesToSpikesFile(data, self.header.address_size, self.header.timestamp_size,
+                                               verbose=False, timestamp_base=first_ts, **self.conversion_options)
+
+        return spikes_batch
+
+
+def runLoopback(spikes_file, settings, compressor, batch_size=1000, **encoder_options):
+    """
+    Sends the spikes of a SpikesFile through a pair of connected local sockets, in batches of batch_size spikes (as
+    they would arrive from the NAS), and receives them. This is a test harness of the StreamSender and StreamReceiver
+    classes, which also allows measuring the size of the stream.
+
+    :param SpikesFile spikes_file: The input SpikesFile object from pyNAVIS. It must contain raw spikes data.
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the NAS.
+    :param string compressor: A string indicating the compressor to be used.
+    :param int batch_size: An int indicating the number of spikes of each batch pushed to the sender.
+    :param encoder_options: Keyword arguments passed to the StreamSender class.
+
+    :return: This function returns three different objects, listed below:
+    - header (CompressedFileHeader): The CompressedFileHeader of the stream.
+    - spikes_file (SpikesFile): The output SpikesFile object from pyNAVIS with all the received spikes.
+    - bytes_sent (int): An int indicating the size of the stream (bytes).
+    """
+    sender_socket, receiver_socket = socket.socketpair()
+    errors = []
+    sender = None
+
+    def sendSpikes():
+        nonlocal sender
+        try:
+            sender = StreamSender(sender_socket, settings, compressor, **encoder_options)
+            for i in range(0, len(spikes_file.timestamps), batch_size):
+                sender.push(spikes_file.addresses[i:i + batch_size], spikes_file.timestamps[i:i + batch_size])
+            sender.close()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            sender_socket.close()
+
+    thread = threading.Thread(target=sendSpikes)
+    thread.start()
+    try:
+        receiver = StreamReceiver(receiver_socket)
+        spikes_batches = list(receiver)
+    finally:
+        receiver_socket.close()
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    addresses = np.concatenate([spikes_batch.addresses for spikes_batch in spikes_batches]) if spikes_batches else \
+        np.zeros(0, dtype=">u" + str(receiver.header.address_size))
+    timestamps = np.concatenate([spikes_batch.timestamps for spikes_batch in spikes_batches]) if spikes_batches else \
+        np.zeros(0, dtype=">u" + str(receiver.header.timestamp_size))
+
+    return receiver.header, SpikesFile(addresses, timestamps), sender.bytes_sent
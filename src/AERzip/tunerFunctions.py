@@ -0,0 +1,251 @@
+import itertools
+import time
+
+from pyNAVIS import Functions, Loaders, SpikesFile
+
+from AERzip.codecFunctions import getCodecNames
+from AERzip.compressionFunctions import spikesFileToCompressedFile, compressedFileToSpikesFile
+from AERzip.conversionFunctions import calcRequiredBytes, calcRequiredBits
+
+DEFAULT_TUNING_EVENTS = 200000
+DEFAULT_TUNING_LEVELS = {"ZSTD": [None, 1, 9, 19], "LZ4": [None, 9, 16], "LZMA": [None]}
+TUNING_GOALS = ("ratio", "decode_speed", "encode_speed")
+
+
+def getTuningConfigurations(compressors=None, levels=None, prune_bytes=(False, True), bit_packing=(False, True),
+                            delta_timestamps=(False, True), columnar=(False, True), shuffle=(False, True)):
+    """
+    Generates the compression configurations evaluated by the tuneCompression function. Each configuration is a dict
+    with the compressor, level, prune_bytes, bit_packing, delta_timestamps, columnar and shuffle keyword arguments of the
+    compressDataFromStoredNASFile function.
+
+    Combinations that cannot be used (bit-packing with the byte shuffle) or that are equivalent to another one (pruning
+    or not the bytes of bit-packed fields, whose sizes are given by their bit widths) are skipped.
+
+    :param list compressors: A list of strings indicating the compressors to be evaluated. None uses all the registered
+    codecs (see the getCodecNames function).
+    :param dict levels: A dict that maps each compressor to the list of levels to be evaluated (None is the default
+    level of the codec). The compressors that are not in it use the levels of DEFAULT_TUNING_LEVELS.
+    :param tuple prune_bytes: A tuple with the values of prune_bytes to be evaluated (see the calcFinalSizes function).
+    :param tuple bit_packing: A tuple with the values of bit_packing to be evaluated.
+    :param tuple delta_timestamps: A tuple with the values of delta_timestamps to be evaluated.
+    :param tuple columnar: A tuple with the values of columnar to be evaluated.
+    :param tuple shuffle: A tuple with the values of shuffle to be evaluated.
+
+    :return: A generator of configuration dicts.
+    """
+    if compressors is None:
+        compressors = getCodecNames()
+    if levels is None:
+        levels = {}
+
+    for compressor in compressors:
+        compressor_levels = levels.get(compressor, DEFAULT_TUNING_LEVELS.get(compressor, [None]))
+
+        for level, packing, delta, columns, shuffling in itertools.product(compressor_levels, bit_packing,
+                                                                           delta_timestamps, columnar, shuffle):
+            if packing and shuffling:
+                continue
+
+            for pruning in ([None] if packing else prune_bytes):
+                yield dict(compressor=compressor, level=level, prune_bytes=pruning, bit_packing=packing,
+                           delta_timestamps=delta, columnar=columns, shuffle=shuffling)
+
+
+def sampleSpikesFile(spikes_file, max_events=DEFAULT_TUNING_EVENTS):
+    """
+    Takes the first max_events spikes of a SpikesFile. A contiguous sample keeps the timestamp differences and the
+    address patterns of the recording, which are what the compressors exploit.
+
+    :param SpikesFile spikes_file: The input SpikesFile object from pyNAVIS.
+    :param int max_events: An int indicating the maximum number of spikes of the sample. None takes all of them.
+
+    :return: A SpikesFile object from pyNAVIS with the sample (the input object if it is not longer than max_events).
+    :rtype: SpikesFile
+    """
+    if max_events is None or len(spikes_file.timestamps) <= max_events:
+        return spikes_file
+
+    return SpikesFile(spikes_file.addresses[:max_events], spikes_file.timestamps[:max_events])
+
+
+def benchmarkConfiguration(spikes_files, settings, configuration, repetitions=1):
+    """
+    Compresses and decompresses a list of SpikesFile objects with a compression configuration (see the
+    getTuningConfigurations function), in the same way that the compressDataFromStoredNASFile and
+    extractDataFromCompressedFile functions would do it, and measures the result.
+
+    Speeds are calculated over the size of the original spikes (with the address and timestamp sizes of the settings),
+    in MB/s (1 MB = 10^6 bytes), and the time of each file is the best one of the repetitions.
+
+    :param list spikes_files: A list of SpikesFile objects from pyNAVIS. They must contain raw spikes data with adapted
+    timestamps (see the adapt_timestamps function of pyNAVIS).
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the files.
+    :param dict configuration: A dict with the configuration to be evaluated.
+    :param int repetitions: An int indicating the number of times each file is compressed and decompressed.
+
+    :return: A dict with the configuration and the original_size, compressed_size, ratio, encode_time (the longest
+    compression time of a file, in seconds), encode_speed and decode_speed of the files.
+    :rtype: dict
+    """
+    result = dict(configuration)
+    configuration = dict(configuration)
+    bit_packing = configuration.pop("bit_packing")
+
+    original_size = 0
+    compressed_size = 0
+    encode_times = []
+    decode_times = []
+    for spikes_file in spikes_files:
+        desired_address_size, desired_timestamp_size = calcRequiredBytes(spikes_file, settings)
+        bit_widths = calcRequiredBits(spikes_file, settings) if bit_packing else None
+
+        encode_time = None
+        decode_time = None
+        for _ in range(repetitions):
+            start_time = time.perf_counter()
+            compressed_file = spikesFileToCompressedFile(spikes_file, settings.address_size, settings.timestamp_size,
+                                                         desired_address_size, desired_timestamp_size,
+                                                         verbose=False, bit_widths=bit_widths, **configuration)
+            end_time = time.perf_counter()
+            encode_time = end_time - start_time if encode_time is None else min(encode_time, end_time - start_time)
+
+            start_time = time.perf_counter()
+            compressedFileToSpikesFile(compressed_file)
+            end_time = time.perf_counter()
+            decode_time = end_time - start_time if decode_time is None else min(decode_time, end_time - start_time)
+
+        original_size += len(spikes_file.timestamps) * (settings.address_size + settings.timestamp_size)
+        compressed_size += len(compressed_file)
+        encode_times.append(encode_time)
+        decode_times.append(decode_time)
+
+    result["original_size"] = original_size
+    result["compressed_size"] = compressed_size
+    result["ratio"] = original_size / compressed_size
+    result["encode_time"] = max(encode_times)
+    result["encode_speed"] = original_size / 1e6 / max(sum(encode_times), 1e-9)
+    result["decode_speed"] = original_size / 1e6 / max(sum(decode_times), 1e-9)
+
+    return result
+
+
+def tuneCompression(spikes_files, settings, goal="ratio", min_ratio=None, min_decode_speed=None,
+                    max_encode_time=None, max_events=DEFAULT_TUNING_EVENTS, repetitions=1, verbose=True,
+                    **search_space):
+    """
+    Benchmarks combinations of compressor, level, field widths and transforms on a sample of a recording or a dataset,
+    and returns the configuration that best meets the stated goal (see the getTuningConfigurations and
+    benchmarkConfiguration functions).
+
+    The goal is the measure to maximize: "ratio" (compression ratio), "decode_speed" or "encode_speed" (MB/s). Only the
+    configurations that meet all the constraints are considered: a minimum ratio, a minimum decompression speed (MB/s)
+    and a maximum compression time of each sample (seconds). Ties are broken by the compression ratio.
+
+    The returned configuration can be passed to the compressDataFromStoredNASFile and compressNASFiles functions as
+    keyword arguments (e.g. compressDataFromStoredNASFile(file_path, settings, **configuration)).
+
+    :param list spikes_files: A SpikesFile object from pyNAVIS or a list of them (e.g. some recordings of a dataset).
+    They must contain raw spikes data with adapted timestamps (see the tuneNASFiles function).
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the files.
+    :param string goal: A string indicating the measure to maximize (see TUNING_GOALS).
+    :param float min_ratio: A float indicating the minimum compression ratio. None disables this constraint.
+    :param float min_decode_speed: A float indicating the minimum decompression speed (MB/s). None disables it.
+    :param float max_encode_time: A float indicating the maximum time to compress each sample (seconds). None disables
+    it.
+    :param int max_events: An int indicating the maximum number of spikes of each sample. None uses whole files.
+    :param int repetitions: An int indicating the number of times each sample is compressed and decompressed.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param search_space: Keyword arguments passed to the getTuningConfigurations function (e.g. compressors or levels).
+
+    :return: This function returns two different objects, listed below:
+    - configuration (dict): A dict with the keyword arguments of the best configuration.
+    - results (list): A list with the results of all the configurations (see the benchmarkConfiguration function),
+    sorted from the best to the worst one. Each result includes whether or not it meets the constraints ("valid").
+    """
+    if goal not in TUNING_GOALS:
+        raise ValueError("The tuning goal must be one of " + ", ".join(TUNING_GOALS))
+
+    if isinstance(spikes_files, SpikesFile):
+        spikes_files = [spikes_files]
+    spikes_files = [sampleSpikesFile(spikes_file, max_events) for spikes_file in spikes_files]
+
+    start_time = time.time()
+
+    results = []
+    for configuration in getTuningConfigurations(**search_space):
+        result = benchmarkConfiguration(spikes_files, settings, configuration, repetitions=repetitions)
+        result["valid"] = ((min_ratio is None or result["ratio"] >= min_ratio) and
+                           (min_decode_speed is None or result["decode_speed"] >= min_decode_speed) and
+                           (max_encode_time is None or result["encode_time"] <= max_encode_time))
+        results.append(result)
+
+        if verbose:
+            print("tuneCompression: " + formatConfiguration(configuration) + " -> ratio " +
+                  '{0:.2f}'.format(result["ratio"]) + ", encode " + '{0:.1f}'.format(result["encode_speed"]) +
+                  " MB/s, decode " + '{0:.1f}'.format(result["decode_speed"]) + " MB/s")
+
+    results.sort(key=lambda result: (result["valid"], result[goal], result["ratio"]), reverse=True)
+
+    end_time = time.time()
+    if verbose:
+        print("tuneCompression: " + str(len(results)) + " configurations evaluated in " +
+              '{0:.3f}'.format(end_time - start_time) + " seconds")
+
+    if not results or not results[0]["valid"]:
+        raise ValueError("No compression configuration meets the constraints.")
+
+    configuration = {key: results[0][key] for key in ("compressor", "level", "prune_bytes", "bit_packing",
+                                                      "delta_timestamps", "columnar", "shuffle")}
+    if verbose:
+        print("tuneCompression: Best configuration: " + formatConfiguration(configuration))
+
+    return configuration, results
+
+
+def tuneNASFiles(file_paths, settings, max_events=DEFAULT_TUNING_EVENTS, verbose=True, **tuning_options):
+    """
+    Reads some original aedat NAS files (e.g. a few recordings of a new sensor configuration), adapts their timestamps as
+    the compressDataFromStoredNASFile function does and finds the best compression configuration for them with the
+    tuneCompression function.
+
+    :param list file_paths: A list of strings indicating the original aedat file paths (see the findAEDATFiles function).
+    :param MainSettings settings: A MainSettings object from pyNAVIS containing information about the files.
+    :param int max_events: An int indicating the maximum number of spikes taken from each file. None uses whole files.
+    :param boolean verbose: A boolean indicating whether or not debug comments are printed.
+    :param tuning_options: Keyword arguments passed to the tuneCompression function (e.g. goal or min_decode_speed).
+
+    :return: The configuration and results returned by the tuneCompression function.
+    """
+    spikes_files = []
+    for file_path in file_paths:
+        spikes_file = Loaders.loadAEDAT(file_path, settings)
+
+        # Adapt timestamps to allow timestamp compression
+        if spikes_file.min_ts != 0:
+            Functions.adapt_timestamps(spikes_file, settings)
+
+        spikes_files.append(sampleSpikesFile(spikes_file, max_events))
+
+    return tuneCompression(spikes_files, settings, max_events=None, verbose=verbose, **tuning_options)
+
+
+def formatConfiguration(configuration):
+    """
+    Builds a short description of a compression configuration (e.g. "ZSTD level 19 delta columnar").
+
+    :param dict configuration: A dict with a compression configuration (see the getTuningConfigurations function).
+
+    :return: A string with the description.
+    :rtype: string
+    """
+    description = configuration["compressor"] + " level " + ("default" if configuration["level"] is None else
+                                                             str(configuration["level"]))
+    if configuration["prune_bytes"] is not None:
+        description += " pruned" if configuration["prune_bytes"] else " 4-byte"
+    for option, name in (("bit_packing", "bit-packing"), ("delta_timestamps", "delta"), ("columnar", "columnar"),
+                         ("shuffle", "shuffle")):
+        if configuration[option]:
+            description += " " + name
+
+    return description
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pyNAVIS import MainSettings
+
+from AERzip.asyncFunctions import AsyncSession
+from AERzip.batchFunctions import findAEDATFiles, trainDatasetDictionary
+from AERzip.codecFunctions import dictionaries
+from AERzip.compressionFunctions import compressDataFromStoredNASFile, extractDataFromCompressedFile, \
+    getCompressedFilePath, loadFile, storeFile
+
+
+class CountingSession(AsyncSession):
+    """
+    An AsyncSession that counts the tasks running in its executor at the same time.
+    """
+
+    def __init__(self, executor=None, max_concurrency=None):
+        super().__init__(executor=executor, max_concurrency=max_concurrency)
+        self.running_tasks = 0
+        self.max_running_tasks = 0
+
+    async def runInExecutor(self, function, *args, **kwargs):
+        self.running_tasks += 1
+        self.max_running_tasks = max(self.max_running_tasks, self.running_tasks)
+        try:
+            return await super().runInExecutor(function, *args, **kwargs)
+        finally:
+            self.running_tasks -= 1
+
+
+class AsyncFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        # Defining settings
+        self.file_settings_mono_64ch_2a_4t_ts02 = MainSettings(num_channels=64, mono_stereo=0, on_off_both=1,
+                                                               address_size=2, timestamp_size=4, ts_tick=0.2,
+                                                               bin_size=10000)
+
+        # Copying some original files into a temporary events folder
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dataset_path = os.path.join(self.tmp_dir.name, "events", "dataset")
+        os.makedirs(self.dataset_path)
+        for file_name in ["130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat", "sound_mono_32ch_ONOFF_addr2b_ts02.aedat"]:
+            shutil.copy(os.path.join("events", "dataset", file_name), self.dataset_path)
+        self.file_paths = findAEDATFiles(self.dataset_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_compressAndExtract(self):
+        async def compressAndExtract(session):
+            # Ticks of the event loop while the files are processed
+            ticks = 0
+            done = asyncio.Event()
+
+            async def tick():
+                nonlocal ticks
+                while not done.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.001)
+
+            ticker = asyncio.create_task(tick())
+            compressed_file_paths = await session.compressNASFiles(self.file_paths * 2,
+                                                                   self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                                                   overwrite=True, delta_timestamps=True)
+            results = await asyncio.gather(*[session.extractDataFromCompressedFile(compressed_file_paths[file_path])
+                                             for file_path in self.file_paths])
+            done.set()
+            await ticker
+
+            return compressed_file_paths, results, ticks
+
+        for executor in [None, ThreadPoolExecutor(2), ProcessPoolExecutor(2)]:
+            session = CountingSession(executor=executor, max_concurrency=2)
+            compressed_file_paths, results, ticks = asyncio.run(compressAndExtract(session))
+            if executor is not None:
+                executor.shutdown()
+
+            # The event loop is not blocked and the concurrency is bounded
+            self.assertGreater(ticks, 0)
+            self.assertLessEqual(session.max_running_tasks, 2)
+
+            for file_path, (header, spikes_file, _, _) in zip(self.file_paths, results):
+                compressed_file, _ = compressDataFromStoredNASFile(file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                                   "ZSTD", store=False, verbose=False,
+                                                                   delta_timestamps=True)
+                _, new_spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_paths[file_path],
+                                                                         verbose=False)
+
+                # Same compressed files as the synchronous functions
+                self.assertEqual(compressed_file_paths[file_path], getCompressedFilePath(file_path, "ZSTD"))
+                self.assertEqual(loadFile(compressed_file_paths[file_path]), compressed_file)
+                self.assertIsNotNone(header.getOption("D"))
+                self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_invalidFiles(self):
+        file_path = self.file_paths[0]
+        original_file = loadFile(file_path)
+        event_size = self.file_settings_mono_64ch_2a_4t_ts02.address_size + \
+            self.file_settings_mono_64ch_2a_4t_ts02.timestamp_size
+        invalid_file_path = os.path.join(self.dataset_path, "invalid.aedat")
+
+        async def compress(session):
+            return await session.compressDataFromStoredNASFile(invalid_file_path,
+                                                               self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                                               store=False)
+
+        # Two events swapped, so the timestamps are not in increasing order. They are sorted as the synchronous
+        # function does
+        unsorted_file = bytearray(original_file)
+        first, second = 1000 * event_size, 2000 * event_size
+        unsorted_file[first:first + event_size], unsorted_file[second:second + event_size] = \
+            original_file[second:second + event_size], original_file[first:first + event_size]
+        storeFile(unsorted_file, invalid_file_path)
+
+        compressed_file, _ = asyncio.run(compress(AsyncSession()))
+        sync_compressed_file, _ = compressDataFromStoredNASFile(invalid_file_path,
+                                                                self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                                                store=False, verbose=False)
+        self.assertEqual(compressed_file, sync_compressed_file)
+
+        # An address out of range raises the same error as the synchronous function
+        out_of_range_file = bytearray(original_file)
+        out_of_range_file[1000 * event_size:1000 * event_size + 2] = b"\xff\xff"
+        storeFile(out_of_range_file, invalid_file_path, overwrite=True)
+
+        with self.assertRaises(ValueError):
+            compressDataFromStoredNASFile(invalid_file_path, self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                          store=False, verbose=False)
+        with self.assertRaises(ValueError):
+            asyncio.run(compress(AsyncSession()))
+
+    def test_storeFile(self):
+        async def storeFiles(session):
+            file_path = os.path.join(self.tmp_dir.name, "folder", "file.bin")
+            first_path = await session.storeFile(b"first", file_path)
+            second_path = await session.storeFile(b"second", file_path)
+            third_path = await session.storeFile(b"third", file_path, overwrite=True)
+
+            return first_path, second_path, third_path, await session.loadFile(file_path)
+
+        first_path, second_path, third_path, data = asyncio.run(storeFiles(AsyncSession()))
+
+        self.assertEqual(first_path, third_path)
+        self.assertNotEqual(first_path, second_path)
+        self.assertEqual(loadFile(second_path), b"second")
+        self.assertEqual(data, b"third")
+
+        with self.assertRaises(ValueError):
+            AsyncSession(max_concurrency=0)
+
+    def test_dictionary(self):
+        dictionary_id, _ = trainDatasetDictionary(self.file_paths, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                  sample_size=8192, dictionary_size=16384, verbose=False)
+
+        async def compressAndExtract(session):
+            compressed_file_paths = await session.compressNASFiles(self.file_paths,
+                                                                   self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                                                   dictionary_id=dictionary_id)
+            return await session.extractDataFromCompressedFile(compressed_file_paths[self.file_paths[0]])
+
+        # The worker processes load the dictionary from the folder of the compressed files
+        dictionaries.clear()
+        with ProcessPoolExecutor(1) as executor:
+            header, spikes_file, _, _ = asyncio.run(compressAndExtract(AsyncSession(executor=executor)))
+
+        _, new_spikes_file, _, _ = extractDataFromCompressedFile(getCompressedFilePath(self.file_paths[0], "ZSTD"),
+                                                                 verbose=False)
+        self.assertIsNotNone(header.getOption("K"))
+        self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        # Streaming mode
+        async def compressInChunks(session):
+            return await session.compressDataFromStoredNASFile(self.file_paths[0],
+                                                               self.file_settings_mono_64ch_2a_4t_ts02, "LZ4",
+                                                               chunk_size=10000)
+
+        compressed_file, final_file_path = asyncio.run(compressInChunks(AsyncSession()))
+        _, new_spikes_file, _, _ = extractDataFromCompressedFile(final_file_path, verbose=False)
+        self.assertIsNone(compressed_file)
+        self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
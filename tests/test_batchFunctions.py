@@ -0,0 +1,211 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyNAVIS import MainSettings
+
+from AERzip.batchFunctions import findAEDATFiles, compressNASFiles, getDictionarySamples, trainDatasetDictionary, \
+    verifyCompressedFiles
+from AERzip.cli import main, parseSettings
+from AERzip.codecFunctions import dictionaries
+from AERzip.compressionFunctions import getCompressedFilePath, extractDataFromCompressedFile, \
+    compressDataFromStoredNASFile, compressedFileToSpikesFile, compressedFileToBytes, getDictionaryPath, \
+    getDictionaryOption
+
+
+class BatchFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        # Defining settings
+        self.file_settings_mono_64ch_2a_4t_ts02 = MainSettings(num_channels=64, mono_stereo=0, on_off_both=1,
+                                                               address_size=2, timestamp_size=4, ts_tick=0.2,
+                                                               bin_size=10000)
+
+        # Copying some original files into a temporary events folder
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dataset_path = os.path.join(self.tmp_dir.name, "events", "dataset")
+        os.makedirs(self.dataset_path)
+        for file_name in ["130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat", "sound_mono_32ch_ONOFF_addr2b_ts02.aedat"]:
+            shutil.copy(os.path.join("events", "dataset", file_name), self.dataset_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_getCompressedFilePath(self):
+        self.assertEqual(getCompressedFilePath(os.path.join("events", "dataset", "file.aedat"), "ZSTD"),
+                         os.path.join("compressedEvents", "dataset_ZSTD", "file.aedat"))
+        self.assertEqual(getCompressedFilePath(os.path.join(self.dataset_path, "file.aedat"), "LZ4"),
+                         os.path.join(self.tmp_dir.name, "compressedEvents", "dataset_LZ4", "file.aedat"))
+
+    def test_findAEDATFiles(self):
+        events_path = os.path.dirname(self.dataset_path)
+        file_paths = findAEDATFiles(events_path)
+
+        self.assertEqual(len(file_paths), 2)
+        self.assertEqual(file_paths, findAEDATFiles(self.dataset_path))
+        self.assertEqual(findAEDATFiles(file_paths[0]), [file_paths[0]])
+
+    def test_compressNASFiles(self):
+        file_paths = findAEDATFiles(self.dataset_path)
+        compressed_file_paths = compressNASFiles(file_paths, self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                                 workers=2, verbose=False)
+
+        for file_path in file_paths:
+            # Compressed files mirror the layout of the original ones
+            compressed_file_path = compressed_file_paths[file_path]
+            self.assertEqual(compressed_file_path, getCompressedFilePath(file_path, "ZSTD"))
+
+            # Compare with the compressed file obtained in this process
+            compressed_file, _ = compressDataFromStoredNASFile(file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                               "ZSTD", store=False, verbose=False)
+            _, spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+            _, new_spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False)
+
+            self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        # A corrupt file (with addresses out of range) and a missing file do not stop the others
+        corrupt_file_path = os.path.join(self.dataset_path, "corrupt.aedat")
+        with open(corrupt_file_path, "wb") as file:
+            file.write(b"\xff" * 6000)
+        missing_file_path = os.path.join(self.dataset_path, "missing.aedat")
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            compressed_file_paths = compressNASFiles(file_paths + [corrupt_file_path, missing_file_path],
+                                                     self.file_settings_mono_64ch_2a_4t_ts02, "LZ4", workers=2)
+
+        self.assertIsNone(compressed_file_paths[corrupt_file_path])
+        self.assertIsNone(compressed_file_paths[missing_file_path])
+        self.assertFalse(os.path.exists(getCompressedFilePath(corrupt_file_path, "LZ4")))
+        for file_path in file_paths:
+            self.assertEqual(compressed_file_paths[file_path], getCompressedFilePath(file_path, "LZ4"))
+        self.assertIn("FAILED: " + corrupt_file_path, output.getvalue())
+        self.assertIn("2 failed", output.getvalue())
+
+    def test_getDictionarySamples(self):
+        file_paths = findAEDATFiles(self.dataset_path)
+
+        # The samples are the bytes compressed with the same conversion options
+        for options in [{}, {"delta_timestamps": True, "columnar": True}, {"bit_packing": True},
+                        {"bit_packing": True, "delta_timestamps": True, "columnar": True}, {"prune_bytes": True}]:
+            samples = getDictionarySamples(file_paths, self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                           sample_size=1 << 30, samples_per_file=1, **options)
+            self.assertEqual(len(samples), len(file_paths))
+
+            for file_path, sample in zip(file_paths, samples):
+                compressed_file, _ = compressDataFromStoredNASFile(file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                                   "ZSTD", store=False, verbose=False, **options)
+                data, _ = compressedFileToBytes(compressed_file, verbose=False)
+                self.assertEqual(sample, bytes(data))
+
+    def test_trainDatasetDictionary(self):
+        file_paths = findAEDATFiles(self.dataset_path)
+        dictionary_id, dictionary_path = trainDatasetDictionary(file_paths, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                                sample_size=8192, dictionary_size=16384,
+                                                                verbose=False)
+
+        # The dictionary is stored next to the compressed files of the dataset
+        compressed_dir_path = os.path.dirname(getCompressedFilePath(file_paths[0], "ZSTD"))
+        self.assertEqual(dictionary_path, getDictionaryPath(compressed_dir_path, dictionary_id))
+        self.assertTrue(os.path.isfile(dictionary_path))
+
+        compressed_file_paths = compressNASFiles(file_paths, self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                                                 workers=2, verbose=False, chunked=True,
+                                                 dictionary_id=dictionary_id)
+
+        # Decompressing in a process where the dictionary has not been loaded
+        dictionaries.clear()
+        for file_path in file_paths:
+            compressed_file, _ = compressDataFromStoredNASFile(file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                               "ZSTD", store=False, verbose=False)
+            _, spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+            header, new_spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_paths[file_path],
+                                                                          verbose=False)
+
+            self.assertEqual(getDictionaryOption(header), dictionary_id)
+            self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["compress", os.path.dirname(self.dataset_path), "--settings", "num_channels=64",
+                           "mono_stereo=0", "address_size=2", "ts_tick=0.2", "--compressor", "ZSTD", "-j", "2",
+                           "--chunked", "--delta"])
+
+        self.assertEqual(status, 0)
+        self.assertIn("Throughput", output.getvalue())
+        for file_path in findAEDATFiles(self.dataset_path):
+            header, _, _, _ = extractDataFromCompressedFile(getCompressedFilePath(file_path, "ZSTD"), verbose=False)
+            self.assertEqual(header.compressor, "ZSTD")
+            self.assertIsNotNone(header.getOption("C"))
+            self.assertIsNotNone(header.getOption("D"))
+
+        # Compressing with a dictionary trained for the dataset
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = main(["compress", self.dataset_path, "--settings", "num_channels=64", "mono_stereo=0",
+                           "address_size=2", "ts_tick=0.2", "--chunked", "--chunk-size", "1000", "--overwrite",
+                           "--dictionary"])
+
+        self.assertEqual(status, 0)
+        for file_path in findAEDATFiles(self.dataset_path):
+            header, _, _, _ = extractDataFromCompressedFile(getCompressedFilePath(file_path, "ZSTD"), verbose=False)
+            self.assertIsNotNone(getDictionaryOption(header))
+
+        # Describing the compressed files from their headers
+        compressed_file_paths = [getCompressedFilePath(file_path, "ZSTD")
+                                 for file_path in findAEDATFiles(self.dataset_path)]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["info"] + compressed_file_paths)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(len(output.getvalue().splitlines()), len(compressed_file_paths))
+        self.assertIn("spikes", output.getvalue())
+
+        # Verifying the compressed files, one of them corrupted
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = main(["verify", os.path.dirname(compressed_file_paths[0]), "-j", "2"])
+        self.assertEqual(status, 0)
+
+        with open(compressed_file_paths[0], "r+b") as file:
+            file.seek(-40, os.SEEK_END)
+            file.write(b"corrupted")
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["verify", os.path.dirname(compressed_file_paths[0])])
+            errors = verifyCompressedFiles(compressed_file_paths, workers=1, verbose=False)
+
+        self.assertEqual(status, 1)
+        self.assertIn("FAILED", output.getvalue())
+        self.assertIsNotNone(errors[compressed_file_paths[0]])
+        self.assertIsNone(errors[compressed_file_paths[1]])
+
+        # A file that cannot be compressed sets the exit status
+        file_paths = findAEDATFiles(self.dataset_path)
+        corrupt_file_path = os.path.join(self.dataset_path, "corrupt.aedat")
+        with open(corrupt_file_path, "wb") as file:
+            file.write(b"\xff" * 6000)
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = main(["compress", self.dataset_path, "--settings", "num_channels=64", "mono_stereo=0",
+                           "address_size=2", "ts_tick=0.2", "--compressor", "LZ4"])
+        self.assertEqual(status, 1)
+        self.assertFalse(os.path.exists(getCompressedFilePath(corrupt_file_path, "LZ4")))
+        for file_path in file_paths:
+            self.assertTrue(os.path.isfile(getCompressedFilePath(file_path, "LZ4")))
+
+    def test_parseSettings(self):
+        settings = parseSettings(["num_channels=32", "ts_tick=0.2", "reset_timestamp=False"])
+
+        self.assertEqual(settings.num_channels, 32)
+        self.assertEqual(settings.ts_tick, 0.2)
+        self.assertFalse(settings.reset_timestamp)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
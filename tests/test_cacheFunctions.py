@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from AERzip.cacheFunctions import DecodedCache
+from AERzip.compressionFunctions import extractDataFromCompressedFile
+from AERzip.lazyFunctions import openCompressedFile
+
+
+def extractCachedFile(cache_dir, file_path):
+    """
+    Decodes a compressed file through a DecodedCache created in a worker process.
+    """
+    _, spikes_file, _, _ = DecodedCache(cache_dir).extractDataFromCompressedFile(file_path, verbose=False)
+
+    return np.array(spikes_file.timestamps)
+
+
+class CacheFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        # Copying some compressed files into a temporary folder
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        self.file_paths = []
+        for compressor in ["LZMA", "ZSTD", "LZ4"]:
+            file_path = os.path.join(self.tmp_dir.name, compressor + ".aedat")
+            shutil.copy(os.path.join("compressedEvents", "dataset_" + compressor,
+                                     "130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat"), file_path)
+            self.file_paths.append(file_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_extractDataFromCompressedFile(self):
+        cache = DecodedCache(self.cache_dir)
+        file_path = self.file_paths[0]
+        header, spikes_file, final_address_size, final_timestamp_size = \
+            extractDataFromCompressedFile(file_path, verbose=False, native=True)
+
+        for native in [True, False]:
+            # The first call decodes the file and the second one maps the cached arrays
+            for _ in range(2):
+                cached_header, cached_spikes_file, cached_address_size, cached_timestamp_size = \
+                    extractDataFromCompressedFile(file_path, verbose=False, native=native, cache=cache)
+
+                self.assertEqual(cached_header.toBytes(), header.toBytes())
+                self.assertEqual((cached_address_size, cached_timestamp_size),
+                                 (final_address_size, final_timestamp_size))
+                self.assertEqual(cached_spikes_file.timestamps.dtype.isnative, native)
+                self.assertEqual(cached_spikes_file.addresses.tolist(), spikes_file.addresses.tolist())
+                self.assertEqual(cached_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+
+            self.assertIsInstance(cached_spikes_file.timestamps, np.memmap)
+            self.assertFalse(cached_spikes_file.timestamps.flags.writeable)
+
+        # The native and big-endian arrays are different entries
+        self.assertEqual(len(cache.getEntries()), 2)
+
+        # Lazy files use the cache too
+        lazy_spikes_file = openCompressedFile(file_path, cache=cache)
+        self.assertIsInstance(lazy_spikes_file.timestamps, np.memmap)
+
+        # A modified file is not read from the cache
+        shutil.copy(self.file_paths[1], file_path)
+        self.assertIsNone(cache.load(cache.getKey(file_path)))
+        _, cached_spikes_file, _, _ = cache.extractDataFromCompressedFile(file_path, verbose=False)
+        self.assertNotIsInstance(cached_spikes_file.timestamps, np.memmap)
+
+        cache.clear()
+        self.assertEqual(cache.getSize(), 0)
+
+    def test_evict(self):
+        cache = DecodedCache(self.cache_dir)
+        for file_path in self.file_paths:
+            cache.extractDataFromCompressedFile(file_path, verbose=False)
+        entries = cache.getEntries()
+        self.assertEqual(len(entries), 3)
+
+        # The least recently used entry is removed first
+        first_key = cache.getKey(self.file_paths[0])
+        os.utime(cache.getEntryPath(first_key), (0, 0))
+        cache.max_size = cache.getSize() - 1
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.load(first_key))
+        self.assertLessEqual(cache.getSize(), cache.max_size)
+
+        cache.max_size = 0
+        cache.evict()
+        self.assertEqual(cache.getEntries(), [])
+
+        with self.assertRaises(ValueError):
+            DecodedCache(self.cache_dir, max_size=-1)
+
+    def test_processes(self):
+        # Several processes decode the same files through the same cache
+        with ProcessPoolExecutor(2) as executor:
+            timestamps = list(executor.map(extractCachedFile, [self.cache_dir] * 6, self.file_paths * 2))
+
+        cache = DecodedCache(self.cache_dir)
+        self.assertEqual(len(cache.getEntries()), 3)
+
+        # No temporary folders are left
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), sorted(key for _, _, key in cache.getEntries()))
+        for i, file_path in enumerate(self.file_paths):
+            _, spikes_file, _, _ = extractDataFromCompressedFile(file_path, verbose=False)
+            self.assertEqual(timestamps[i].tolist(), spikes_file.timestamps.tolist())
+            self.assertEqual(timestamps[i + 3].tolist(), spikes_file.timestamps.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
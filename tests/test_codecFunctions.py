@@ -0,0 +1,265 @@
+import io
+import subprocess
+import threading
+import sys
+import unittest
+import zlib
+
+import numpy as np
+from pyNAVIS import SpikesFile
+
+from AERzip.CompressedFileHeader import CompressedFileHeader
+from AERzip.codecFunctions import Codec, ZstdCodec, registerCodec, getCodec, getCodecNames, codecs, addDictionary, \
+    getDictionary, dictionaries, CodecSession
+from AERzip.compressionFunctions import compressData, decompressData, compressDataStream, decompressDataStream, \
+    getDecompressedSize, spikesFileToCompressedFile, compressedFileToSpikesFile, calcFinalSizes, \
+    bytesToCompressedFile, compressedFileToBytes, addConversionOptions, addDictionaryOption, readCompressedFileHeader
+
+
+class ZlibCodec(Codec):
+    """
+    A codec that is not registered by default, used to test the codec registry.
+    """
+    name = "ZLIB"
+    module_name = "zlib"
+
+    def compress(self, data, level=None, dictionary=None):
+        self.checkDictionary(dictionary)
+        level = self.getLevel(level)
+        return self.module.compress(data, -1 if level is None else level)
+
+    def decompress(self, compressed_data, dictionary=None):
+        self.checkDictionary(dictionary)
+        return self.module.decompress(compressed_data)
+
+    def compressStream(self, data_chunks, file, data_size=None, level=None, dictionary=None):
+        self.checkDictionary(dictionary)
+        level = self.getLevel(level)
+        cctx = self.module.compressobj(-1 if level is None else level)
+        for chunk in data_chunks:
+            file.write(cctx.compress(chunk))
+        file.write(cctx.flush())
+
+    def decompressStream(self, compressed_chunks, dictionary=None):
+        self.checkDictionary(dictionary)
+        dctx = self.module.decompressobj()
+        for compressed_chunk in compressed_chunks:
+            yield dctx.decompress(compressed_chunk)
+        yield dctx.flush()
+
+
+class CodecFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = rng.integers(0, 16, 200000, dtype=np.uint8).tobytes()
+        self.default_codecs = dict(codecs)
+        self.default_dictionaries = dict(dictionaries)
+
+    def tearDown(self):
+        codecs.clear()
+        codecs.update(self.default_codecs)
+        dictionaries.clear()
+        dictionaries.update(self.default_dictionaries)
+
+    def test_codecs(self):
+        self.assertEqual(getCodecNames(), ["ZSTD", "LZ4", "LZMA"])
+
+        for compressor in getCodecNames():
+            compressed_data = compressData(self.data, compressor, verbose=False)
+            self.assertEqual(bytes(decompressData(compressed_data, compressor)), self.data)
+
+            # Stream compression and decompression
+            file = io.BytesIO()
+            data_chunks = [self.data[i:i + 30000] for i in range(0, len(self.data), 30000)]
+            compressDataStream(data_chunks, compressor, file, data_size=len(self.data))
+            self.assertEqual(bytes(decompressData(file.getvalue(), compressor)), self.data)
+
+            compressed_chunks = [compressed_data[i:i + 1000] for i in range(0, len(compressed_data), 1000)]
+            self.assertEqual(b"".join(decompressDataStream(compressed_chunks, compressor)), self.data)
+
+        self.assertEqual(getDecompressedSize(compressData(self.data, "ZSTD", verbose=False), "ZSTD"), len(self.data))
+        self.assertEqual(getDecompressedSize(compressData(self.data, "LZ4", verbose=False), "LZ4"), len(self.data))
+        self.assertIsNone(getDecompressedSize(compressData(self.data, "LZMA", verbose=False), "LZMA"))
+
+        with self.assertRaises(ValueError):
+            getCodec("UNKNOWN")
+        with self.assertRaises(ValueError):
+            compressData(self.data, "UNKNOWN", verbose=False)
+
+    def test_levels(self):
+        for compressor, level in [("ZSTD", 19), ("LZ4", 12)]:
+            default_size = len(compressData(self.data, compressor, verbose=False))
+            level_size = len(compressData(self.data, compressor, verbose=False, level=level))
+            self.assertLess(level_size, default_size)
+
+            # Registering a codec with a default level
+            registerCodec(type(getCodec(compressor))(level=level))
+            self.assertEqual(len(compressData(self.data, compressor, verbose=False)), level_size)
+
+        with self.assertRaises(ValueError):
+            compressData(self.data, "LZMA", verbose=False, level=5)
+
+        # Options of the compression library
+        registerCodec(ZstdCodec())
+        default_size = len(compressData(self.data, "ZSTD", verbose=False))
+        registerCodec(ZstdCodec(write_checksum=True))
+        self.assertEqual(len(compressData(self.data, "ZSTD", verbose=False)), default_size + 4)
+
+    def test_registerCodec(self):
+        registerCodec(ZlibCodec(level=9))
+        self.assertIn("ZLIB", getCodecNames())
+        self.assertEqual(calcFinalSizes("ZLIB", 2, 3, verbose=False), (4, 4))
+
+        compressed_data = compressData(self.data, "ZLIB", verbose=False)
+        self.assertEqual(compressed_data, zlib.compress(self.data, 9))
+
+        # The registered codec can be used as the compressor of a compressed file
+        spikes_file = SpikesFile(np.arange(1000, dtype=np.uint32) % 64, np.arange(1000, dtype=np.uint32) * 10)
+        compressed_file = spikesFileToCompressedFile(spikes_file, 4, 4, 1, 2, "ZLIB", verbose=False)
+        header, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+
+        self.assertEqual(header.compressor, "ZLIB")
+        self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+        self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        with self.assertRaises(ValueError):
+            registerCodec(type("LongNameCodec", (ZlibCodec,), {"name": "ZLIB_WITH_A_LONG_NAME"})())
+
+    def test_dictionaries(self):
+        # Short samples that share their structure (increasing timestamps) but not their content
+        rng = np.random.default_rng(1)
+        samples = []
+        for _ in range(400):
+            spikes = np.zeros(100, dtype=">u4, >u4")
+            spikes["f0"] = rng.integers(0, 128, 100)
+            spikes["f1"] = np.cumsum(rng.integers(0, 200, 100))
+            samples.append(spikes.tobytes())
+
+        dictionary = getCodec("ZSTD").trainDictionary(samples[:300], 16384)
+        dictionary_id = addDictionary(dictionary)
+        self.assertEqual(getDictionary(dictionary_id), dictionary)
+        self.assertIsNone(getDictionary(None))
+
+        size = sum(len(compressData(sample, "ZSTD", verbose=False)) for sample in samples[300:])
+        dictionary_size = sum(len(compressData(sample, "ZSTD", verbose=False, dictionary_id=dictionary_id))
+                              for sample in samples[300:])
+        self.assertLess(dictionary_size, size)
+
+        for sample in samples[300:]:
+            compressed_data = compressData(sample, "ZSTD", verbose=False, dictionary_id=dictionary_id)
+            self.assertEqual(decompressData(compressed_data, "ZSTD", dictionary_id=dictionary_id), sample)
+
+            compressed_chunks = [compressed_data[i:i + 100] for i in range(0, len(compressed_data), 100)]
+            self.assertEqual(b"".join(decompressDataStream(compressed_chunks, "ZSTD", dictionary_id=dictionary_id)),
+                             sample)
+
+        # The contexts bound to the dictionary are cached per thread
+        codec = getCodec("ZSTD")
+        self.assertIs(codec.getCompressor(dictionary=dictionary), codec.getCompressor(dictionary=dictionary))
+        self.assertIsNot(codec.getCompressor(dictionary=dictionary), codec.getCompressor(level=19,
+                                                                                         dictionary=dictionary))
+        thread_compressors = []
+        thread = threading.Thread(target=lambda: thread_compressors.append(codec.getCompressor(dictionary=dictionary)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(thread_compressors[0], codec.getCompressor(dictionary=dictionary))
+
+        with self.assertRaises(ValueError):
+            getDictionary(dictionary_id + 1)
+        with self.assertRaises(ValueError):
+            compressData(samples[0], "LZ4", verbose=False, dictionary_id=dictionary_id)
+        with self.assertRaises(ValueError):
+            getCodec("LZMA").trainDictionary(samples, 16384)
+        with self.assertRaises(ValueError):
+            getCodec("ZSTD").trainDictionary(samples[:2], 16384)
+
+    def test_codecSession(self):
+        packets = [self.data[i:i + 3000] for i in range(0, 60000, 3000)]
+
+        for compressor, level in [("ZSTD", None), ("ZSTD", 19), ("LZ4", 9), ("LZMA", None)]:
+            header = CompressedFileHeader(compressor, 4, 4)
+            addConversionOptions(header, delta_timestamps=True)
+            session = CodecSession(compressor, level=level, header=header)
+
+            # Same output as the compression functions
+            for packet in packets:
+                compressed_data = session.compress(packet)
+                self.assertEqual(compressed_data, compressData(packet, compressor, verbose=False, level=level))
+                self.assertEqual(session.decompress(compressed_data), decompressData(compressed_data, compressor))
+
+                compressed_file = session.compressFile(packet)
+                self.assertEqual(compressed_file, bytesToCompressedFile(packet, header, verbose=False, level=level))
+                self.assertEqual(session.decompressFile(compressed_file)[0],
+                                 compressedFileToBytes(compressed_file, verbose=False)[0])
+
+                output = session.decompressInto(compressed_data, data_size=len(packet))
+                self.assertEqual(bytes(output), packet)
+
+        # The context and the output buffer of each thread are reused
+        session = CodecSession("ZSTD")
+        self.assertIs(session.getContext(), session.getContext())
+        first_output = session.decompressInto(session.compress(packets[0]))
+        second_output = session.decompressInto(session.compress(packets[1]))
+        self.assertIs(first_output.obj, second_output.obj)
+        self.assertEqual(bytes(second_output), packets[1])
+
+        thread_contexts = []
+        thread = threading.Thread(target=lambda: thread_contexts.append(session.getContext()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(thread_contexts[0], session.getContext())
+
+        # Sessions with a dictionary
+        rng = np.random.default_rng(1)
+        samples = [rng.integers(0, 16, 1000, dtype=np.uint8).tobytes() for _ in range(200)]
+        dictionary_id = addDictionary(getCodec("ZSTD").trainDictionary(samples, 4096))
+        header = CompressedFileHeader("ZSTD", 4, 4)
+        addDictionaryOption(header, dictionary_id)
+        session = CodecSession("ZSTD", header=header)
+
+        self.assertEqual(session.dictionary_id, dictionary_id)
+        self.assertEqual(session.compressFile(samples[0]), bytesToCompressedFile(samples[0], header, verbose=False))
+
+        # The metadata of the header (e.g. the one of the file it was read from) is not copied into other files
+        header = CompressedFileHeader("ZSTD", 4, 4)
+        header.setMetadata(num_events=100, data_size=800, min_ts=5, max_ts=500)
+        session = CodecSession("ZSTD", header=header)
+        for packet in packets[:2]:
+            file_header = readCompressedFileHeader(io.BytesIO(session.compressFile(packet)))
+            self.assertEqual(file_header.data_size, len(packet))
+            self.assertIsNone(file_header.num_events)
+            self.assertIsNone(file_header.min_ts)
+            self.assertIsNone(file_header.max_ts)
+        self.assertEqual((header.num_events, header.min_ts, header.max_ts), (100, 5, 500))
+
+        # The header layout is the same for every header
+        self.assertEqual(len(header.toBytes()), header.getSize())
+        self.assertEqual(CompressedFileHeader.header_size, 100)
+        self.assertEqual(len(CompressedFileHeader("ZSTD", 4, 4, header_version=1).toBytes()), 100)
+
+        with self.assertRaises(ValueError):
+            CodecSession("LZ4", header=header)
+        with self.assertRaises(ValueError):
+            CodecSession("ZSTD", dictionary_id=dictionary_id, header=CompressedFileHeader("ZSTD", 4, 4))
+        with self.assertRaises(ValueError):
+            CodecSession("ZSTD").compressFile(samples[0])
+        with self.assertRaises(ValueError):
+            session.decompressFile(CodecSession("ZSTD", header=CompressedFileHeader("ZSTD", 2, 4)).compressFile(b"0"))
+        with self.assertRaises(ValueError):
+            CodecSession("LZMA").decompressInto(compressData(samples[0], "LZMA", verbose=False))
+
+    def test_lazyImports(self):
+        # Importing AERzip and using ZSTD does not import the other compression libraries
+        code = ("import sys\n"
+                "from AERzip.compressionFunctions import compressData\n"
+                "print(sorted(module for module in ['zstandard', 'lz4', 'pylzma'] if module in sys.modules))\n"
+                "compressData(b'data', 'ZSTD', verbose=False)\n"
+                "print(sorted(module for module in ['zstandard', 'lz4', 'pylzma'] if module in sys.modules))\n")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+        self.assertEqual(output.split("\n")[:2], ["[]", "['zstandard']"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
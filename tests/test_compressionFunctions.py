@@ -1,14 +1,23 @@
 import copy
+import io
 import os
+import tempfile
 import unittest
 
 from pyNAVIS import MainSettings, Loaders
+import numpy as np
 
 import AERzip
 from AERzip.CompressedFileHeader import CompressedFileHeader
 from AERzip.compressionFunctions import compressedFileToSpikesFile, checkFileExists, \
     getCompressedFile, extractCompressedData, decompressData, compressDataFromStoredNASFile, loadFile, \
-    spikesFileToCompressedFile, extractDataFromCompressedFile
+    spikesFileToCompressedFile, extractDataFromCompressedFile, compressStoredNASFileInChunks, compressedFileToBytes, \
+    extractTimeRange, storeFile, compressFrames, decompressFrames, compressedFileStreamToSpikesFile, compressData, \
+    decompressDataStream, getDecompressedSize, readFileChunks, getDictionaryOption, \
+    readCompressedFileHeader, getCompressedFileInfo, verifyCompressedFile, extractAddresses, compressNASSpikesFile, \
+    getAddressGroupOption, readChunkGroups, readChunkIndex, getGroupSequenceOption
+from AERzip.codecFunctions import getCodec, addDictionary
+from AERzip.conversionFunctions import spikesFileToBytes, calcRequiredBits, getNASAddresses, calcAddressGroups
 
 
 class CompressionFunctionTests(unittest.TestCase):
@@ -62,6 +71,221 @@ class CompressionFunctionTests(unittest.TestCase):
                 self.assertEqual(spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
                 self.assertEqual(header.header_end, "#End Of ASCII Header\r\n")
 
+    def test_compressInChunks(self):
+        for file_data in self.files_data:
+            # Compressing the whole file at once
+            compressed_file, _ = compressDataFromStoredNASFile(file_data[0], file_data[1], "ZSTD", store=False,
+                                                               verbose=False)
+            data, header = compressedFileToBytes(compressed_file, verbose=False)
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # Compressing the file in chunks
+                compressed_file_path = os.path.join(tmp_dir, os.path.basename(file_data[0]))
+                chunks_header = compressStoredNASFileInChunks(file_data[0], compressed_file_path, file_data[1], "ZSTD",
+                                                              chunk_size=10000, verbose=False)
+
+                # Both files must contain the same spikes
+                chunks_data, new_header = compressedFileToBytes(loadFile(compressed_file_path), verbose=False)
+
+                # Compressing the file in chunks into a chunked container
+                compressStoredNASFileInChunks(file_data[0], compressed_file_path, file_data[1], "ZSTD",
+                                              chunk_size=10000, chunked=True, verbose=False)
+                chunked_data, chunked_header = compressedFileToBytes(loadFile(compressed_file_path), verbose=False)
+
+            self.assertEqual(chunked_header.getOption("C"), b"")
+            self.assertEqual(data, chunked_data)
+
+            self.assertEqual(chunks_header.address_size, header.address_size)
+            self.assertEqual(chunks_header.timestamp_size, header.timestamp_size)
+            self.assertEqual(new_header.__dict__, header.__dict__)
+            self.assertEqual(data, chunks_data)
+
+    def test_compressInvalidFileInChunks(self):
+        file_path, file_settings = self.files_data[1]
+        original_file = loadFile(file_path)
+        end_string = b"#End Of ASCII Header\r\n"
+        data_start = original_file.find(end_string) + len(end_string) if end_string in original_file else 0
+        event_size = file_settings.address_size + file_settings.timestamp_size
+
+        def getEventPosition(event):
+            return data_start + event * event_size
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            invalid_file_path = os.path.join(tmp_dir, "invalid.aedat")
+            compressed_file_path = os.path.join(tmp_dir, "compressed.aedat")
+
+            # Two events swapped, so the timestamps are not in increasing order
+            unsorted_file = bytearray(original_file)
+            first, second = getEventPosition(5000), getEventPosition(15000)
+            unsorted_file[first:first + event_size], unsorted_file[second:second + event_size] = \
+                original_file[second:second + event_size], original_file[first:first + event_size]
+            storeFile(unsorted_file, invalid_file_path)
+
+            # The whole file is sorted, but it cannot be sorted in chunks
+            compressed_file, _ = compressDataFromStoredNASFile(invalid_file_path, file_settings, "ZSTD", store=False,
+                                                               verbose=False)
+            _, spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+            self.assertTrue(np.all(np.diff(spikes_file.timestamps.astype(np.int64)) >= 0))
+            for chunked in [False, True]:
+                with self.assertRaises(ValueError):
+                    compressStoredNASFileInChunks(invalid_file_path, compressed_file_path, file_settings, "ZSTD",
+                                                  chunk_size=10000, chunked=chunked, verbose=False)
+                self.assertFalse(os.path.exists(compressed_file_path))
+
+            # An address out of range raises the same error in both modes
+            out_of_range_file = bytearray(original_file)
+            position = getEventPosition(12345)
+            out_of_range_file[position:position + file_settings.address_size] = b"\xff" * file_settings.address_size
+            storeFile(out_of_range_file, invalid_file_path, overwrite=True)
+            with self.assertRaises(ValueError):
+                compressDataFromStoredNASFile(invalid_file_path, file_settings, "ZSTD", store=False, verbose=False)
+            with self.assertRaises(ValueError):
+                compressStoredNASFileInChunks(invalid_file_path, compressed_file_path, file_settings, "ZSTD",
+                                              chunk_size=10000, verbose=False)
+
+    def test_chunkedContainer(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            # Compressing the spikes_file into a chunked container
+            compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                         file_settings.timestamp_size, file_settings.address_size,
+                                                         file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                         chunk_size=10000)
+
+            # Decompressing the whole container
+            header, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file, verbose=False)
+            self.assertEqual(header.getOption("C"), b"")
+            self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+            # Extracting a time range
+            t_start = int(spikes_file.max_ts) // 3
+            t_end = 2 * int(spikes_file.max_ts) // 3
+            in_range = (spikes_file.timestamps >= t_start) & (spikes_file.timestamps < t_end)
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                compressed_file_path = os.path.join(tmp_dir, "chunked.aedat")
+                storeFile(compressed_file, compressed_file_path)
+                _, range_spikes_file, _, _ = extractTimeRange(compressed_file_path, t_start, t_end, verbose=False)
+
+            self.assertEqual(spikes_file.addresses[in_range].tolist(), range_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps[in_range].tolist(), range_spikes_file.timestamps.tolist())
+
+    def test_deltaTimestamps(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            for chunk_size in [None, 10000]:
+                # Compressing the spikes_file with and without timestamp deltas
+                compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                             file_settings.timestamp_size, file_settings.address_size,
+                                                             file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                             chunk_size=chunk_size)
+                delta_compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                                   file_settings.timestamp_size,
+                                                                   file_settings.address_size,
+                                                                   file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                                   chunk_size=chunk_size, delta_timestamps=True)
+
+                # Decompressing the spikes_file
+                header, new_spikes_file, _, _ = compressedFileToSpikesFile(delta_compressed_file, verbose=False)
+
+                self.assertEqual(header.getOption("D"), b"")
+                self.assertLess(header.timestamp_size, 4)
+                self.assertLess(len(delta_compressed_file), len(compressed_file))
+                self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_columnarAndShuffle(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            for chunk_size in [None, 10000]:
+                # Compressing the spikes_file with a columnar layout and shuffled bytes
+                compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                             file_settings.timestamp_size, file_settings.address_size,
+                                                             file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                             chunk_size=chunk_size, delta_timestamps=True,
+                                                             columnar=True, shuffle=True)
+
+                # Decompressing the spikes_file
+                header, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file, verbose=False)
+
+                self.assertEqual(header.getOption("L"), b"")
+                self.assertEqual(header.getOption("S"), b"")
+                self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        # The streaming compression only supports these options in chunked containers
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with self.assertRaises(ValueError):
+                compressStoredNASFileInChunks(self.files_data[0][0], os.path.join(tmp_dir, "file.aedat"),
+                                              self.files_data[0][1], "ZSTD", chunk_size=10000, shuffle=True,
+                                              verbose=False)
+
+    def test_bitPacking(self):
+        for i in range(len(self.files_data)):
+            file_path, file_settings = self.files_data[i]
+
+            # Compressing the original file with and without bit-packing
+            compressed_file, _ = compressDataFromStoredNASFile(file_path, file_settings, "ZSTD", store=False,
+                                                               verbose=False)
+            packed_compressed_file, _ = compressDataFromStoredNASFile(file_path, file_settings, "ZSTD", store=False,
+                                                                      verbose=False, bit_packing=True)
+
+            # Decompressing both files
+            _, spikes_file, _, _ = compressedFileToSpikesFile(compressed_file, verbose=False)
+            header, new_spikes_file, _, _ = compressedFileToSpikesFile(packed_compressed_file, verbose=False)
+
+            self.assertIsNotNone(header.getOption("B"))
+            self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+            # Chunked containers with timestamp deltas
+            spikes_file = self.spikes_files[i]
+            bit_widths = (int(np.max(spikes_file.addresses)).bit_length(), 32)
+            compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                         file_settings.timestamp_size, file_settings.address_size,
+                                                         file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                         chunk_size=10000, delta_timestamps=True, columnar=True,
+                                                         bit_widths=bit_widths)
+            header, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file, verbose=False)
+
+            self.assertLess(header.getOption("B")[1], 32)
+            self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_threads(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            # Compressing the spikes_file in parallel frames
+            compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                         file_settings.timestamp_size, file_settings.address_size,
+                                                         file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                         threads=4)
+
+            # Decompressing the spikes_file with and without threads
+            for threads in [1, 4]:
+                header, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file, verbose=False,
+                                                                           threads=threads)
+
+                self.assertIsNotNone(header.getOption("F"))
+                self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        # Frames of different sizes (the last one is smaller)
+        data = bytes(range(256)) * 1000
+        for frame_size in [1000, 100000, 1 << 20]:
+            compressed_data = compressFrames(data, "ZSTD", frame_size, threads=3)
+            self.assertEqual(decompressFrames(compressed_data, "ZSTD", frame_size, threads=3), data)
+        self.assertEqual(decompressFrames(compressFrames(b"", "ZSTD", 1000), "ZSTD", 1000), b"")
+
     def test_compressedFileToFromSpikesFile(self):
         for file_data in self.files_data:
             for algorithm in self.compression_algorithms:
@@ -89,7 +313,10 @@ class CompressionFunctionTests(unittest.TestCase):
                     self.assertNotEqual(compressed_file[0:20], new_compressed_file[0:20])
                 else:
                     self.assertEqual(compressed_file[0:20], new_compressed_file[0:20])
-                self.assertEqual(compressed_file[20:], new_compressed_file[20:])
+
+                # The stored files can have version 1 headers, so the compressed spikes are compared after each header
+                stored_header, _ = extractCompressedData(new_compressed_file)
+                self.assertEqual(compressed_file[header.getSize():], new_compressed_file[stored_header.getSize():])
 
                 # Call to compressedFileToSpikesFile function
                 new_header, new_spikes_file, new_final_address_size, new_final_timestamp_size = extractDataFromCompressedFile(compressed_file_path, verbose=False)
@@ -134,6 +361,292 @@ class CompressionFunctionTests(unittest.TestCase):
             self.assertEqual(header.__dict__, new_header.__dict__)
             self.assertEqual(data, decompressed_data)
 
+    def test_memoryMappedFile(self):
+        compressed_file_path = os.path.join("compressedEvents", "dataset_ZSTD",
+                                            "130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat")
+
+        compressed_file = loadFile(compressed_file_path)
+        mapped_file = loadFile(compressed_file_path, memory_map=True)
+        self.assertEqual(bytes(compressed_file), mapped_file[:])
+
+        # The compressed data is a view of the compressed file
+        header, compressed_data = extractCompressedData(mapped_file)
+        self.assertIsInstance(compressed_data, memoryview)
+        self.assertIs(compressed_data.obj, mapped_file)
+        self.assertEqual(compressed_data, compressed_file[header.header_size:])
+
+        # Decompressing the mapped file
+        header, spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False)
+        new_header, new_spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False,
+                                                                          memory_map=True)
+
+        self.assertEqual(header.__dict__, new_header.__dict__)
+        self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+        self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_headerMetadata(self):
+        options_list = [{}, {"chunk_size": 10000}, {"chunk_size": 10000, "bit_packing": True},
+                        {"columnar": True, "shuffle": True}]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i in range(len(self.spikes_files)):
+                spikes_file = self.spikes_files[i]
+                file_settings = self.files_data[i][1]
+
+                for options in options_list:
+                    options = dict(options)
+                    if options.pop("bit_packing", False):
+                        options["bit_widths"] = calcRequiredBits(spikes_file, file_settings)
+                    compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                                 file_settings.timestamp_size,
+                                                                 file_settings.address_size,
+                                                                 file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                                 **options)
+                    compressed_file_path = os.path.join(tmp_dir, "metadata.aedat")
+                    storeFile(compressed_file, compressed_file_path, overwrite=True)
+                    data, header = compressedFileToBytes(compressed_file, verbose=False)
+
+                    # The metadata describes the recording without decompressing it
+                    with open(compressed_file_path, "rb") as file:
+                        file_header = readCompressedFileHeader(file)
+                        self.assertEqual(file.tell(), header.getSize())
+                    info_header, compressed_size = getCompressedFileInfo(compressed_file_path)
+
+                    for new_header in [header, file_header, info_header]:
+                        self.assertEqual(new_header.header_version, 2)
+                        self.assertEqual(new_header.num_events, len(spikes_file.timestamps))
+                        self.assertEqual(new_header.min_ts, int(np.min(spikes_file.timestamps)))
+                        self.assertEqual(new_header.max_ts, int(np.max(spikes_file.timestamps)))
+                    self.assertEqual(compressed_size, len(compressed_file))
+                    self.assertEqual(header.data_size, len(data))
+
+                    flags = int.from_bytes(compressed_file[header.header_size + 32:header.header_size + 36], "big")
+                    self.assertEqual(flags & header.flag_bits["C"] != 0, "chunk_size" in options)
+                    self.assertEqual(flags & header.flag_bits["B"] != 0, "bit_widths" in options)
+                    self.assertEqual(flags & header.flag_bits["L"] != 0, "columnar" in options)
+
+        # Version 1 headers (the stored files) are still read
+        compressed_file_path = os.path.join("compressedEvents", "dataset_ZSTD",
+                                            "130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat")
+        header, spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False)
+        info_header, _ = getCompressedFileInfo(compressed_file_path)
+
+        self.assertEqual(header.header_version, 1)
+        self.assertEqual(header.getSize(), header.header_size)
+        self.assertEqual(len(spikes_file.timestamps), len(self.spikes_files[1].timestamps))
+        self.assertIsNone(info_header.num_events)
+
+        # The metadata of version 1 chunked containers is calculated from their chunk index
+        spikes_file = self.spikes_files[1]
+        compressed_file = spikesFileToCompressedFile(spikes_file, 2, 4, 2, 4, "ZSTD", verbose=False,
+                                                     chunk_size=10000)
+        header, _ = extractCompressedData(compressed_file)
+        v1_header = CompressedFileHeader("ZSTD", header.address_size, header.timestamp_size, header_version=1)
+        v1_header.addOption("C")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            compressed_file_path = os.path.join(tmp_dir, "v1.aedat")
+            storeFile(v1_header.toBytes() + compressed_file[header.getSize():], compressed_file_path)
+            _, v1_spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False)
+            info_header, _ = getCompressedFileInfo(compressed_file_path)
+
+        self.assertEqual(v1_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+        self.assertEqual((info_header.num_events, info_header.data_size, info_header.min_ts, info_header.max_ts),
+                         (header.num_events, header.data_size, header.min_ts, header.max_ts))
+
+    def test_verifyCompressedFile(self):
+        spikes_file = self.spikes_files[1]
+        file_path, file_settings = self.files_data[1]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            compressed_file_path = os.path.join(tmp_dir, "verified.aedat")
+            compressed_files = []
+            for options in [{}, {"chunk_size": 10000}, {"threads": 4}, {"columnar": True, "shuffle": True}]:
+                compressed_files.append(spikesFileToCompressedFile(spikes_file, 2, 4, 2, 4, "ZSTD", verbose=False,
+                                                                   **options))
+            for chunked in [False, True]:
+                compressStoredNASFileInChunks(file_path, compressed_file_path, file_settings, "LZMA",
+                                              chunk_size=10000, chunked=chunked, verbose=False)
+                compressed_files.append(loadFile(compressed_file_path))
+
+            for compressed_file in compressed_files:
+                # Files with checksums are still read as before
+                header, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+                _, stream_spikes_file, _, _ = compressedFileStreamToSpikesFile(io.BytesIO(compressed_file))
+                self.assertIsNotNone(header.getOption("X"))
+                self.assertEqual(new_spikes_file.timestamps.tolist(), stream_spikes_file.timestamps.tolist())
+
+                storeFile(compressed_file, compressed_file_path, overwrite=True)
+                self.assertEqual(verifyCompressedFile(compressed_file_path, read_size=1000).compressor,
+                                 header.compressor)
+
+                # Corrupted and truncated files are detected
+                header_size = header.getSize()
+                for position in [header_size + 10, (header_size + len(compressed_file)) // 2,
+                                 len(compressed_file) - 5]:
+                    corrupted_file = bytearray(compressed_file)
+                    corrupted_file[position] ^= 0x10
+                    storeFile(corrupted_file, compressed_file_path, overwrite=True)
+                    with self.assertRaises(ValueError):
+                        verifyCompressedFile(compressed_file_path)
+
+                storeFile(compressed_file[:-100], compressed_file_path, overwrite=True)
+                with self.assertRaises(ValueError):
+                    verifyCompressedFile(compressed_file_path)
+
+        # Files without checksums
+        header = verifyCompressedFile(os.path.join("compressedEvents", "dataset_LZ4",
+                                                   "130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat"))
+        self.assertIsNone(header.getOption("X"))
+
+    def test_addressGroups(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            # Groups of 8 channels of each ear and polarity
+            compressed_file = compressNASSpikesFile(spikes_file, file_settings, "ZSTD", verbose=False,
+                                                    delta_timestamps=True, group_channels=8, split_polarity=True)
+            header, compressed_data = extractCompressedData(compressed_file)
+            self.assertEqual(getAddressGroupOption(header), (16, True))
+            self.assertEqual(header.num_events, len(spikes_file.timestamps))
+
+            # Chunks never contain spikes of two groups
+            groups = readChunkGroups(compressed_data)
+            self.assertEqual(len(groups), len(readChunkIndex(compressed_data)))
+            self.assertGreater(len(np.unique(groups)), 1)
+
+            # The group sequence restores the original order of the spikes
+            self.assertEqual(getGroupSequenceOption(header)[0], 1)
+            _, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+            self.assertEqual(new_spikes_file.addresses.tolist(), spikes_file.addresses.tolist())
+            self.assertEqual(new_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+
+            # Also with other groups and with several chunks per group
+            for options in [{"split_polarity": True}, {"group_size": 2}, {"group_size": 16, "chunk_size": 1000}]:
+                other_compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                                   file_settings.timestamp_size,
+                                                                   file_settings.address_size,
+                                                                   file_settings.timestamp_size, "LZ4", verbose=False,
+                                                                   **options)
+                _, other_spikes_file, _, _ = compressedFileToSpikesFile(other_compressed_file)
+                self.assertEqual(other_spikes_file.addresses.tolist(), spikes_file.addresses.tolist())
+                self.assertEqual(other_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                compressed_file_path = os.path.join(tmp_dir, "grouped.aedat")
+                storeFile(compressed_file, compressed_file_path)
+                verifyCompressedFile(compressed_file_path)
+
+                # Only the chunks of the selected channels and polarities are decoded, and the spikes of their groups
+                # are merged in timestamp order (and by group if they have the same timestamp)
+                addresses = getNASAddresses(file_settings, channels=range(8, 16), ears=[0])
+                t_start = int(spikes_file.max_ts) // 3
+                _, address_spikes_file, _, _ = extractAddresses(compressed_file_path, addresses, t_start=t_start,
+                                                                verbose=False)
+                selected = np.isin(spikes_file.addresses, addresses) & (spikes_file.timestamps >= t_start)
+                order = np.lexsort((calcAddressGroups(spikes_file.addresses[selected], 16, True),
+                                    spikes_file.timestamps[selected]))
+                self.assertEqual(address_spikes_file.addresses.tolist(),
+                                 spikes_file.addresses[selected][order].tolist())
+                self.assertEqual(address_spikes_file.timestamps.tolist(),
+                                 spikes_file.timestamps[selected][order].tolist())
+
+                _, all_spikes_file, _, _ = extractAddresses(compressed_file_path, None, verbose=False)
+                self.assertEqual(all_spikes_file.addresses.tolist(), spikes_file.addresses.tolist())
+                self.assertEqual(all_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+
+        # Native-endian arrays, also through the chunked containers
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            compressed_file_path = os.path.join(tmp_dir, "native.aedat")
+            storeFile(compressed_file, compressed_file_path)
+            for streaming in [False, True]:
+                _, native_spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False,
+                                                                            streaming=streaming, native=True)
+                self.assertTrue(native_spikes_file.addresses.dtype.isnative)
+                self.assertTrue(native_spikes_file.timestamps.dtype.isnative)
+                self.assertEqual(native_spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                self.assertEqual(native_spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        # Address groups are not supported in streaming mode
+        with self.assertRaises(ValueError):
+            compressDataFromStoredNASFile(self.files_data[1][0], self.files_data[1][1], "ZSTD", store=False,
+                                          verbose=False, chunk_size=10000, group_channels=8)
+
+    def test_streaming(self):
+        options_list = [{}, {"delta_timestamps": True}, {"threads": 4}, {"chunk_size": 10000},
+                        {"chunk_size": 10000, "delta_timestamps": True}, {"columnar": True, "shuffle": True}]
+
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            for options in options_list:
+                compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                             file_settings.timestamp_size, file_settings.address_size,
+                                                             file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                             **options)
+                header, spikes_file_at_once, address_size, timestamp_size = \
+                    compressedFileToSpikesFile(compressed_file)
+
+                # Decompressing the compressed file while it is being read (in small reads)
+                new_header, new_spikes_file, new_address_size, new_timestamp_size = \
+                    compressedFileStreamToSpikesFile(io.BytesIO(compressed_file), read_size=1000)
+
+                self.assertEqual(header.__dict__, new_header.__dict__)
+                self.assertEqual((address_size, timestamp_size), (new_address_size, new_timestamp_size))
+                self.assertEqual(spikes_file_at_once.addresses.dtype, new_spikes_file.addresses.dtype)
+                self.assertEqual(spikes_file_at_once.timestamps.dtype, new_spikes_file.timestamps.dtype)
+                self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        # Decompressing a stored file
+        compressed_file_path = os.path.join("compressedEvents", "dataset_ZSTD",
+                                            "130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat")
+        _, spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False)
+        _, new_spikes_file, _, _ = extractDataFromCompressedFile(compressed_file_path, verbose=False, streaming=True)
+
+        self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+        self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+        # Data chunks that are not aligned to whole spikes and unknown data sizes
+        data = bytes(range(256)) * 600
+        self.assertEqual(b"".join(decompressDataStream(readFileChunks(io.BytesIO(compressData(data, "ZSTD",
+                                                                                              verbose=False)), 7),
+                                                       "ZSTD")), data)
+        self.assertEqual(getDecompressedSize(compressData(data, "ZSTD", verbose=False), "ZSTD"), len(data))
+
+    def test_dictionary(self):
+        # Training a dictionary from short chunks of the first file
+        spikes_file = self.spikes_files[1]
+        file_settings = self.files_data[1][1]
+        data = spikesFileToBytes(spikes_file, file_settings.address_size, file_settings.timestamp_size, 4, 4,
+                                 verbose=False)
+        samples = [bytes(data[i:i + 8000]) for i in range(0, len(data), 8000)]
+        dictionary_id = addDictionary(getCodec("ZSTD").trainDictionary(samples, 16384))
+
+        for options in [{}, {"chunk_size": 1000}, {"threads": 4}, {"delta_timestamps": True}]:
+            compressed_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                         file_settings.timestamp_size, file_settings.address_size,
+                                                         file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                         dictionary_id=dictionary_id, **options)
+            header, new_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file, threads=2)
+            _, stream_spikes_file, _, _ = compressedFileStreamToSpikesFile(io.BytesIO(compressed_file))
+
+            self.assertEqual(getDictionaryOption(header), dictionary_id)
+            for decompressed_spikes_file in [new_spikes_file, stream_spikes_file]:
+                self.assertEqual(spikes_file.addresses.tolist(), decompressed_spikes_file.addresses.tolist())
+                self.assertEqual(spikes_file.timestamps.tolist(), decompressed_spikes_file.timestamps.tolist())
+
+            # Short chunks are smaller with the dictionary
+            if "chunk_size" in options:
+                no_dictionary_file = spikesFileToCompressedFile(spikes_file, file_settings.address_size,
+                                                                file_settings.timestamp_size,
+                                                                file_settings.address_size,
+                                                                file_settings.timestamp_size, "ZSTD", verbose=False,
+                                                                **options)
+                self.assertLess(len(compressed_file), len(no_dictionary_file))
+
     def test_checkCompressedFileExists(self):
         initial_file_path = "events/dataset/enun_stereo_64ch_ONOFF_addr4b_ts1.aedat"
         initial_file_path_split = initial_file_path.split(".")
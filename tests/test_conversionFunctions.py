@@ -1,8 +1,13 @@
 import copy
+import math
 import unittest
 
 from pyNAVIS import MainSettings, Loaders
-from AERzip.conversionFunctions import calcRequiredBytes, spikesFileToBytes, bytesToSpikesFile
+import numpy as np
+
+from AERzip.conversionFunctions import calcRequiredBytes, spikesFileToBytes, bytesToSpikesFile, timestampsToDeltas, \
+    deltasToTimestamps, calcRequiredDeltaBytes, shuffleBytes, unshuffleBytes, calcRequiredBits, packBits, unpackBits, \
+    widenUint24, calcAddressGroups, getNASAddresses, BIT_PACKING_BLOCK_SIZE
 
 
 class JAERSettingsTest(unittest.TestCase):
@@ -65,6 +70,208 @@ class JAERSettingsTest(unittest.TestCase):
             for k in range(len(spikes_file.timestamps)):
                 self.assertEqual(spikes_file.timestamps[k], new_spikes_file.timestamps[k])
 
+    def test_deltaTimestamps(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            # Getting target sizes
+            address_size, _ = calcRequiredBytes(spikes_file, file_settings)
+            delta_size = calcRequiredDeltaBytes(spikes_file.timestamps)
+
+            # spikes_file to raw bytes (with timestamp deltas)
+            bytes_data = spikesFileToBytes(spikes_file, file_settings.address_size, file_settings.timestamp_size,
+                                           address_size, delta_size, verbose=False, delta_timestamps=True)
+            self.assertEqual(len(bytes_data), len(spikes_file.timestamps) * (address_size + delta_size))
+
+            # Raw bytes to spikes_file
+            new_spikes_file, _, final_timestamp_size = bytesToSpikesFile(bytes_data, address_size, delta_size,
+                                                                         verbose=False, delta_timestamps=True)
+
+            # Compare original and final spikes_file
+            self.assertEqual(final_timestamp_size, 4)
+            self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_columnarAndShuffle(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            # Getting target sizes
+            address_size, timestamp_size = calcRequiredBytes(spikes_file, file_settings)
+
+            for columnar in [False, True]:
+                for shuffle in [False, True]:
+                    # spikes_file to raw bytes (with the layout under test)
+                    bytes_data = spikesFileToBytes(spikes_file, file_settings.address_size,
+                                                   file_settings.timestamp_size, address_size, timestamp_size,
+                                                   verbose=False, columnar=columnar, shuffle=shuffle)
+                    self.assertEqual(len(bytes_data), len(spikes_file.timestamps) * (address_size + timestamp_size))
+
+                    # Raw bytes to spikes_file
+                    new_spikes_file, _, _ = bytesToSpikesFile(bytes_data, address_size, timestamp_size, verbose=False,
+                                                              columnar=columnar, shuffle=shuffle)
+
+                    # Compare original and final spikes_file
+                    self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                    self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_bitPacking(self):
+        for i in range(len(self.spikes_files)):
+            spikes_file = self.spikes_files[i]
+            file_settings = self.files_data[i][1]
+
+            # Getting exact bit widths
+            address_size, timestamp_size = calcRequiredBytes(spikes_file, file_settings)
+            address_bits, timestamp_bits = calcRequiredBits(spikes_file, file_settings)
+            self.assertEqual(address_size, int(np.ceil(address_bits / 8)))
+            self.assertEqual(timestamp_size, int(np.ceil(timestamp_bits / 8)))
+
+            for columnar in [False, True]:
+                # spikes_file to bit-packed bytes
+                bytes_data = spikesFileToBytes(spikes_file, file_settings.address_size, file_settings.timestamp_size,
+                                               address_size, timestamp_size, verbose=False, columnar=columnar,
+                                               bit_widths=(address_bits, timestamp_bits))
+                self.assertLessEqual(len(bytes_data),
+                                     8 + len(spikes_file.timestamps) * (address_bits + timestamp_bits) // 8 + 2)
+
+                # Bit-packed bytes to spikes_file
+                new_spikes_file, _, _ = bytesToSpikesFile(bytes_data, address_size, timestamp_size, verbose=False,
+                                                          columnar=columnar, bit_widths=(address_bits, timestamp_bits))
+
+                # Compare original and final spikes_file
+                self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+                self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_packBits(self):
+        # Records of 3 + 7 bits, padded to 3 bytes
+        packed = packBits([np.array([5, 2]), np.array([127, 1])], [3, 7])
+        self.assertEqual(packed, bytes([0b10111111, 0b11010000, 0b00010000]))
+
+        addresses, timestamps = unpackBits(packed, [3, 7], 2)
+        self.assertEqual(addresses.tolist(), [5, 2])
+        self.assertEqual(timestamps.tolist(), [127, 1])
+
+        # Values wider than one byte
+        values = np.array([0, 1, (1 << 41) - 1, 123456789], dtype=np.uint64)
+        self.assertEqual(unpackBits(packBits([values], [41]), [41], len(values))[0].tolist(), values.tolist())
+
+        # Several blocks of records, the last one incomplete
+        count = 2 * BIT_PACKING_BLOCK_SIZE + 3
+        addresses = np.arange(count, dtype=np.uint64) % 7
+        timestamps = np.arange(count, dtype=np.uint64) * 3
+        packed = packBits([addresses, timestamps], [3, 19])
+        self.assertEqual(len(packed), int(math.ceil(count * 22 / 8)))
+        new_addresses, new_timestamps = unpackBits(packed, [3, 19], count)
+        self.assertEqual(new_addresses.tolist(), addresses.tolist())
+        self.assertEqual(new_timestamps.tolist(), timestamps.tolist())
+
+    def test_spikesFileToBytesBuffer(self):
+        spikes_file = self.spikes_files[0]
+        num_spikes = len(spikes_file.timestamps)
+
+        for address_size, timestamp_size in [(4, 4), (2, 3), (3, 2)]:
+            bytes_data = spikesFileToBytes(spikes_file, 4, 4, address_size, timestamp_size, verbose=False)
+
+            # Writing into a larger caller-supplied buffer
+            buffer = bytearray(num_spikes * 8 + 10)
+            buffer_data = spikesFileToBytes(spikes_file, 4, 4, address_size, timestamp_size, verbose=False,
+                                            buffer=buffer)
+
+            self.assertEqual(len(buffer_data), num_spikes * (address_size + timestamp_size))
+            self.assertEqual(bytes(buffer_data), bytes(bytes_data))
+            self.assertEqual(bytes(buffer[:len(buffer_data)]), bytes(bytes_data))
+
+        with self.assertRaises(ValueError):
+            spikesFileToBytes(spikes_file, 4, 4, 4, 4, verbose=False, buffer=bytearray(10))
+
+    def test_widenUint24(self):
+        values = [0, 1, 0x123456, 0xFFFFFF]
+        field = np.array(values, dtype=">u4").view(np.uint8).reshape(-1, 4)[:, 1:]
+
+        # Interleaved with 2-byte fields (values after and before the other field) and contiguous
+        for offset, stride in [(2, 5), (0, 5), (0, 3)]:
+            data = bytearray(len(values) * stride)
+            np.ndarray((len(values), 3), dtype=np.uint8, buffer=data, offset=offset, strides=(stride, 1))[...] = field
+
+            widened = widenUint24(data, offset, stride, len(values))
+            self.assertEqual(widened.dtype, np.dtype(">u4"))
+            self.assertEqual(widened.tolist(), values)
+
+        self.assertEqual(widenUint24(b"", 0, 3, 0).tolist(), [])
+
+        # 3-byte fields through the bytesToSpikesFile function
+        for columnar in [False, True]:
+            spikes_file = self.spikes_files[0]
+            bytes_data = spikesFileToBytes(spikes_file, 4, 4, 3, 3, verbose=False, columnar=columnar)
+            new_spikes_file, final_address_size, final_timestamp_size = bytesToSpikesFile(bytes_data, 3, 3,
+                                                                                          verbose=False,
+                                                                                          columnar=columnar)
+
+            self.assertEqual((final_address_size, final_timestamp_size), (4, 4))
+            self.assertEqual(spikes_file.addresses.tolist(), new_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), new_spikes_file.timestamps.tolist())
+
+    def test_shuffleBytes(self):
+        data = bytes([1, 2, 3, 4, 5, 6])
+
+        self.assertEqual(shuffleBytes(data, 2), bytes([1, 3, 5, 2, 4, 6]))
+        self.assertEqual(unshuffleBytes(shuffleBytes(data, 3), 3), data)
+
+    def test_timestampsToFromDeltas(self):
+        # Out-of-order timestamps produce negative deltas
+        timestamps = np.array([10, 12, 11, 11, 40, 5], dtype=">u4")
+
+        deltas = timestampsToDeltas(timestamps, timestamp_base=8)
+        self.assertEqual(deltas.tolist(), [4, 4, 1, 0, 58, 69])
+        self.assertEqual(calcRequiredDeltaBytes(timestamps, timestamp_base=8), 1)
+
+        self.assertEqual(deltasToTimestamps(deltas, timestamp_base=8).tolist(), timestamps.tolist())
+
+    def test_nativeByteOrder(self):
+        spikes_file = self.spikes_files[0]
+        file_settings = self.files_data[0][1]
+        packed_sizes = calcRequiredBytes(spikes_file, file_settings)
+
+        # Native arrays have the same values and sizes as the big-endian ones
+        for address_size, timestamp_size, options in [(2, 4, {}), (3, 3, {}), (3, 3, {"columnar": True}),
+                                                      (2, 4, {"delta_timestamps": True}),
+                                                      (*packed_sizes,
+                                                       {"bit_widths": calcRequiredBits(spikes_file, file_settings)})]:
+            bytes_data = spikesFileToBytes(spikes_file, 4, 4, address_size, timestamp_size, verbose=False, **options)
+            big_spikes_file, big_address_size, big_timestamp_size = \
+                bytesToSpikesFile(bytes_data, address_size, timestamp_size, verbose=False, **options)
+            native_spikes_file, native_address_size, native_timestamp_size = \
+                bytesToSpikesFile(bytes_data, address_size, timestamp_size, verbose=False, native=True, **options)
+
+            self.assertEqual((native_address_size, native_timestamp_size), (big_address_size, big_timestamp_size))
+            for big_array, native_array in [(big_spikes_file.addresses, native_spikes_file.addresses),
+                                            (big_spikes_file.timestamps, native_spikes_file.timestamps)]:
+                self.assertTrue(native_array.dtype.isnative)
+                self.assertTrue(native_array.flags.c_contiguous)
+                self.assertEqual(native_array.dtype.itemsize, big_array.dtype.itemsize)
+                self.assertEqual(native_array.tolist(), big_array.tolist())
+
+        for offset, stride in [(2, 5), (0, 5), (0, 3)]:
+            data = bytes(range(40))
+            count = (len(data) - offset - 3) // stride + 1
+            self.assertEqual(widenUint24(data, offset, stride, count, native=True).tolist(),
+                             widenUint24(data, offset, stride, count).tolist())
+
+    def test_addressGroups(self):
+        settings = self.file_settings_stereo_64ch_2a_4t_ts02
+
+        # Both polarities of channel 3 of the right ear
+        self.assertEqual(getNASAddresses(settings, channels=[3], ears=[1]).tolist(), [134, 135])
+        self.assertEqual(len(getNASAddresses(settings)), 256)
+        self.assertEqual(len(getNASAddresses(settings, polarities=[0])), 128)
+
+        addresses = [0, 1, 15, 16, 17, 255]
+        self.assertEqual(calcAddressGroups(addresses, 16).tolist(), [0, 0, 0, 1, 1, 15])
+        self.assertEqual(calcAddressGroups(addresses, 16, True).tolist(), [0, 1, 1, 2, 3, 31])
+        self.assertEqual(calcAddressGroups(addresses, None, True).tolist(), [0, 1, 1, 0, 1, 1])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
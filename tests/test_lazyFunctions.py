@@ -0,0 +1,92 @@
+import copy
+import os
+import pickle
+import tempfile
+import unittest
+
+from pyNAVIS import MainSettings, Functions, Splitters
+
+from AERzip.compressionFunctions import compressDataFromStoredNASFile, extractDataFromCompressedFile, storeFile
+from AERzip.lazyFunctions import openCompressedFile, LazySpikesFile
+
+
+class LazyFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        # Defining settings
+        self.file_settings_mono_64ch_2a_4t_ts02 = MainSettings(num_channels=64, mono_stereo=0, on_off_both=1,
+                                                               address_size=2, timestamp_size=4, ts_tick=0.2,
+                                                               bin_size=10000)
+        self.file_path = "events/dataset/130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat"
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.compressed_file_path = os.path.join(self.tmp_dir.name, "lazy.aedat")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_openCompressedFile(self):
+        for options in [{}, {"chunked": True}]:
+            compressed_file, _ = compressDataFromStoredNASFile(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                               "LZMA", store=False, verbose=False, **options)
+            storeFile(compressed_file, self.compressed_file_path, overwrite=True)
+            _, spikes_file, _, _ = extractDataFromCompressedFile(self.compressed_file_path, verbose=False)
+
+            # The metadata is read from the header without decompressing the spikes
+            lazy_spikes_file = openCompressedFile(self.compressed_file_path)
+            self.assertIsInstance(lazy_spikes_file, LazySpikesFile)
+            self.assertEqual(lazy_spikes_file.header.compressor, "LZMA")
+            self.assertEqual(lazy_spikes_file.num_events, len(spikes_file.timestamps))
+            self.assertEqual(lazy_spikes_file.min_ts, spikes_file.min_ts)
+            self.assertEqual(lazy_spikes_file.max_ts, spikes_file.max_ts)
+            self.assertFalse(lazy_spikes_file.loaded)
+
+            # The spikes are decompressed on first access and kept
+            self.assertEqual(lazy_spikes_file.addresses.tolist(), spikes_file.addresses.tolist())
+            self.assertTrue(lazy_spikes_file.loaded)
+            self.assertIs(lazy_spikes_file.timestamps, lazy_spikes_file.timestamps)
+            self.assertTrue(lazy_spikes_file.timestamps.dtype.isnative)
+            self.assertEqual(lazy_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+            self.assertEqual(lazy_spikes_file.max_ts_index, spikes_file.max_ts_index)
+
+            # Modifications are kept until the spikes are released
+            Functions.adapt_timestamps(lazy_spikes_file, self.file_settings_mono_64ch_2a_4t_ts02)
+            self.assertEqual(lazy_spikes_file.min_ts, 0)
+            lazy_spikes_file.release()
+            self.assertFalse(lazy_spikes_file.loaded)
+            self.assertEqual(lazy_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+
+        # Copies and pickled files keep the decompressed spikes (if any) and get their own lock
+        for loaded in [False, True]:
+            lazy_spikes_file = openCompressedFile(self.compressed_file_path)
+            if loaded:
+                lazy_spikes_file.load()
+
+            for new_spikes_file in [copy.deepcopy(lazy_spikes_file), pickle.loads(pickle.dumps(lazy_spikes_file))]:
+                self.assertIsInstance(new_spikes_file, LazySpikesFile)
+                self.assertEqual(new_spikes_file.loaded, loaded)
+                self.assertIsNot(new_spikes_file.lock, lazy_spikes_file.lock)
+                self.assertEqual(new_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+
+        # pyNAVIS functions that copy their input
+        lazy_spikes_file = openCompressedFile(self.compressed_file_path)
+        t_end = int(spikes_file.max_ts) // 2
+        split_spikes_file = Splitters.manual_splitter(lazy_spikes_file, self.file_settings_mono_64ch_2a_4t_ts02, 0,
+                                                      t_end)
+        self.assertEqual(list(split_spikes_file.timestamps),
+                         [timestamp for timestamp in spikes_file.timestamps.tolist() if timestamp <= t_end])
+        stereo_spikes_file = Functions.mono_to_stereo(lazy_spikes_file, self.file_settings_mono_64ch_2a_4t_ts02)
+        self.assertEqual(len(stereo_spikes_file.timestamps), 2 * len(spikes_file.timestamps))
+        self.assertEqual(lazy_spikes_file.addresses.tolist(), spikes_file.addresses.tolist())
+
+        # Files written by previous versions of AERzip (version 1 headers without metadata)
+        lazy_spikes_file = openCompressedFile(os.path.join("compressedEvents", "dataset_ZSTD",
+                                                           "130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat"), native=False)
+        self.assertIsNone(lazy_spikes_file.header.num_events)
+        self.assertEqual(lazy_spikes_file.num_events, len(spikes_file.timestamps))
+        self.assertTrue(lazy_spikes_file.loaded)
+        self.assertFalse(lazy_spikes_file.timestamps.dtype.isnative)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
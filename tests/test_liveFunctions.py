@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pyNAVIS import MainSettings, Loaders
+
+from AERzip.compressionFunctions import compressDataFromStoredNASFile, compressedFileToSpikesFile, \
+    extractDataFromCompressedFile, extractTimeRange, loadFile, readChunkIndex, extractCompressedData, \
+    verifyCompressedFile, storeFile
+from AERzip.lazyFunctions import openCompressedFile
+from AERzip.liveFunctions import LiveEncoder
+
+
+class LiveFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        # Defining settings
+        self.file_settings_mono_64ch_2a_4t_ts02 = MainSettings(num_channels=64, mono_stereo=0, on_off_both=1,
+                                                               address_size=2, timestamp_size=4, ts_tick=0.2,
+                                                               bin_size=10000)
+        self.file_path = "events/dataset/130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat"
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.live_file_path = os.path.join(self.tmp_dir.name, "live", "capture.aedat")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_push(self):
+        spikes_file = Loaders.loadAEDAT(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02)
+        batch_size = 3000
+
+        for compressor in ["ZSTD", "LZMA", "LZ4"]:
+            encoder = LiveEncoder(self.live_file_path, self.file_settings_mono_64ch_2a_4t_ts02, compressor,
+                                  max_latency=None, shuffle=compressor == "LZ4")
+
+            # The file is valid from the start
+            _, live_spikes_file, _, _ = extractDataFromCompressedFile(self.live_file_path, verbose=False)
+            self.assertEqual(len(live_spikes_file.timestamps), 0)
+
+            for i in range(0, len(spikes_file.timestamps), batch_size):
+                encoder.push(spikes_file.addresses[i:i + batch_size], spikes_file.timestamps[i:i + batch_size])
+
+                # The file contains the frames written so far
+                _, live_spikes_file, _, _ = compressedFileToSpikesFile(loadFile(self.live_file_path))
+                self.assertEqual(len(live_spikes_file.timestamps), encoder.num_events)
+                self.assertEqual(encoder.num_events % encoder.frame_events, 0)
+
+            header = encoder.close()
+            encoder.close()
+
+            # Same spikes as the compressed file of the whole recording
+            compressed_file, _ = compressDataFromStoredNASFile(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                               compressor, store=False, verbose=False)
+            _, whole_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+            live_header, live_spikes_file, _, _ = extractDataFromCompressedFile(self.live_file_path, verbose=False)
+
+            self.assertEqual(live_header.toBytes(), header.toBytes())
+            self.assertEqual(live_header.num_events, len(whole_spikes_file.timestamps))
+            self.assertEqual((live_header.min_ts, live_header.max_ts),
+                             (int(whole_spikes_file.timestamps[0]), int(whole_spikes_file.timestamps[-1])))
+            self.assertEqual(live_spikes_file.addresses.tolist(), whole_spikes_file.addresses.tolist())
+            self.assertEqual(live_spikes_file.timestamps.tolist(), whole_spikes_file.timestamps.tolist())
+
+            # The checksums of the frames are stored
+            self.assertIsNotNone(verifyCompressedFile(self.live_file_path).getOption("X"))
+
+            # Frames of frame_size bytes
+            _, compressed_data = extractCompressedData(loadFile(self.live_file_path))
+            index = readChunkIndex(compressed_data)
+            self.assertEqual(len(index), encoder.num_frames)
+            self.assertTrue(all(int(entry["events"]) == encoder.frame_events for entry in index[:-1]))
+
+            # Time ranges can be read from the frames
+            t_start = int(whole_spikes_file.timestamps[len(whole_spikes_file.timestamps) // 2])
+            _, range_spikes_file, _, _ = extractTimeRange(self.live_file_path, t_start, t_start + 10000,
+                                                          verbose=False)
+            self.assertTrue(all(t_start <= timestamp < t_start + 10000 for timestamp in range_spikes_file.timestamps))
+
+    def test_interruptedCapture(self):
+        spikes_file = Loaders.loadAEDAT(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02)
+        interrupted_file_path = os.path.join(self.tmp_dir.name, "interrupted.aedat")
+        spliced_file_path = os.path.join(self.tmp_dir.name, "spliced.aedat")
+
+        encoder = LiveEncoder(self.live_file_path, self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD", max_latency=None,
+                              frame_size=8192)
+        encoder.push(spikes_file.addresses[:10000], spikes_file.timestamps[:10000])
+
+        # A capture interrupted while recording: the metadata is read from the chunk index
+        shutil.copy(self.live_file_path, interrupted_file_path)
+        old_header = loadFile(interrupted_file_path)[:encoder.header.getSize()]
+        self.assertIsNone(verifyCompressedFile(interrupted_file_path).num_events)
+        self.assertEqual(openCompressedFile(interrupted_file_path).num_events, encoder.num_events)
+
+        encoder.push(spikes_file.addresses[10000:], spikes_file.timestamps[10000:])
+        header = encoder.close()
+        self.assertEqual(header.num_events, len(spikes_file.timestamps))
+
+        # An old header followed by a newer body (e.g. the capture was killed before the header was written)
+        live_file = loadFile(self.live_file_path)
+        storeFile(old_header + live_file[len(old_header):], spliced_file_path)
+        verifyCompressedFile(spliced_file_path)
+        lazy_spikes_file = openCompressedFile(spliced_file_path)
+        self.assertEqual(lazy_spikes_file.num_events, len(spikes_file.timestamps))
+        self.assertEqual(lazy_spikes_file.max_ts, header.max_ts)
+
+    def test_latency(self):
+        with LiveEncoder(self.live_file_path, self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD",
+                         max_latency=0.01) as encoder:
+            # Small batches wait until the latency bound is reached
+            self.assertEqual(encoder.push([1, 2, 3], [10, 20, 30]), 0)
+            self.assertEqual(encoder.poll(), 0)
+            time.sleep(0.02)
+            self.assertEqual(encoder.poll(), 1)
+            self.assertEqual(encoder.poll(), 0)
+
+            time.sleep(0.02)
+            self.assertEqual(encoder.push([4], [40]), 0)
+            time.sleep(0.02)
+            self.assertEqual(encoder.push([5], [50]), 1)
+
+        self.assertIsNone(encoder.file)
+        _, spikes_file, _, _ = extractDataFromCompressedFile(self.live_file_path, verbose=False)
+        self.assertEqual(spikes_file.addresses.tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(spikes_file.timestamps.tolist(), [0, 2, 4, 6, 8])
+
+        with self.assertRaises(ValueError):
+            encoder.push([6], [60])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
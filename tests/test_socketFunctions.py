@@ -0,0 +1,103 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from pyNAVIS import MainSettings, Loaders
+
+from AERzip.compressionFunctions import compressDataFromStoredNASFile, compressedFileToSpikesFile
+from AERzip.socketFunctions import StreamSender, StreamReceiver, connectStreamSocket, listenStreamSocket, runLoopback
+
+
+class SocketFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        # Defining settings
+        self.file_settings_mono_64ch_2a_4t_ts02 = MainSettings(num_channels=64, mono_stereo=0, on_off_both=1,
+                                                               address_size=2, timestamp_size=4, ts_tick=0.2,
+                                                               bin_size=10000)
+        self.file_path = "events/dataset/130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat"
+        self.spikes_file = Loaders.loadAEDAT(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02)
+
+    def test_runLoopback(self):
+        original_size = len(self.spikes_file.timestamps) * 6
+
+        for compressor in ["ZSTD", "LZMA", "LZ4"]:
+            header, spikes_file, bytes_sent = runLoopback(self.spikes_file, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                          compressor, batch_size=2500, max_latency=None,
+                                                          columnar=compressor == "ZSTD")
+
+            # Same spikes as the compressed file of the whole recording
+            compressed_file, _ = compressDataFromStoredNASFile(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                               compressor, store=False, verbose=False)
+            _, whole_spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+
+            self.assertEqual(header.compressor, compressor)
+            self.assertEqual(spikes_file.addresses.tolist(), whole_spikes_file.addresses.tolist())
+            self.assertEqual(spikes_file.timestamps.tolist(), whole_spikes_file.timestamps.tolist())
+
+            # LZ4 frames of 4-byte fields can be larger than the original aedat spikes
+            if compressor != "LZ4":
+                self.assertLess(bytes_sent, original_size)
+
+    def test_sockets(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+
+        for address in [("127.0.0.1", 0), os.path.join(tmp_dir.name, "aerzip.sock")]:
+            server_socket = listenStreamSocket(address)
+            if not isinstance(address, str):
+                address = server_socket.getsockname()
+
+            def sendSpikes():
+                with connectStreamSocket(address) as sock:
+                    with StreamSender(sock, self.file_settings_mono_64ch_2a_4t_ts02, "ZSTD", frame_size=8192,
+                                      max_latency=None) as sender:
+                        for i in range(0, 20000, 500):
+                            sender.push(self.spikes_file.addresses[i:i + 500], self.spikes_file.timestamps[i:i + 500])
+
+            thread = threading.Thread(target=sendSpikes)
+            thread.start()
+
+            connection, _ = server_socket.accept()
+            with connection:
+                receiver = StreamReceiver(connection)
+                batches = list(receiver)
+            thread.join()
+            server_socket.close()
+
+            # Batches are decoded as frames arrive
+            self.assertEqual(len(batches), receiver.num_frames)
+            self.assertEqual(len(batches[0].timestamps), 8192 // 8)
+            self.assertEqual(sum(len(batch.timestamps) for batch in batches), 20000)
+            self.assertEqual(receiver.num_events, 20000)
+            self.assertEqual(batches[0].addresses.tolist(), self.spikes_file.addresses[:1024].tolist())
+            self.assertIsNone(receiver.receiveBatch())
+
+        tmp_dir.cleanup()
+
+    def test_interruptedStream(self):
+        sender_socket, receiver_socket = socket.socketpair()
+
+        sender = StreamSender(sender_socket, self.file_settings_mono_64ch_2a_4t_ts02, "LZ4", max_latency=None)
+        sender.push(self.spikes_file.addresses[:100], self.spikes_file.timestamps[:100])
+        sender.flush()
+        sender_socket.close()
+
+        receiver = StreamReceiver(receiver_socket)
+        self.assertEqual(len(receiver.receiveBatch().timestamps), 100)
+        with self.assertRaises(ValueError):
+            receiver.receiveBatch()
+        receiver_socket.close()
+
+        # Not an AERzip stream
+        sender_socket, receiver_socket = socket.socketpair()
+        sender_socket.sendall(bytes(200))
+        with self.assertRaises(ValueError):
+            StreamReceiver(receiver_socket)
+        sender_socket.close()
+        receiver_socket.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
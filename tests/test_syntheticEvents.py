@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from synthetic_events import generateNASEvents, calcNumAddresses
+
+
+class SyntheticEventTests(unittest.TestCase):
+
+    def test_generateNASEvents(self):
+        for process in ["poisson", "bursty"]:
+            for mono_stereo in [0, 1]:
+                spikes_file, settings = generateNASEvents(num_channels=32, mono_stereo=mono_stereo, duration=0.5,
+                                                          rate=200.0, process=process, seed=1)
+                addresses = spikes_file.addresses.astype(np.int64)
+                timestamps = spikes_file.timestamps.astype(np.int64)
+
+                # The same seed generates the same recording, and another seed a different one
+                same_spikes_file, _ = generateNASEvents(num_channels=32, mono_stereo=mono_stereo, duration=0.5,
+                                                        rate=200.0, process=process, seed=1)
+                other_spikes_file, _ = generateNASEvents(num_channels=32, mono_stereo=mono_stereo, duration=0.5,
+                                                         rate=200.0, process=process, seed=2)
+                self.assertEqual(same_spikes_file.addresses.tolist(), spikes_file.addresses.tolist())
+                self.assertEqual(same_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+                self.assertNotEqual(other_spikes_file.timestamps.tolist(), spikes_file.timestamps.tolist())
+
+                # Addresses are in the range of the settings, and timestamps are sorted and start at 0
+                self.assertGreater(len(timestamps), 0)
+                self.assertEqual(settings.mono_stereo, mono_stereo)
+                self.assertGreaterEqual(np.min(addresses), 0)
+                self.assertLess(np.max(addresses), calcNumAddresses(32, mono_stereo, 1))
+                self.assertEqual(timestamps[0], 0)
+                self.assertTrue(np.all(np.diff(timestamps) >= 0))
+
+    def test_fieldSizes(self):
+        # 3-byte fields are stored as 4-byte ints
+        spikes_file, settings = generateNASEvents(duration=0.1, address_size=3, timestamp_size=3)
+        self.assertEqual(spikes_file.addresses.dtype, np.dtype(">u4"))
+        self.assertEqual(spikes_file.timestamps.dtype, np.dtype(">u4"))
+        self.assertEqual((settings.address_size, settings.timestamp_size), (3, 3))
+
+        spikes_file, _ = generateNASEvents(duration=0.1, address_size=1, timestamp_size=4)
+        self.assertEqual(spikes_file.addresses.dtype, np.dtype(">u1"))
+
+        with self.assertRaises(ValueError):
+            generateNASEvents(duration=10.0, timestamp_size=2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import unittest
+
+from pyNAVIS import MainSettings, Loaders, Functions
+
+from AERzip.cli import main
+from AERzip.compressionFunctions import compressDataFromStoredNASFile, compressedFileToSpikesFile, calcFinalSizes
+from AERzip.tunerFunctions import getTuningConfigurations, sampleSpikesFile, tuneCompression, tuneNASFiles
+
+
+class TunerFunctionTests(unittest.TestCase):
+
+    def setUp(self):
+        # Defining settings
+        self.file_settings_mono_64ch_2a_4t_ts02 = MainSettings(num_channels=64, mono_stereo=0, on_off_both=1,
+                                                               address_size=2, timestamp_size=4, ts_tick=0.2,
+                                                               bin_size=10000)
+        self.file_path = "events/dataset/130Hz_mono_64ch_ONOFF_addr2b_ts02.aedat"
+
+        # Small search space
+        self.search_space = dict(compressors=["ZSTD", "LZ4"], levels={"ZSTD": [1, 19], "LZ4": [None]},
+                                 columnar=(False,), shuffle=(False,))
+
+    def test_getTuningConfigurations(self):
+        configurations = list(getTuningConfigurations(compressors=["ZSTD"], levels={"ZSTD": [None]}))
+
+        # Bit-packing is not combined with the byte shuffle, and the bytes of bit-packed fields are not pruned
+        self.assertEqual(len(configurations), 16 + 4)
+        self.assertFalse(any(configuration["bit_packing"] and configuration["shuffle"]
+                             for configuration in configurations))
+        self.assertTrue(all(configuration["prune_bytes"] is None for configuration in configurations
+                            if configuration["bit_packing"]))
+
+        configurations = list(getTuningConfigurations(compressors=["LZMA"]))
+        self.assertTrue(all(configuration["level"] is None for configuration in configurations))
+
+    def test_calcFinalSizes(self):
+        self.assertEqual(calcFinalSizes("ZSTD", 2, 3, verbose=False), (4, 4))
+        self.assertEqual(calcFinalSizes("ZSTD", 2, 3, verbose=False, prune_bytes=True), (2, 3))
+        self.assertEqual(calcFinalSizes("LZMA", 2, 3, verbose=False), (2, 3))
+        self.assertEqual(calcFinalSizes("LZMA", 2, 3, verbose=False, prune_bytes=False), (4, 4))
+
+    def test_tuneCompression(self):
+        spikes_file = Loaders.loadAEDAT(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02)
+        Functions.adapt_timestamps(spikes_file, self.file_settings_mono_64ch_2a_4t_ts02)
+
+        configuration, results = tuneCompression(spikes_file, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                 max_events=50000, verbose=False, **self.search_space)
+
+        self.assertEqual(len(results), 3 * (4 + 2))
+        self.assertEqual(results[0]["ratio"], max(result["ratio"] for result in results))
+        self.assertEqual({key: results[0][key] for key in configuration}, configuration)
+        self.assertEqual(results[0]["original_size"], 50000 * 6)
+
+        # Goals and constraints
+        configuration, results = tuneCompression(spikes_file, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                 goal="decode_speed", min_ratio=results[-1]["ratio"],
+                                                 max_events=50000, verbose=False, **self.search_space)
+        self.assertEqual(results[0]["decode_speed"], max(result["decode_speed"] for result in results
+                                                         if result["valid"]))
+
+        with self.assertRaises(ValueError):
+            tuneCompression(spikes_file, self.file_settings_mono_64ch_2a_4t_ts02, min_decode_speed=1e12,
+                            max_events=50000, verbose=False, **self.search_space)
+        with self.assertRaises(ValueError):
+            tuneCompression(spikes_file, self.file_settings_mono_64ch_2a_4t_ts02, goal="size", verbose=False)
+
+        self.assertEqual(len(sampleSpikesFile(spikes_file, 1000).timestamps), 1000)
+        self.assertIs(sampleSpikesFile(spikes_file, None), spikes_file)
+
+    def test_tuneNASFiles(self):
+        configuration, _ = tuneNASFiles([self.file_path], self.file_settings_mono_64ch_2a_4t_ts02, max_events=50000,
+                                        verbose=False, **self.search_space)
+
+        # The configuration can be used to compress the whole file
+        compressed_file, _ = compressDataFromStoredNASFile(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02,
+                                                           store=False, verbose=False, **configuration)
+        _, spikes_file, _, _ = compressedFileToSpikesFile(compressed_file)
+
+        original_spikes_file = Loaders.loadAEDAT(self.file_path, self.file_settings_mono_64ch_2a_4t_ts02)
+        if original_spikes_file.min_ts != 0:
+            Functions.adapt_timestamps(original_spikes_file, self.file_settings_mono_64ch_2a_4t_ts02)
+        self.assertEqual(spikes_file.addresses.tolist(), original_spikes_file.addresses.tolist())
+        self.assertEqual(spikes_file.timestamps.tolist(), original_spikes_file.timestamps.tolist())
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["tune", self.file_path, "--settings", "num_channels=64", "mono_stereo=0",
+                           "address_size=2", "ts_tick=0.2", "--compressors", "LZ4", "--max-events", "20000"])
+
+        self.assertEqual(status, 0)
+        self.assertIn("Best configuration: LZ4", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)